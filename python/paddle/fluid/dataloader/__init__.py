@@ -24,9 +24,17 @@ from .dataloader_iter import *
 from . import sampler
 from .sampler import *
 
+from . import record_file
+from .record_file import *
+
+from . import prefetcher
+from .prefetcher import *
+
 __all__ = (
     dataset.__all__
     + batch_sampler.__all__
     + dataloader_iter.__all__
     + sampler.__all__
+    + record_file.__all__
+    + prefetcher.__all__
 )
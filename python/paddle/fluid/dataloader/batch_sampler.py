@@ -15,7 +15,13 @@
 import numpy as np
 import math
 
-from .sampler import Sampler, SequenceSampler, RandomSampler
+from .sampler import (
+    Sampler,
+    SequenceSampler,
+    RandomSampler,
+    _get_sampler_state,
+    _set_sampler_state,
+)
 from .dataset import Dataset, IterableDataset
 
 __all__ = ["BatchSampler", "DistributedBatchSampler"]
@@ -157,6 +163,25 @@ class BatchSampler(Sampler):
         num_samples += int(not self.drop_last) * (self.batch_size - 1)
         return num_samples // self.batch_size
 
+    def state_dict(self):
+        """
+        Get the state next iteration will start from, which is the state
+        of :attr:`sampler` .
+
+        Returns:
+            dict: batch sampler state.
+        """
+        return {'sampler': _get_sampler_state(self.sampler)}
+
+    def set_state_dict(self, state_dict):
+        """
+        Set the state next iteration starts from.
+
+        Args:
+            state_dict(dict): batch sampler state from :code:`state_dict` .
+        """
+        _set_sampler_state(self.sampler, state_dict.get('sampler', None))
+
 
 class _InfiniteIterableSampler:
     def __init__(self, dataset, batch_size=1):
@@ -326,6 +351,25 @@ class DistributedBatchSampler(BatchSampler):
         num_samples += int(not self.drop_last) * (self.batch_size - 1)
         return num_samples // self.batch_size
 
+    def state_dict(self):
+        """
+        Get the state next iteration will start from, indices order only
+        depends on epoch number.
+
+        Returns:
+            dict: batch sampler state.
+        """
+        return {'epoch': self.epoch}
+
+    def set_state_dict(self, state_dict):
+        """
+        Set the state next iteration starts from.
+
+        Args:
+            state_dict(dict): batch sampler state from :code:`state_dict` .
+        """
+        self.epoch = state_dict['epoch']
+
     def set_epoch(self, epoch):
         """
         Sets the epoch number. When :attr:`shuffle=True`, this number is used
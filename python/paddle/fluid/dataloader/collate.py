@@ -108,3 +108,142 @@ def default_convert_fn(batch):
         return [default_convert_fn(d) for d in batch]
     else:
         return batch
+
+
+# leaf kinds of batch schema inferred by _CollateEngine
+_LEAF_ARRAY = 0
+_LEAF_NUMBER = 1
+_LEAF_STRING = 2
+
+
+class _CollateEngine:
+    """
+    Default batch collating function with a fast path for samples in
+    same structure with fixed-shape fields, output is same as
+    :code:`default_collate_fn`.
+
+    The batch schema is inferred from the first sample only once, each
+    numpy array, number and string field(leaf) of sample is recorded
+    with its getting path, shape and dtype, for later batches, fields are
+    got from each sample by path and stacked into preallocated arrays
+    directly without recursive type dispatching. If a batch does not
+    match the schema, e.g. shape or dtype changed, it will be collated
+    by :code:`default_collate_fn`.
+
+    If :attr:`allocator` is set by :code:`set_allocator`, the output
+    arrays will be allocated by calling :attr:`allocator` with batch size,
+    shapes and dtypes of array and number fields, allocator can return
+    preallocated arrays(e.g. in shared memory) or None to allocate new
+    arrays by the engine.
+    """
+
+    def __init__(self):
+        # None for schema not inferred, False for samples not supported
+        self._schema = None
+        self._allocator = None
+
+    def set_allocator(self, allocator):
+        self._allocator = allocator
+
+    def __call__(self, batch):
+        if self._schema is None:
+            self._schema = self._infer_schema(batch[0])
+        if self._schema is not False:
+            try:
+                return self._collate(batch)
+            except (KeyError, IndexError, TypeError, ValueError):
+                pass
+        return default_collate_fn(batch)
+
+    def _infer_schema(self, sample):
+        # each leaf is recorded as (path, kind, spec, dtype), spec is
+        # shape for array field and python type for number field
+        leaves = []
+        # (path, length) of Sequence nodes to check field number
+        seq_lens = []
+
+        def _infer(node, path):
+            if isinstance(node, np.ndarray):
+                leaves.append((path, _LEAF_ARRAY, node.shape, node.dtype))
+                return len(leaves) - 1
+            if isinstance(node, numbers.Number):
+                dtype = np.array([node]).dtype
+                leaves.append((path, _LEAF_NUMBER, type(node), dtype))
+                return len(leaves) - 1
+            if isinstance(node, (str, bytes)):
+                leaves.append((path, _LEAF_STRING, None, None))
+                return len(leaves) - 1
+            if isinstance(node, Mapping):
+                return {k: _infer(v, path + (k,)) for k, v in node.items()}
+            if isinstance(node, Sequence):
+                seq_lens.append((path, len(node)))
+                return [_infer(v, path + (i,)) for i, v in enumerate(node)]
+            # paddle.Tensor and other types are not supported
+            raise TypeError
+
+        try:
+            template = _infer(sample, ())
+        except TypeError:
+            return False
+        return template, leaves, seq_lens
+
+    @staticmethod
+    def _get(sample, path):
+        for key in path:
+            sample = sample[key]
+        return sample
+
+    def _collate(self, batch):
+        template, leaves, seq_lens = self._schema
+        batch_size = len(batch)
+
+        for path, length in seq_lens:
+            for sample in batch:
+                if len(self._get(sample, path)) != length:
+                    raise ValueError
+
+        outs = None
+        if self._allocator is not None:
+            shapes, dtypes = [], []
+            for _, kind, spec, dtype in leaves:
+                if kind == _LEAF_ARRAY:
+                    shapes.append((batch_size,) + spec)
+                    dtypes.append(dtype)
+                elif kind == _LEAF_NUMBER:
+                    shapes.append((batch_size,))
+                    dtypes.append(dtype)
+            outs = self._allocator(batch_size, shapes, dtypes)
+        outs = iter(outs) if outs is not None else None
+
+        fields = []
+        for path, kind, spec, dtype in leaves:
+            values = [self._get(sample, path) for sample in batch]
+            if kind == _LEAF_STRING:
+                if not all(isinstance(v, (str, bytes)) for v in values):
+                    raise TypeError
+                fields.append(values)
+                continue
+
+            out = next(outs) if outs is not None else None
+            if kind == _LEAF_ARRAY:
+                for v in values:
+                    if not isinstance(v, np.ndarray) or v.dtype != dtype:
+                        raise TypeError
+                # np.stack raises ValueError if shape not match
+                fields.append(np.stack(values, axis=0, out=out))
+            else:
+                if not all(type(v) is spec for v in values):
+                    raise TypeError
+                if out is None:
+                    out = np.empty([batch_size], dtype=dtype)
+                out[:] = values
+                fields.append(out)
+
+        def _build(node):
+            if isinstance(node, dict):
+                return {k: _build(v) for k, v in node.items()}
+            if isinstance(node, list):
+                return [_build(v) for v in node]
+            return fields[node]
+
+        return _build(template)
@@ -21,7 +21,7 @@ import logging
 import itertools
 import threading
 import numpy as np
-from collections import namedtuple
+from collections import namedtuple, deque
 from paddle.fluid.framework import (
     _set_expected_place,
     _current_expected_place,
@@ -41,18 +41,21 @@ from ..multiprocess_utils import (
     CleanupFuncRegistrar,
 )
 from .fetcher import _IterableDatasetFetcher, _MapDatasetFetcher
-from .batch_sampler import _InfiniteIterableSampler
-from .collate import default_collate_fn, default_convert_fn
+from .batch_sampler import _InfiniteIterableSampler, DistributedBatchSampler
+from .sampler import _get_sampler_state, _set_sampler_state
+from .collate import default_collate_fn, default_convert_fn, _CollateEngine
 from .worker import (
     ParentWatchDog,
     get_worker_info,
     _worker_loop,
+    _thread_worker_loop,
     _DatasetKind,
     _IterableDatasetStopIteration,
     _WorkerException,
     _ResumeIteration,
 )
 from .flat import _flatten_batch, _restore_batch
+from .slab import _SlabBatch, _SharedMemorySlabCache
 from paddle.profiler.timer import benchmark
 
 __all__ = ['get_worker_info']
@@ -109,6 +112,9 @@ class _DataLoaderIterBase:
         self._use_buffer_reader = loader.use_buffer_reader
         self._prefetch_factor = loader.prefetch_factor
         self._use_shared_memory = loader.use_shared_memory
+        self._use_shared_memory_slab = (
+            loader.use_shared_memory_slab and loader.use_shared_memory
+        )
         self._timeout = (
             loader.timeout if loader.timeout > 0 else MP_STATUS_CHECK_INTERVAL
         )
@@ -116,9 +122,47 @@ class _DataLoaderIterBase:
         self._dataset_kind = loader.dataset_kind
         self._pin_memory = loader.pin_memory
 
-        self._sampler_iter = iter(self._index_sampler)
+        # NOTE: [ resume iteration ] iteration can be resumed from state
+        # got by state_dict, state contains sampler state the epoch
+        # started from and batch number already output. For map-style
+        # dataset, indices of output batches are skipped in sampler
+        # without loading. For IterableDataset, sample number consumed
+        # from each worker's dataset is recorded and skipped in worker
+        resume_state = loader._resume_state
+        loader._resume_state = None
+        num_skip_batches = 0
+        self._worker_skip_samples = None
+        if resume_state is not None:
+            _set_sampler_state(self._index_sampler, resume_state['sampler'])
+            num_skip_batches = resume_state['num_batches']
+            worker_samples = resume_state['worker_samples']
+            if (
+                self._dataset_kind == _DatasetKind.ITER
+                and worker_samples is not None
+            ):
+                self._worker_skip_samples = worker_samples
+                if len(worker_samples) != max(self._num_workers, 1):
+                    raise ValueError(
+                        "DataLoader state of IterableDataset saved with "
+                        "num_workers={} cannot be resumed with num_workers="
+                        "{}".format(
+                            resume_state['num_workers'], self._num_workers
+                        )
+                    )
+        self._sampler_iter = self._init_sampler_iter(num_skip_batches)
+        self._num_output_batches = num_skip_batches
+        self._worker_samples = None
+        if self._dataset_kind == _DatasetKind.ITER:
+            self._worker_samples = list(
+                self._worker_skip_samples or [0] * max(self._num_workers, 1)
+            )
+        self._epoch_done = False
         if self._auto_collate_batch:
-            self._collate_fn = loader.collate_fn or default_collate_fn
+            # NOTE: batch schema is inferred by _CollateEngine only once
+            #       and kept in loader to be reused in following epochs
+            if loader.collate_fn is None and loader._collate_engine is None:
+                loader._collate_engine = _CollateEngine()
+            self._collate_fn = loader.collate_fn or loader._collate_engine
         else:
             self._collate_fn = loader.collate_fn or default_convert_fn
 
@@ -141,6 +185,42 @@ class _DataLoaderIterBase:
             else:
                 return _InfiniteIterableSampler(self._dataset, 1)
 
+    def _init_sampler_iter(self, num_skip_batches=0):
+        # record the state sampler starts from, so that indices can be
+        # generated again in resuming, samplers keep the state returned
+        # by state_dict for the next iteration
+        self._sampler_state = _get_sampler_state(self._index_sampler)
+        sampler_iter = iter(self._index_sampler)
+        if self._dataset_kind == _DatasetKind.MAP and num_skip_batches > 0:
+            next(
+                itertools.islice(
+                    sampler_iter, num_skip_batches, num_skip_batches
+                ),
+                None,
+            )
+        return sampler_iter
+
+    def _count_output_batch(self, worker_id=0):
+        self._num_output_batches += 1
+        if self._worker_samples is not None:
+            self._worker_samples[worker_id] += getattr(
+                self._index_sampler, 'batch_size', 1
+            )
+
+    def state_dict(self):
+        """
+        Get state of current epoch to resume from, see
+        :code:`DataLoader.state_dict` .
+        """
+        return {
+            'sampler': self._sampler_state,
+            'num_batches': self._num_output_batches,
+            'worker_samples': None
+            if self._worker_samples is None
+            else list(self._worker_samples),
+            'num_workers': self._num_workers,
+        }
+
     def __iter__(self):
         return self
 
@@ -173,6 +253,7 @@ class _DataLoaderIterSingleProcess(_DataLoaderIterBase):
             self._auto_collate_batch,
             self._collate_fn,
             self._drop_last,
+            (self._worker_skip_samples or [0])[0],
         )
 
         # NOTE: _structrue_infos used to record the data structure of
@@ -302,6 +383,7 @@ class _DataLoaderIterSingleProcess(_DataLoaderIterBase):
                     self._reader.read_next_list()[0]
                 )
                 data = _restore_batch(data, self._structure_infos.pop(0))
+                self._count_output_batch()
             else:
                 # in static graph mode
                 if self._return_list:
@@ -320,10 +402,13 @@ class _DataLoaderIterSingleProcess(_DataLoaderIterBase):
                         data = data[0]
                 else:
                     data = self._reader.read_next()
+                for _ in range(len(self._places)):
+                    self._count_output_batch()
             benchmark().after_reader()
 
             return data
         except StopIteration:
+            self._epoch_done = True
             self._reader.shutdown()
             self._try_shutdown_all()
             raise
@@ -373,6 +458,27 @@ class _DataLoaderIterMultiProcess(_DataLoaderIterBase):
         self._persistent_workers = loader._persistent_workers
         self._resume_worker_cnt = 0
 
+        # NOTE: [ prefetch next epoch ] In persistent workers mode for
+        # map-style dataset, when indices of current epoch drained, indices
+        # of next epoch will be put to workers in last steps of current
+        # epoch, so workers can load first batches of next epoch while
+        # current epoch is finishing. Batches of next epoch is counted in
+        # _prefetched_outstanding, and _thread will wait at batch index
+        # _epoch_end_idx until next epoch started by _reset. Batch of
+        # multiple places may be split across epochs, so only enable
+        # prefetching for single place.
+        self._prefetch_next_epoch = (
+            self._persistent_workers
+            and self._dataset_kind == _DatasetKind.MAP
+            and len(self._places) == 1
+        )
+        self._next_sampler_iter = None
+        self._next_sampler_epoch = None
+        self._next_sampler_state = None
+        self._prefetched_outstanding = 0
+        self._epoch_end_idx = None
+        self._next_epoch_event = threading.Event()
+
         assert (
             self._num_workers > 0
         ), "Multi-process DataLoader " "invalid num_workers({})".format(
@@ -404,10 +510,31 @@ class _DataLoaderIterMultiProcess(_DataLoaderIterBase):
         # see _try_put_indices
         self._thread_lock = threading.Lock()
 
+        # NOTE: see [ shared memory slab transport ] in slab.py, each
+        # worker holds at most indices of _outstanding_capacity batches
+        # which may be all assigned to one worker in worst case, and
+        # batches output in last iteration may still be used by users
+        self._slab_num = 0
+        if self._use_shared_memory_slab:
+            self._slab_num = self._outstanding_capacity + len(self._places)
+        # slabs of batches pushed into blocking_queue in order, and slabs
+        # of batches output in last iteration, None for batch not in slab
+        self._pushed_slabs = deque()
+        self._output_slabs = []
+
+        # workers of batches pushed into blocking_queue in order, to count
+        # samples consumed from each worker for IterableDataset
+        self._pushed_workers = deque()
+
         self._base_seed = np.random.randint(low=0, high=sys.maxsize)
 
         # init workers and indices queues and put 2 indices in each indices queue
         self._init_workers()
+        if self._worker_skip_samples is not None:
+            # see [ resume iteration ], indices are put to workers in turn,
+            # rotate workers to the one outputs next batch in resumed epoch
+            for _ in range(self._num_output_batches % self._num_workers):
+                next(self._workers_idx_cycle)
         for _ in range(self._outstanding_capacity):
             self._try_put_indices()
 
@@ -421,6 +548,7 @@ class _DataLoaderIterMultiProcess(_DataLoaderIterBase):
         self._workers = []
         self._worker_status = []
         self._indices_queues = []
+        self._slab_release_queues = []
         self._workers_idx_cycle = itertools.cycle(range(self._num_workers))
 
         # create data_queue for workers
@@ -434,6 +562,10 @@ class _DataLoaderIterMultiProcess(_DataLoaderIterBase):
         for i in range(self._num_workers):
             indices_queue = multiprocessing.Queue()
             self._indices_queues.append(indices_queue)
+            slab_release_queue = None
+            if self._slab_num > 0:
+                slab_release_queue = multiprocessing.Queue()
+                self._slab_release_queues.append(slab_release_queue)
             worker = multiprocessing.Process(
                 target=_worker_loop,
                 args=(
@@ -450,6 +582,9 @@ class _DataLoaderIterMultiProcess(_DataLoaderIterBase):
                     self._num_workers,
                     self._use_shared_memory,
                     self._base_seed,
+                    self._slab_num,
+                    slab_release_queue,
+                    (self._worker_skip_samples or [0] * self._num_workers)[i],
                 ),
             )
             worker.daemon = True
@@ -457,6 +592,8 @@ class _DataLoaderIterMultiProcess(_DataLoaderIterBase):
             self._workers.append(worker)
             self._worker_status.append(True)
 
+        self._slab_cache = _SharedMemorySlabCache(self._slab_release_queues)
+
         core._set_process_pids(id(self), tuple(w.pid for w in self._workers))
         _set_SIGCHLD_handler()
 
@@ -502,6 +639,20 @@ class _DataLoaderIterMultiProcess(_DataLoaderIterBase):
         self._thread.start()
 
     def _reset(self):
+        if self._can_start_prefetched_epoch():
+            self._start_prefetched_epoch()
+            return
+
+        # batches of next epoch prefetched can not be used, e.g. current
+        # epoch is not finished, let _thread go on reading them and drop
+        # them as batches of current epoch in following steps
+        with self._thread_lock:
+            self._next_sampler_iter = None
+            self._next_sampler_state = None
+            self._prefetched_outstanding = 0
+            self._epoch_end_idx = None
+        self._next_epoch_event.set()
+
         # resume iteration in following steps
         # 1. Resume workers, clear worker caches
         # put _ResumeIteration to all worker as resume iteration flag
@@ -528,22 +679,88 @@ class _DataLoaderIterMultiProcess(_DataLoaderIterBase):
                 else:
                     data = self._reader.read_next()
 
-        # 3. reset all states
+        # 3. reset all states, slabs of dropped batches should be
+        # sent back to workers
+        self._release_output_slabs()
+        while len(self._pushed_slabs) > 0:
+            self._slab_cache.release(self._pushed_slabs.popleft())
+        for info in self._task_infos.values():
+            if len(info) == 3 and isinstance(info[1], _SlabBatch):
+                self._slab_cache.release(info[1])
         self._send_idx = 0
         self._rcvd_idx = 0
         self._batches_outstanding = 0
         self._task_infos = {}
         self._structure_infos = []
+        self._pushed_workers.clear()
 
         # set all worker status available
         self._worker_status = [True] * self._num_workers
 
         # 4. reset _sampler_iter and put prefetch indices to start next epoch
         # init workers and indices queues and put 2 indices in each indices queue
-        self._sampler_iter = iter(self._index_sampler)
+        self._sampler_iter = self._init_sampler_iter()
+        self._reset_output_count()
         for _ in range(self._outstanding_capacity):
             self._try_put_indices()
 
+    def _can_start_prefetched_epoch(self):
+        if self._next_sampler_iter is None:
+            return False
+        # current epoch should be finished
+        if (
+            self._batches_outstanding > 0
+            or self._rcvd_idx != self._epoch_end_idx
+        ):
+            return False
+        # indices of DistributedBatchSampler depends on epoch, batches
+        # prefetched is invalid if users set different epoch by set_epoch
+        if (
+            isinstance(self._batch_sampler, DistributedBatchSampler)
+            and self._batch_sampler.shuffle
+        ):
+            if self._batch_sampler.epoch != self._next_sampler_epoch[0]:
+                return False
+        return True
+
+    def _start_prefetched_epoch(self):
+        with self._thread_lock:
+            self._sampler_iter = self._next_sampler_iter
+            self._sampler_state = self._next_sampler_state
+            self._batches_outstanding = self._prefetched_outstanding
+            if isinstance(self._batch_sampler, DistributedBatchSampler):
+                self._batch_sampler.epoch = self._next_sampler_epoch[1]
+            self._next_sampler_iter = None
+            self._next_sampler_state = None
+            self._reset_output_count()
+            self._prefetched_outstanding = 0
+            self._epoch_end_idx = None
+        # wake up _thread waiting at the end of last epoch
+        self._next_epoch_event.set()
+        for _ in range(self._outstanding_capacity - self._batches_outstanding):
+            self._try_put_indices()
+
+    def _init_next_sampler_iter(self):
+        # NOTE: should be called with _thread_lock held
+        epoch = getattr(self._batch_sampler, "epoch", None)
+        sampler_state = _get_sampler_state(self._index_sampler)
+        sampler_iter = iter(self._index_sampler)
+        try:
+            indices = next(sampler_iter)
+        except StopIteration:
+            return False
+        if isinstance(self._batch_sampler, DistributedBatchSampler):
+            # DistributedBatchSampler increases epoch when generating
+            # indices, restore it to check whether users set epoch when
+            # next epoch started, see _can_start_prefetched_epoch
+            self._next_sampler_epoch = (epoch, self._batch_sampler.epoch)
+            self._batch_sampler.epoch = epoch
+        self._next_sampler_iter = itertools.chain([indices], sampler_iter)
+        self._next_sampler_state = sampler_state
+        self._epoch_end_idx = self._send_idx
+        self._next_epoch_event.clear()
+        return True
+
     def _shutdown_worker(self, worker_id, shutdown=False):
         if self._worker_status[worker_id] or (
             self._persistent_workers and shutdown
@@ -567,9 +784,10 @@ class _DataLoaderIterMultiProcess(_DataLoaderIterBase):
                 if not self._shutdown:
                     for w in self._workers:
                         w.join(timeout)
-                    for q in self._indices_queues:
+                    for q in self._indices_queues + self._slab_release_queues:
                         q.cancel_join_thread()
                         q.close()
+                self._slab_cache.clear()
             finally:
                 core._erase_process_pids(id(self))
                 self._shutdown = True
@@ -596,7 +814,15 @@ class _DataLoaderIterMultiProcess(_DataLoaderIterBase):
                     try:
                         # pack as LoDTensorArray
                         array = core.LoDTensorArray()
-                        if self._use_shared_memory:
+                        if isinstance(batch, _SlabBatch):
+                            # record slab before pushing to make sure
+                            # slab is recorded before batch is output
+                            self._pushed_slabs.append(batch)
+                            for tensor in self._slab_cache.get_tensors(batch):
+                                array.append(tensor)
+                        elif self._use_shared_memory:
+                            if self._slab_num > 0:
+                                self._pushed_slabs.append(None)
                             for tensor in batch:
                                 array.append(tensor)
                         else:
@@ -623,6 +849,13 @@ class _DataLoaderIterMultiProcess(_DataLoaderIterBase):
 
     def _get_data(self):
         while not self._thread_done_event.is_set():
+            # NOTE: see [ prefetch next epoch ], batches of next epoch
+            #       should not be output before next epoch started
+            epoch_end_idx = self._epoch_end_idx
+            if epoch_end_idx is not None and self._rcvd_idx >= epoch_end_idx:
+                self._next_epoch_event.wait(MP_STATUS_CHECK_INTERVAL)
+                continue
+
             # For IterableDataset, batch indices is generated infinitely
             # for each worker to raise StopIteration, but a StopIteration
             # raising process will discard a batch indices which is count
@@ -662,6 +895,8 @@ class _DataLoaderIterMultiProcess(_DataLoaderIterBase):
             ):
                 info = self._task_infos.pop(self._rcvd_idx)
                 self._structure_infos.append(info[2])
+                if self._dataset_kind == _DatasetKind.ITER:
+                    self._pushed_workers.append(info[0])
                 return info[1]
 
             try:
@@ -687,7 +922,9 @@ class _DataLoaderIterMultiProcess(_DataLoaderIterBase):
                         self._shutdown_worker(i)
                 if len(failed_workers) > 0:
                     self._exit_thread_unexpectedly()
-                    pids = ', '.join(str(w.pid) for w in failed_workers)
+                    pids = ', '.join(
+                        str(getattr(w, 'pid', w.name)) for w in failed_workers
+                    )
                     raise RuntimeError(
                         "DataLoader {} workers exit unexpectedly, "
                         "pids: {}".format(len(failed_workers), pids)
@@ -735,6 +972,8 @@ class _DataLoaderIterMultiProcess(_DataLoaderIterBase):
                     batch.reraise()
 
                 if idx == self._rcvd_idx:
+                    if self._dataset_kind == _DatasetKind.ITER:
+                        self._pushed_workers.append(self._task_infos[idx][0])
                     del self._task_infos[idx]
                     self._structure_infos.append(structure)
                     return batch
@@ -756,10 +995,23 @@ class _DataLoaderIterMultiProcess(_DataLoaderIterBase):
         # function which is not in data reading pipeline, this lock almost no
         # influence on performance
         with self._thread_lock:
+            next_epoch = False
             try:
                 indices = next(self._sampler_iter)
             except StopIteration:
-                return
+                if not self._prefetch_next_epoch:
+                    return
+                # see [ prefetch next epoch ]
+                if (
+                    self._next_sampler_iter is None
+                    and not self._init_next_sampler_iter()
+                ):
+                    return
+                try:
+                    indices = next(self._next_sampler_iter)
+                except StopIteration:
+                    return
+                next_epoch = True
 
             for i in range(self._num_workers):
                 worker_idx = next(self._workers_idx_cycle)
@@ -770,7 +1022,10 @@ class _DataLoaderIterMultiProcess(_DataLoaderIterBase):
 
             self._indices_queues[worker_idx].put((self._send_idx, indices))
             self._task_infos[self._send_idx] = (worker_idx,)
-            self._batches_outstanding += 1
+            if next_epoch:
+                self._prefetched_outstanding += 1
+            else:
+                self._batches_outstanding += 1
             self._send_idx += 1
 
     def __del__(self):
@@ -803,6 +1058,11 @@ class _DataLoaderIterMultiProcess(_DataLoaderIterBase):
                     self._thread_done_event.set()
                     self._blocking_queue.close()
 
+            # NOTE: batches output in last iteration is considered
+            #       consumed when next iteration is required, send
+            #       their slabs back to workers for reusing
+            self._release_output_slabs()
+
             if in_dygraph_mode():
                 data = core.eager.read_next_tensor_list(
                     self._reader.read_next_list()[0]
@@ -829,6 +1089,7 @@ class _DataLoaderIterMultiProcess(_DataLoaderIterBase):
             benchmark().after_reader()
             return data
         except StopIteration:
+            self._epoch_done = True
             if not self._persistent_workers:
                 self._reader.shutdown()
                 self._try_shutdown_all()
@@ -837,7 +1098,107 @@ class _DataLoaderIterMultiProcess(_DataLoaderIterBase):
             if in_profiler_mode():
                 trace_event.end()
 
+    def _reset_output_count(self):
+        self._num_output_batches = 0
+        if self._worker_samples is not None:
+            self._worker_samples = [0] * self._num_workers
+        self._epoch_done = False
+
     def _on_output_batch(self):
         for _ in range(len(self._places)):
+            if self._worker_samples is not None:
+                self._count_output_batch(self._pushed_workers.popleft())
+            else:
+                self._count_output_batch()
             self._batches_outstanding -= 1
             self._try_put_indices()
+            if self._slab_num > 0:
+                self._output_slabs.append(self._pushed_slabs.popleft())
+
+    def _release_output_slabs(self):
+        for slab_batch in self._output_slabs:
+            self._slab_cache.release(slab_batch)
+        self._output_slabs = []
+
+
+class _DataLoaderIterMultiThread(_DataLoaderIterMultiProcess):
+    """
+    Multi-thread implement of DataLoaderIter, workers are threads in main
+    process instead of subprocesses, which reuses the indices dispatching
+    and output order keeping logic of multi-process mode, and avoids cost
+    of starting processes, copying dataset and inter-process communication.
+    It is suitable for datasets which spend most time in GIL-releasing
+    operations, e.g. file reading, image decoding and numpy operations.
+    """
+
+    def _init_workers(self):
+        # batches are passed between threads directly, no need to
+        # use shared memory
+        self._use_shared_memory = False
+        self._use_shared_memory_slab = False
+        self._slab_num = 0
+        self._slab_release_queues = []
+        self._slab_cache = _SharedMemorySlabCache([])
+
+        self._workers = []
+        self._worker_status = []
+        self._indices_queues = []
+        self._workers_idx_cycle = itertools.cycle(range(self._num_workers))
+
+        self._data_queue = queue.Queue()
+        self._workers_done_event = threading.Event()
+        self._thread_done_event = threading.Event()
+
+        for i in range(self._num_workers):
+            indices_queue = queue.Queue()
+            self._indices_queues.append(indices_queue)
+            worker = threading.Thread(
+                target=_thread_worker_loop,
+                args=(
+                    self._dataset,
+                    self._dataset_kind,
+                    indices_queue,
+                    self._data_queue,
+                    self._workers_done_event,
+                    self._auto_collate_batch,
+                    self._collate_fn,
+                    self._drop_last,
+                    self._worker_init_fn,
+                    i,
+                    self._num_workers,
+                    self._base_seed,
+                    (self._worker_skip_samples or [0] * self._num_workers)[i],
+                ),
+                name="DataLoaderWorker_{}_{}".format(id(self), i),
+            )
+            worker.daemon = True
+            worker.start()
+            self._workers.append(worker)
+            self._worker_status.append(True)
+
+    def _clear_and_remove_data_queue(self):
+        if self._data_queue is not None:
+            while True:
+                try:
+                    self._data_queue.get_nowait()
+                except queue.Empty:
+                    break
+
+    def _try_shutdown_all(self, timeout=None):
+        if not self._shutdown:
+            try:
+                self._exit_thread_expectedly()
+                self._clear_and_remove_data_queue()
+
+                # set _workers_done_event should be set before put None
+                # to indices_queue, workers wll exit on reading None from
+                # indices_queue
+                self._workers_done_event.set()
+                for i in range(self._num_workers):
+                    self._shutdown_worker(i, shutdown=True)
+
+                for w in self._workers:
+                    if w is not threading.current_thread():
+                        w.join(timeout)
+            finally:
+                self._shutdown = True
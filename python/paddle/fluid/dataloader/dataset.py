@@ -40,6 +40,17 @@ class Dataset:
     :code:`__len__`: return dataset sample number. This method is required
     by some implements of :code:`paddle.io.BatchSampler`
 
+    Subclasses can also implement following optional method:
+
+    :code:`__getitems__`: get a list of samples from dataset with a given
+    list of indices. If implemented, :code:`paddle.io.DataLoader` will call
+    it once per mini-batch instead of calling :code:`__getitem__` for each
+    index, which is useful for datasets which can gather a batch of samples
+    in a vectorized way, e.g. datasets backed by memory-mapped arrays or
+    databases. Returned list should be in the same order and length of
+    given indices, and will be passed to :code:`collate_fn` as a list of
+    samples got from :code:`__getitem__`.
+
     see :code:`paddle.io.DataLoader`.
 
     Examples:
@@ -293,6 +304,14 @@ class TensorDataset(Dataset):
         return self.tensors[0].shape[0]
 
 
+def _getitems_from_dataset(dataset, indices):
+    # use the optional batch protocol `__getitems__` if dataset supports,
+    # otherwise fall back to get samples one by one by `__getitem__`
+    if hasattr(dataset, "__getitems__"):
+        return dataset.__getitems__(indices)
+    return [dataset[idx] for idx in indices]
+
+
 def to_list(value):
     if value is None:
         return value
@@ -370,6 +389,15 @@ class ComposeDataset(Dataset):
             sample.extend(to_list(dataset[idx]))
         return tuple(sample)
 
+    def __getitems__(self, indices):
+        samples = [[] for _ in indices]
+        for dataset in self.datasets:
+            for sample, field in zip(
+                samples, _getitems_from_dataset(dataset, indices)
+            ):
+                sample.extend(to_list(field))
+        return [tuple(sample) for sample in samples]
+
 
 class ChainDataset(IterableDataset):
     """
@@ -460,6 +488,11 @@ class Subset(Dataset):
     def __getitem__(self, idx):
         return self.dataset[self.indices[idx]]
 
+    def __getitems__(self, indices):
+        return _getitems_from_dataset(
+            self.dataset, [self.indices[idx] for idx in indices]
+        )
+
     def __len__(self):
         return len(self.indices)
 
@@ -12,6 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import itertools
 import logging
 from ..log_helper import get_logger
 from collections.abc import Sequence, Mapping
@@ -81,9 +82,29 @@ class _DatasetFetcher:
 
 
 class _IterableDatasetFetcher(_DatasetFetcher):
-    def __init__(self, dataset, auto_collate_batch, collate_fn, drop_last):
+    def __init__(
+        self,
+        dataset,
+        auto_collate_batch,
+        collate_fn,
+        drop_last,
+        num_skip_samples=0,
+    ):
         super().__init__(dataset, auto_collate_batch, collate_fn, drop_last)
+        # NOTE: samples already consumed before resuming are skipped here,
+        #       datasets can implement `_skip_samples` to skip them without
+        #       reading, e.g. by seeking, otherwise they are read and dropped
+        if num_skip_samples > 0 and hasattr(dataset, "_skip_samples"):
+            dataset._skip_samples(num_skip_samples)
+            num_skip_samples = 0
         self.dataset_iter = iter(dataset)
+        if num_skip_samples > 0:
+            next(
+                itertools.islice(
+                    self.dataset_iter, num_skip_samples, num_skip_samples
+                ),
+                None,
+            )
 
     def fetch(self, batch_indices, done_event=None):
 
@@ -121,12 +142,21 @@ class _MapDatasetFetcher(_DatasetFetcher):
 
     def fetch(self, batch_indices, done_event=None):
         if self.auto_collate_batch:
-            data = []
-            for idx in batch_indices:
-                if done_event is None or not done_event.is_set():
-                    data.append(self.dataset[idx])
-                else:
+            # NOTE: if dataset implements the optional batch protocol
+            #       `__getitems__`, fetch the whole batch in one call,
+            #       which saves per-sample python and I/O overhead for
+            #       datasets supporting vectorized gather
+            if hasattr(self.dataset, "__getitems__"):
+                if done_event is not None and done_event.is_set():
                     return None
+                data = self.dataset.__getitems__(batch_indices)
+            else:
+                data = []
+                for idx in batch_indices:
+                    if done_event is None or not done_event.is_set():
+                        data.append(self.dataset[idx])
+                    else:
+                        return None
 
             global _WARNING_TO_LOG
             if not isinstance(data[0], (Sequence, Mapping)) and _WARNING_TO_LOG:
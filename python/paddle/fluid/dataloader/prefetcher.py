@@ -0,0 +1,277 @@
+#   Copyright (c) 2022 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import sys
+import time
+import queue
+import threading
+from collections import deque
+
+import paddle
+from .. import core
+from ..framework import (
+    _non_static_mode,
+    _get_paddle_place,
+    _current_expected_place,
+)
+
+__all__ = ["DevicePrefetcher"]
+
+
+class _PrefetchStopIteration:
+    pass
+
+
+class _PrefetchException:
+    def __init__(self, exc_info):
+        self.exc_info = exc_info
+
+
+class _PrefetchedBatch:
+    def __init__(self, batch, host_batch=None, event=None):
+        self.batch = batch
+        # keep host batch alive until asynchronous copy finished
+        self.host_batch = host_batch
+        self.event = event
+
+
+class DevicePrefetcher:
+    """
+    Wrapper of DataLoader to overlap host to device copy of batches with
+    computation.
+
+    A background thread fetches batches from :attr:`loader` and stages
+    them in pinned memory, at most :attr:`num_prefetch` batches will be
+    staged. When a batch is requested, copies of following staged batches
+    are issued asynchronously on a separate CUDA stream, so that they run
+    while current step computing, and current stream will wait for copy of
+    the returned batch to be finished before using it.
+
+    Batch fetched from :attr:`loader` can be nested list, tuple or dict of
+    Tensors, Tensors already on :attr:`place` are returned as is. Since
+    DataLoader copies batches to :code:`places` in its reader thread by
+    default, DataLoader should be created with :code:`places` set as
+    :code:`paddle.CPUPlace()` to copy batches by this wrapper.
+
+    Prefetch statistics can be got by :code:`stats` , a batch is counted as
+    hit if its copy has been issued before it is requested, otherwise it is
+    counted as miss, which means batch loading is the bottleneck.
+
+    .. note::
+        This API only supports dynamic graph mode currently.
+
+    Args:
+        loader(iterable): DataLoader or iterable object yields batches.
+        place(CUDAPlace|CPUPlace|str, optional): place to copy batches to.
+            If :attr:`place` is None, current expected place will be used.
+            Default None.
+        num_prefetch(int, optional): max batch number staged and copied
+            ahead. Default 2.
+        pin_memory(bool, optional): whether to stage batches in pinned
+            memory, only works when :attr:`place` is CUDAPlace.
+            Default True.
+
+    Examples:
+
+        .. code-block:: python
+
+            import numpy as np
+            import paddle
+            from paddle.io import Dataset, DataLoader, DevicePrefetcher
+
+            class RandomDataset(Dataset):
+                def __getitem__(self, idx):
+                    image = np.random.random([784]).astype('float32')
+                    label = np.random.randint(0, 9, (1, )).astype('int64')
+                    return image, label
+
+                def __len__(self):
+                    return 100
+
+            loader = DataLoader(RandomDataset(), batch_size=16,
+                                places=paddle.CPUPlace(), num_workers=2)
+            prefetcher = DevicePrefetcher(loader, num_prefetch=2)
+            for image, label in prefetcher:
+                pass
+            print(prefetcher.stats())
+
+    """
+
+    def __init__(self, loader, place=None, num_prefetch=2, pin_memory=True):
+        assert _non_static_mode(), "DevicePrefetcher only supports dygraph mode"
+        assert (
+            isinstance(num_prefetch, int) and num_prefetch > 0
+        ), "num_prefetch should be a positive integer"
+        self.loader = loader
+        if place is None:
+            place = _current_expected_place()
+        self.place = _get_paddle_place(place)
+        self.num_prefetch = num_prefetch
+
+        self._use_cuda = isinstance(self.place, core.CUDAPlace)
+        self.pin_memory = pin_memory and self._use_cuda
+        self._stream = None
+
+        self._thread = None
+        self._staged = None
+        self._inflight = deque()
+        self._last = None
+        self._exit_event = threading.Event()
+        self._reset_stats()
+
+    def _reset_stats(self):
+        self._hits = 0
+        self._misses = 0
+        self._wait_time = 0.0
+
+    def stats(self):
+        """
+        Get prefetch statistics of current epoch.
+
+        Returns:
+            dict: statistics with following keys, :code:`hits` and
+                :code:`misses` for batch number hit or miss, :code:`wait_time`
+                for total seconds waiting for batch loading.
+        """
+        return {
+            'hits': self._hits,
+            'misses': self._misses,
+            'wait_time': self._wait_time,
+        }
+
+    def __len__(self):
+        return len(self.loader)
+
+    def __iter__(self):
+        self._shutdown()
+        self._reset_stats()
+        self._exit_event = threading.Event()
+        self._staged = queue.Queue(self.num_prefetch)
+        self._thread = threading.Thread(
+            target=self._thread_loop,
+            args=(iter(self.loader), self._staged, self._exit_event),
+        )
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def _thread_loop(self, loader_iter, staged, exit_event):
+        def _put(item):
+            while not exit_event.is_set():
+                try:
+                    staged.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        try:
+            for batch in loader_iter:
+                if self.pin_memory:
+                    batch = self._map(batch, self._pin)
+                if not _put(batch):
+                    return
+            _put(_PrefetchStopIteration())
+        except:
+            _put(_PrefetchException(sys.exc_info()))
+
+    def _map(self, batch, fn):
+        if isinstance(batch, (paddle.Tensor, core.eager.Tensor)):
+            return fn(batch)
+        if isinstance(batch, (list, tuple)):
+            return type(batch)(self._map(b, fn) for b in batch)
+        if isinstance(batch, dict):
+            return {k: self._map(v, fn) for k, v in batch.items()}
+        return batch
+
+    def _pin(self, tensor):
+        if tensor.place.is_cpu_place():
+            return tensor.pin_memory()
+        return tensor
+
+    def _copy(self, tensor):
+        if tensor.place._equals(self.place):
+            return tensor
+        out = tensor._copy_to(self.place, not self._use_cuda)
+        out.stop_gradient = tensor.stop_gradient
+        return out
+
+    def _issue(self, host_batch):
+        if not self._use_cuda:
+            return _PrefetchedBatch(self._map(host_batch, self._copy))
+
+        if self._stream is None:
+            self._stream = paddle.device.cuda.Stream(self.place)
+        with paddle.device.cuda.stream_guard(self._stream):
+            batch = self._map(host_batch, self._copy)
+        return _PrefetchedBatch(batch, host_batch, self._stream.record_event())
+
+    def _fill(self, block):
+        # issue copies of staged batches until num_prefetch in flight
+        while len(self._inflight) < self.num_prefetch:
+            try:
+                item = self._staged.get(block=block)
+            except queue.Empty:
+                return
+            if isinstance(item, _PrefetchStopIteration):
+                self._staged.put(item)
+                return
+            if isinstance(item, _PrefetchException):
+                self._staged.put(item)
+                if len(self._inflight) > 0:
+                    return
+                item.exc_info[1].__traceback__ = item.exc_info[2]
+                raise item.exc_info[1]
+            self._inflight.append(self._issue(item))
+            block = False
+
+    def __next__(self):
+        if self._thread is None:
+            raise StopIteration
+
+        if self._last is not None:
+            if self._last.event is not None:
+                self._last.event.synchronize()
+            self._last = None
+
+        if len(self._inflight) > 0:
+            self._hits += 1
+        else:
+            start = time.time()
+            self._fill(block=True)
+            self._wait_time += time.time() - start
+            if len(self._inflight) == 0:
+                self._shutdown()
+                raise StopIteration
+            self._misses += 1
+
+        item = self._inflight.popleft()
+        # issue copies of following batches before computing current one
+        self._fill(block=False)
+        if item.event is not None:
+            paddle.device.cuda.current_stream(self.place).wait_event(item.event)
+        self._last = item
+        return item.batch
+
+    def _shutdown(self):
+        if self._thread is not None:
+            self._exit_event.set()
+            self._thread.join()
+            self._thread = None
+        self._inflight.clear()
+        self._last = None
+
+    def __del__(self):
+        if hasattr(self, '_inflight'):
+            self._shutdown()
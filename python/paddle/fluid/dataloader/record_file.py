@@ -0,0 +1,571 @@
+#   Copyright (c) 2022 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import json
+import mmap
+import pickle
+import struct
+import zlib
+import numpy as np
+
+from .dataset import IterableDataset
+from .worker import get_worker_info
+
+__all__ = ["RecordFileWriter", "RecordFileDataset"]
+
+# NOTE: [ record file format ] A record file dataset is saved as
+# several shard files and an index file:
+#
+#   {path}-{shard_id:05d}.rec: magic number followed by records, each
+#       record is a header of (payload length: uint64, crc32 of payload:
+#       uint32) in little endian followed by serialized payload bytes.
+#   {path}-{shard_id:05d}.idx: byte offset of each record in shard file,
+#       saved as little endian uint64 array.
+#   {path}.index: json file of format version and shard infos, which
+#       contains shard file names and record number of each shard.
+#
+# Records are read sequentially with large buffered I/O or mmap, the
+# per-shard offsets are only needed when reading starts from the middle
+# of a shard, e.g. resuming or a shard is splitted by multiple readers.
+
+_RECORD_MAGIC = b'PDRECv01'
+_RECORD_HEADER = struct.Struct('<QI')
+_INDEX_VERSION = 1
+
+
+def _shard_file_names(path, shard_id):
+    prefix = "{}-{:05d}".format(os.path.basename(path), shard_id)
+    return prefix + '.rec', prefix + '.idx'
+
+
+class RecordFileWriter:
+    """
+    Writer to save samples into sharded record files, which can be loaded by
+    :ref:`api_paddle_io_RecordFileDataset` .
+
+    Samples are serialized by :attr:`serialize_fn` and appended to current
+    shard file sequentially, a new shard file will be created when size or
+    record number of current shard reaches the limit. Shard files and index
+    file are named with prefix :attr:`path` , index file is saved as
+    :code:`{path}.index` when the writer is closed.
+
+    Args:
+        path(str): path prefix of shard files and index file.
+        max_shard_size(int, optional): max byte size of each shard file.
+            Default 256MB.
+        max_shard_records(int, optional): max record number of each shard
+            file, None for no limit. Default None.
+        serialize_fn(callable, optional): function to serialize a sample
+            into bytes. Default :code:`pickle.dumps` .
+
+    Examples:
+
+        .. code-block:: python
+
+            import numpy as np
+            from paddle.io import RecordFileWriter
+
+            with RecordFileWriter('./data/train') as writer:
+                for i in range(100):
+                    image = np.random.random([784]).astype('float32')
+                    label = np.array([i % 10]).astype('int64')
+                    writer.write((image, label))
+
+    """
+
+    def __init__(
+        self,
+        path,
+        max_shard_size=256 << 20,
+        max_shard_records=None,
+        serialize_fn=None,
+    ):
+        assert (
+            isinstance(max_shard_size, int) and max_shard_size > 0
+        ), "max_shard_size should be a positive integer"
+        assert max_shard_records is None or (
+            isinstance(max_shard_records, int) and max_shard_records > 0
+        ), "max_shard_records should be None or a positive integer"
+        self.path = path
+        self.max_shard_size = max_shard_size
+        self.max_shard_records = max_shard_records
+        self.serialize_fn = serialize_fn or pickle.dumps
+
+        dirname = os.path.dirname(path)
+        if dirname and not os.path.exists(dirname):
+            os.makedirs(dirname)
+
+        self._shards = []
+        self._file = None
+        self._offsets = []
+        self._size = 0
+        self._closed = False
+
+    def _open_shard(self):
+        rec_name, _ = _shard_file_names(self.path, len(self._shards))
+        self._file = open(
+            os.path.join(os.path.dirname(self.path), rec_name), 'wb'
+        )
+        self._file.write(_RECORD_MAGIC)
+        self._offsets = []
+        self._size = len(_RECORD_MAGIC)
+
+    def _close_shard(self):
+        rec_name, idx_name = _shard_file_names(self.path, len(self._shards))
+        self._file.close()
+        self._file = None
+        np.array(self._offsets, dtype='<u8').tofile(
+            os.path.join(os.path.dirname(self.path), idx_name)
+        )
+        self._shards.append(
+            {
+                'file': rec_name,
+                'index': idx_name,
+                'num_records': len(self._offsets),
+            }
+        )
+
+    def write(self, sample):
+        """
+        Write a sample into record files.
+
+        Args:
+            sample(object): sample to write, which should be serializable
+                by :attr:`serialize_fn` .
+        """
+        assert not self._closed, "RecordFileWriter has been closed"
+        payload = self.serialize_fn(sample)
+        if self._file is not None and (
+            self._size >= self.max_shard_size
+            or (
+                self.max_shard_records is not None
+                and len(self._offsets) >= self.max_shard_records
+            )
+        ):
+            self._close_shard()
+        if self._file is None:
+            self._open_shard()
+
+        self._offsets.append(self._size)
+        self._file.write(_RECORD_HEADER.pack(len(payload), zlib.crc32(payload)))
+        self._file.write(payload)
+        self._size += _RECORD_HEADER.size + len(payload)
+
+    def close(self):
+        """
+        Close current shard file and save index file.
+        """
+        if self._closed:
+            return
+        if self._file is not None:
+            self._close_shard()
+        index = {'version': _INDEX_VERSION, 'shards': self._shards}
+        tmp_path = self.path + '.index.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(index, f)
+        os.replace(tmp_path, self.path + '.index')
+        self._closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class _PartReader:
+    """
+    Sequential reader of records in a part, a part is a list of segments,
+    each segment is (shard_id, begin, end) for records in range
+    [begin, end) of a shard, records are addressed by position in part.
+    """
+
+    def __init__(self, dataset, segments):
+        self._dataset = dataset
+        self._segments = segments
+        self._starts = np.cumsum([0] + [e - b for _, b, e in segments])
+        self._seg_idx = -1
+        self._remain = 0
+        self._shard_id = None
+        self._file = None
+
+    def seek(self, pos):
+        seg_idx = int(np.searchsorted(self._starts, pos, side='right')) - 1
+        if seg_idx >= len(self._segments):
+            self._seg_idx = len(self._segments)
+            self._remain = 0
+            return
+        shard_id, begin, end = self._segments[seg_idx]
+        record_id = begin + pos - self._starts[seg_idx]
+        if shard_id != self._shard_id:
+            self._close_file()
+            self._file = self._dataset._open_shard(shard_id)
+            self._shard_id = shard_id
+        self._file.seek(int(self._dataset._get_offsets(shard_id)[record_id]))
+        self._seg_idx = seg_idx
+        self._remain = end - record_id
+
+    def next(self):
+        while self._remain <= 0:
+            if self._seg_idx + 1 >= len(self._segments):
+                raise StopIteration
+            self.seek(int(self._starts[self._seg_idx + 1]))
+        self._remain -= 1
+        return self._dataset._read_record(self._file)
+
+    def read_at(self, pos):
+        self.seek(pos)
+        return self.next()
+
+    def _close_file(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self._shard_id = None
+
+    def close(self):
+        self._close_file()
+
+
+class RecordFileDataset(IterableDataset):
+    """
+    Iterable dataset to load samples from sharded record files saved by
+    :ref:`api_paddle_io_RecordFileWriter` .
+
+    Records of all shards are viewed as a sequence, which is splitted into
+    contiguous parts evenly for all readers, a reader is a DataLoader
+    worker of a trainer, readers are identified by rank of trainer and
+    worker id from :code:`paddle.io.get_worker_info` . Each reader only
+    opens shards its part covers and reads records sequentially with
+    large buffered I/O or mmap, which avoids overhead of opening millions
+    of small files.
+
+    If :attr:`shuffle` is set, shard order is shuffled by :attr:`seed` and
+    epoch before splitting parts, which is the same for all readers, and
+    samples of each reader are shuffled within a window of
+    :attr:`shuffle_window` samples. Call :code:`set_epoch` before each epoch
+    to generate different orders.
+
+    Samples yielded by a reader is deterministic for given epoch, so
+    iteration can be resumed exactly by :code:`state_dict` and
+    :code:`set_state_dict` , state of each part contains shard id and
+    record offset in shard of next record to read, and the yielded sample
+    number of the part, which is used to rebuild shuffle window.
+
+    Args:
+        path(str): path prefix of record files, which is the :attr:`path`
+            of :ref:`api_paddle_io_RecordFileWriter` .
+        decode_fn(callable, optional): function to decode record bytes into
+            sample. Default :code:`pickle.loads` .
+        shuffle(bool, optional): whether to shuffle shard order and samples
+            within window. Default False.
+        shuffle_window(int, optional): sample number of shuffle window.
+            Default 1024.
+        seed(int, optional): random seed for shuffling. Default 0.
+        num_replicas(int, optional): trainer number in distributed training.
+            If :attr:`num_replicas` is None, :attr:`num_replicas` will be
+            retrieved from :ref:`api_paddle_distributed_ParallelEnv` .
+            Default None.
+        rank(int, optional): rank of current trainer. If :attr:`rank` is
+            None, :attr:`rank` is retrieved from
+            :ref:`api_paddle_distributed_ParallelEnv` . Default None.
+        buffer_size(int, optional): buffer byte size of shard file reading.
+            Default 16MB.
+        use_mmap(bool, optional): whether to read shard files by mmap
+            instead of buffered I/O. Default False.
+        check_crc(bool, optional): whether to check crc32 of records.
+            Default False.
+
+    Examples:
+
+        .. code-block:: python
+
+            import paddle
+            from paddle.io import DataLoader, RecordFileDataset
+
+            # records saved by example of paddle.io.RecordFileWriter
+            dataset = RecordFileDataset('./data/train', shuffle=True)
+            loader = DataLoader(dataset, batch_size=16, num_workers=2)
+
+            for epoch in range(2):
+                dataset.set_epoch(epoch)
+                for image, label in loader():
+                    pass
+
+    """
+
+    def __init__(
+        self,
+        path,
+        decode_fn=None,
+        shuffle=False,
+        shuffle_window=1024,
+        seed=0,
+        num_replicas=None,
+        rank=None,
+        buffer_size=16 << 20,
+        use_mmap=False,
+        check_crc=False,
+    ):
+        with open(path + '.index', 'r') as f:
+            index = json.load(f)
+        assert (
+            index.get('version', None) == _INDEX_VERSION
+        ), "unsupported record file index version {}".format(
+            index.get('version', None)
+        )
+        self.path = path
+        self.shards = index['shards']
+        self.num_records = sum(s['num_records'] for s in self.shards)
+
+        assert isinstance(shuffle, bool), "shuffle should be a boolean value"
+        assert (
+            isinstance(shuffle_window, int) and shuffle_window > 0
+        ), "shuffle_window should be a positive integer"
+        self.decode_fn = decode_fn or pickle.loads
+        self.shuffle = shuffle
+        self.shuffle_window = shuffle_window
+        self.seed = seed
+        self.buffer_size = buffer_size
+        self.use_mmap = use_mmap
+        self.check_crc = check_crc
+
+        if num_replicas is None or rank is None:
+            from paddle.fluid.dygraph.parallel import ParallelEnv
+
+        if num_replicas is not None:
+            assert (
+                isinstance(num_replicas, int) and num_replicas > 0
+            ), "num_replicas should be a positive integer"
+            self.nranks = num_replicas
+        else:
+            self.nranks = ParallelEnv().nranks
+
+        if rank is not None:
+            assert (
+                isinstance(rank, int) and rank >= 0
+            ), "rank should be a non-negative integer"
+            self.local_rank = rank
+        else:
+            self.local_rank = ParallelEnv().local_rank
+
+        self.epoch = 0
+        # yielded sample number of each part in current epoch, keyed by
+        # part id, only records parts iterated in current process
+        self._num_yielded = {}
+        self._num_parts = None
+        self._offsets = {}
+        self._num_skip_samples = None
+
+    def set_epoch(self, epoch):
+        """
+        Sets the epoch number, which is used as random seed of shuffling
+        together with :attr:`seed` , and resets iteration state.
+
+        Args:
+            epoch(int): epoch number.
+        """
+        self.epoch = epoch
+        self._num_yielded = {}
+
+    def _get_offsets(self, shard_id):
+        if shard_id not in self._offsets:
+            self._offsets[shard_id] = np.fromfile(
+                os.path.join(
+                    os.path.dirname(self.path), self.shards[shard_id]['index']
+                ),
+                dtype='<u8',
+            )
+        return self._offsets[shard_id]
+
+    def _open_shard(self, shard_id):
+        file_path = os.path.join(
+            os.path.dirname(self.path), self.shards[shard_id]['file']
+        )
+        if self.use_mmap:
+            with open(file_path, 'rb') as f:
+                return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return open(file_path, 'rb', buffering=self.buffer_size)
+
+    def _read_record(self, f):
+        length, crc = _RECORD_HEADER.unpack(f.read(_RECORD_HEADER.size))
+        payload = f.read(length)
+        if self.check_crc and zlib.crc32(payload) != crc:
+            raise RuntimeError(
+                "record crc check failed in {}".format(self.path)
+            )
+        return self.decode_fn(payload)
+
+    def _get_part(self):
+        worker_info = get_worker_info()
+        if worker_info is None:
+            num_workers, worker_id = 1, 0
+        else:
+            num_workers, worker_id = worker_info.num_workers, worker_info.id
+        return (
+            self.local_rank * num_workers + worker_id,
+            self.nranks * num_workers,
+        )
+
+    def _get_segments(self, part_id, num_parts):
+        shard_ids = list(range(len(self.shards)))
+        if self.shuffle:
+            rng = np.random.RandomState(self.seed + self.epoch)
+            rng.shuffle(shard_ids)
+
+        begin = self.num_records * part_id // num_parts
+        end = self.num_records * (part_id + 1) // num_parts
+        segments = []
+        start = 0
+        for shard_id in shard_ids:
+            num_records = self.shards[shard_id]['num_records']
+            seg_begin = max(begin, start) - start
+            seg_end = min(end, start + num_records) - start
+            if seg_begin < seg_end:
+                segments.append((shard_id, seg_begin, seg_end))
+            start += num_records
+        return segments
+
+    def __iter__(self):
+        part_id, num_parts = self._get_part()
+        if self._num_parts is not None and self._num_parts != num_parts:
+            raise ValueError(
+                "state of RecordFileDataset is saved with {} readers, but "
+                "{} readers are used".format(self._num_parts, num_parts)
+            )
+        self._num_parts = num_parts
+        if self._num_skip_samples is not None:
+            self._num_yielded[part_id] = self._num_skip_samples
+            self._num_skip_samples = None
+        skip = self._num_yielded.get(part_id, 0)
+
+        reader = _PartReader(self, self._get_segments(part_id, num_parts))
+        total = int(reader._starts[-1])
+        try:
+            if self.shuffle and self.shuffle_window > 1:
+                rng = np.random.RandomState(
+                    (self.seed + self.epoch) * num_parts + part_id
+                )
+                samples = self._iter_shuffled(reader, total, skip, rng)
+            else:
+                samples = self._iter_sequential(reader, total, skip)
+            for sample in samples:
+                self._num_yielded[part_id] = (
+                    self._num_yielded.get(part_id, 0) + 1
+                )
+                yield sample
+            # part finished, iterate from beginning for next time
+            self._num_yielded.pop(part_id, None)
+            if len(self._num_yielded) == 0:
+                self._num_parts = None
+        finally:
+            reader.close()
+
+    def _skip_samples(self, num_samples):
+        # called by DataLoader resuming iteration, see
+        # DataLoader.state_dict, sample number consumed is recorded
+        # by DataLoader for the part of next iteration
+        self._num_skip_samples = num_samples
+
+    def _iter_sequential(self, reader, total, skip):
+        if skip >= total:
+            return
+        reader.seek(skip)
+        for _ in range(skip, total):
+            yield reader.next()
+
+    def _iter_shuffled(self, reader, total, skip, rng):
+        # NOTE: shuffle is simulated by record positions before skipped
+        # samples are all yielded, so that resuming only needs to read
+        # records in shuffle window by random access, and continues
+        # reading sequentially after that.
+        window = min(self.shuffle_window, total)
+        positions = list(range(window))
+        samples = None
+        pos = window
+        yielded = 0
+
+        def _load_window():
+            loaded = [reader.read_at(p) for p in positions]
+            reader.seek(pos)
+            return loaded
+
+        while pos < total:
+            idx = rng.randint(window)
+            if yielded >= skip:
+                if samples is None:
+                    samples = _load_window()
+                yield samples[idx]
+                samples[idx] = reader.next()
+            positions[idx] = pos
+            pos += 1
+            yielded += 1
+
+        for idx in rng.permutation(window):
+            if yielded >= skip:
+                if samples is None:
+                    samples = _load_window()
+                yield samples[idx]
+            yielded += 1
+
+    def state_dict(self):
+        """
+        Get iteration state of parts iterated in current process.
+
+        Returns:
+            dict: iteration state, contains epoch, reader number and state
+                of each part, part state contains :code:`shard` and
+                :code:`offset` for the next record to read, and
+                :code:`num_yielded` for yielded sample number.
+        """
+        parts = {}
+        for part_id, num_yielded in self._num_yielded.items():
+            segments = self._get_segments(part_id, self._num_parts)
+            shard, offset = None, None
+            remain = num_yielded
+            if self.shuffle and self.shuffle_window > 1:
+                # records in shuffle window have been read
+                remain += self.shuffle_window
+            for shard_id, begin, end in segments:
+                if remain < end - begin:
+                    shard, offset = shard_id, begin + remain
+                    break
+                remain -= end - begin
+            parts[part_id] = {
+                'shard': shard,
+                'offset': offset,
+                'num_yielded': num_yielded,
+            }
+        return {
+            'epoch': self.epoch,
+            'num_parts': self._num_parts,
+            'parts': parts,
+        }
+
+    def set_state_dict(self, state_dict):
+        """
+        Set iteration state to resume iteration, should be called before
+        creating DataLoader iterator.
+
+        Args:
+            state_dict(dict): state from :code:`state_dict` , states of
+                multiple processes can be merged by updating :code:`parts` .
+        """
+        self.epoch = state_dict['epoch']
+        self._num_parts = state_dict['num_parts']
+        self._num_yielded = {
+            int(part_id): part['num_yielded']
+            for part_id, part in state_dict['parts'].items()
+        }
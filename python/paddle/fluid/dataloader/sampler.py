@@ -36,6 +36,12 @@ class Sampler:
 
     :code:`__len__`: the number of sample in :attr:`data_source`
 
+    Samplers with random state should also implement :code:`state_dict` and
+    :code:`set_state_dict` to support resuming iteration of DataLoader,
+    :code:`state_dict` returns the state which current iteration started
+    from, or next iteration will start from if not iterating, and
+    :code:`set_state_dict` sets the state next iteration starts from.
+
 
     Args:
         data_source(Dataset, optional): this could be an instance of
@@ -90,6 +96,24 @@ class Sampler:
     def __iter__(self):
         raise NotImplementedError
 
+    def state_dict(self):
+        """
+        Get the state next iteration will start from.
+
+        Returns:
+            dict: sampler state, empty for samplers without random state.
+        """
+        return {}
+
+    def set_state_dict(self, state_dict):
+        """
+        Set the state next iteration starts from.
+
+        Args:
+            state_dict(dict): sampler state from :code:`state_dict` .
+        """
+        pass
+
     # Not define __len__ method in this base class here for __len__
     # is not needed in same sence, e.g. paddle.io.IterableDataset
 
@@ -194,6 +218,7 @@ class RandomSampler(Sampler):
         self.replacement = replacement
         self._num_samples = num_samples
         self.generator = generator
+        self._seed = None
 
         if not isinstance(self.replacement, bool):
             raise TypeError(
@@ -218,32 +243,74 @@ class RandomSampler(Sampler):
             return len(self.data_source)
         return self._num_samples
 
+    def state_dict(self):
+        """
+        Get the state next iteration will start from, which is the seed of
+        random state sampling indices from. The seed is drawn from numpy
+        global random state once for each iteration, either here or when
+        the iteration starts, and kept until the iteration starts. Random
+        state can not be got if :attr:`generator` is set.
+
+        Returns:
+            dict: sampler state.
+        """
+        if self.generator:
+            return {}
+        if self._seed is None:
+            self._seed = _draw_seed()
+        return {'seed': self._seed}
+
+    def set_state_dict(self, state_dict):
+        """
+        Set the state next iteration starts from, indices will be sampled
+        from a random state of the given seed.
+
+        Args:
+            state_dict(dict): sampler state from :code:`state_dict` .
+        """
+        self._seed = state_dict.get('seed', None)
+
     def __iter__(self):
-        n = len(self.data_source)
         if self.generator:
-            for i in range(self.num_samples):
-                try:
-                    index = next(self.generator)
-                except StopIteration:
-                    return
+            return self._generator_iter()
+        # seed is drawn when iteration starts instead of first next,
+        # and numpy global random state is not changed except the draw
+        seed = self._seed if self._seed is not None else _draw_seed()
+        self._seed = None
+        return self._random_iter(np.random.RandomState(seed))
+
+    def _generator_iter(self):
+        for i in range(self.num_samples):
+            try:
+                index = next(self.generator)
+            except StopIteration:
+                return
+            yield index
+
+    def _random_iter(self, random_state):
+        n = len(self.data_source)
+        if self.replacement:
+            for index in random_state.choice(
+                np.arange(n), self.num_samples, replace=True
+            ).tolist():
                 yield index
         else:
-            if self.replacement:
-                for index in np.random.choice(
-                    np.arange(n), self.num_samples, replace=True
-                ).tolist():
-                    yield index
-            else:
-                for index in np.random.choice(
-                    np.arange(n), n, replace=False
-                ).tolist():
-                    yield index
+            for index in random_state.choice(
+                np.arange(n), n, replace=False
+            ).tolist():
+                yield index
 
     def __len__(self):
         return self.num_samples
 
 
-def _weighted_sample(weights, num_samples, replacement=True):
+def _draw_seed():
+    return np.random.randint(0, 2**31 - 1)
+
+
+def _weighted_sample(
+    weights, num_samples, replacement=True, random_state=np.random
+):
     if isinstance(weights, core.LoDTensor):
         weights = weights.numpy()
     if isinstance(weights, (list, tuple)):
@@ -268,7 +335,7 @@ def _weighted_sample(weights, num_samples, replacement=True):
     weights = weights / weights.sum(axis=1)
     rets = []
     for i in range(weights.shape[0]):
-        ret = np.random.choice(
+        ret = random_state.choice(
             weights.shape[1], num_samples, replacement, weights[i]
         )
         rets.append(ret)
@@ -312,13 +379,38 @@ class WeightedRandomSampler(Sampler):
         self.weights = weights
         self.num_samples = num_samples
         self.replacement = replacement
+        self._seed = None
+
+    def state_dict(self):
+        if self._seed is None:
+            self._seed = _draw_seed()
+        return {'seed': self._seed}
+
+    def set_state_dict(self, state_dict):
+        self._seed = state_dict.get('seed', None)
 
     def __iter__(self):
+        seed = self._seed if self._seed is not None else _draw_seed()
+        self._seed = None
         idxs = _weighted_sample(
-            self.weights, self.num_samples, self.replacement
+            self.weights,
+            self.num_samples,
+            self.replacement,
+            np.random.RandomState(seed),
         )
         return iter(idxs.reshape((-1)).tolist())
 
     def __len__(self):
         mul = np.prod(self.weights.shape) // self.weights.shape[-1]
         return self.num_samples * mul
+
+
+def _get_sampler_state(sampler):
+    if hasattr(sampler, 'state_dict'):
+        return sampler.state_dict()
+    return None
+
+
+def _set_sampler_state(sampler, state_dict):
+    if state_dict is not None and hasattr(sampler, 'set_state_dict'):
+        sampler.set_state_dict(state_dict)
@@ -0,0 +1,256 @@
+#   Copyright (c) 2022 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import queue
+import numpy as np
+
+from .. import core
+
+# NOTE: [ shared memory slab transport ] In default shared memory mode,
+# each numpy field of a batch is copied into a LoDTensor in worker
+# process, and moved into a new memory-mapped file when the LoDTensor
+# is pickled into the inter-process queue, the memory-mapped file is
+# unlinked after main process consumed the batch. Slab transport
+# allocates a pool of shared memory slabs in each worker instead, a
+# slab is a list of LoDTensors in shared memory with the layout of the
+# first batch, worker writes flattened batch into a free slab and only
+# send slab id and batch dims to main process, main process maps the
+# slab only once and wraps it as LoDTensors without copying, slab will
+# be sent back to worker for reusing after the batch is consumed.
+
+
+class _SlabBatch:
+    """
+    Message sent from worker to main process instead of tensor list
+    when batch is written into a shared memory slab.
+
+    Args:
+        worker_id(int): id of worker which owns the slab.
+        slab_id(int): slab id in the slab pool of the worker.
+        dims(list): real shape of each field of the batch.
+        metas(list|None): shared memory meta infos of each field
+            tensor of slab, only sent at the first time the slab is
+            used, None for the slab has been mapped by main process.
+    """
+
+    def __init__(self, worker_id, slab_id, dims, metas=None):
+        self.worker_id = worker_id
+        self.slab_id = slab_id
+        self.dims = dims
+        self.metas = metas
+
+
+class _SharedMemorySlabPool:
+    """
+    Shared memory slab pool in worker process, slabs are allocated
+    lazily with the layout of the first batch which can be written
+    into slab, at most :attr:`slab_num` slabs will be allocated.
+
+    Args:
+        worker_id(int): worker id.
+        slab_num(int): max slab number of this worker.
+        release_queue(multiprocessing.Queue): queue to receive slab
+            ids released by main process.
+    """
+
+    def __init__(self, worker_id, slab_num, release_queue):
+        self._worker_id = worker_id
+        self._slab_num = slab_num
+        self._release_queue = release_queue
+
+        # each slab is a list of (lodtensor, numpy view) of fields
+        self._slabs = []
+        self._free_slab_ids = []
+        # slab ids whose shared memory metas not sent to main process
+        self._unsent_slab_ids = set()
+        # slab acquired by allocate for collating batch into it
+        self._pending_slab_id = None
+        self._shapes = None
+        self._dtypes = None
+
+    def _recycle(self):
+        while True:
+            try:
+                slab_id = self._release_queue.get_nowait()
+            except queue.Empty:
+                break
+            self._free_slab_ids.append(slab_id)
+
+    def _init_layout(self, batch):
+        for field in batch:
+            if (
+                not isinstance(field, np.ndarray)
+                or field.ndim == 0
+                or field.size == 0
+            ):
+                return False
+        self._shapes = [field.shape for field in batch]
+        self._dtypes = [field.dtype for field in batch]
+        return True
+
+    def _match_layout(self, shapes, dtypes):
+        if len(shapes) != len(self._shapes):
+            return False
+        for shape, dtype, slab_shape, slab_dtype in zip(
+            shapes, dtypes, self._shapes, self._dtypes
+        ):
+            if (
+                dtype != slab_dtype
+                or len(shape) != len(slab_shape)
+                or shape[0] > slab_shape[0]
+                or tuple(shape[1:]) != slab_shape[1:]
+            ):
+                return False
+        return True
+
+    def _acquire_slab(self):
+        if self._pending_slab_id is not None:
+            slab_id = self._pending_slab_id
+            self._pending_slab_id = None
+            return slab_id
+        self._recycle()
+        if len(self._free_slab_ids) > 0:
+            return self._free_slab_ids.pop()
+        if len(self._slabs) < self._slab_num:
+            slab_id = self._alloc_slab()
+            self._unsent_slab_ids.add(slab_id)
+            return slab_id
+        return None
+
+    def allocate(self, batch_size, shapes, dtypes):
+        """
+        Allocator for :code:`_CollateEngine` to collate batch into a
+        free slab directly, the slab will be sent by following :code:`put`.
+
+        Args:
+            batch_size(int): batch size.
+            shapes(list): shapes of numeric fields in flattened order.
+            dtypes(list): dtypes of numeric fields in flattened order.
+
+        Returns:
+            list|None: numpy views of a free slab for each field, None if
+                no slab free or slab layout not matched.
+        """
+        if self._shapes is None or not self._match_layout(shapes, dtypes):
+            return None
+        slab_id = self._acquire_slab()
+        if slab_id is None:
+            return None
+        self._pending_slab_id = slab_id
+        return [view[:batch_size] for _, view in self._slabs[slab_id]]
+
+    def _alloc_slab(self):
+        slab = []
+        for shape, dtype in zip(self._shapes, self._dtypes):
+            lodtensor = core.LoDTensor()
+            lodtensor.set(np.empty(shape, dtype=dtype), core.CPUPlace())
+            # move tensor into shared memory, numpy view is created
+            # after this to point to the shared memory
+            lodtensor._share_filename()
+            slab.append((lodtensor, np.asarray(lodtensor)))
+        self._slabs.append(slab)
+        return len(self._slabs) - 1
+
+    def put(self, batch):
+        """
+        Write flattened batch into a free slab.
+
+        Args:
+            batch(list): flattened batch from :code:`_flatten_batch`.
+
+        Returns:
+            _SlabBatch|None: slab message to be sent to main process, None
+                if batch cannot be written into slab, e.g. batch layout not
+                match with slab, or no slab free, batch should be sent by
+                default shared memory mode.
+        """
+        if self._slab_num <= 0 or len(batch) == 0:
+            return None
+
+        if self._shapes is None and not self._init_layout(batch):
+            return None
+        if not all(isinstance(field, np.ndarray) for field in batch):
+            matched = False
+        else:
+            matched = self._match_layout(
+                [field.shape for field in batch],
+                [field.dtype for field in batch],
+            )
+        if not matched:
+            # batch may be collated by default_collate_fn after slab
+            # allocated, put the pending slab back to free list
+            if self._pending_slab_id is not None:
+                self._free_slab_ids.append(self._pending_slab_id)
+                self._pending_slab_id = None
+            return None
+
+        slab_id = self._acquire_slab()
+        if slab_id is None:
+            return None
+
+        dims = []
+        for field, (_, view) in zip(batch, self._slabs[slab_id]):
+            # skip copying if batch is collated into slab directly
+            if not _is_slab_view(field, view):
+                view[: field.shape[0]] = field
+            dims.append(list(field.shape))
+
+        metas = None
+        if slab_id in self._unsent_slab_ids:
+            self._unsent_slab_ids.remove(slab_id)
+            metas = [t._share_filename() for t, _ in self._slabs[slab_id]]
+        return _SlabBatch(self._worker_id, slab_id, dims, metas)
+
+
+def _is_slab_view(field, view):
+    return (
+        field.__array_interface__['data'][0]
+        == view.__array_interface__['data'][0]
+        and field.flags['C_CONTIGUOUS']
+    )
+
+
+class _SharedMemorySlabCache:
+    """
+    Mapped shared memory slabs of all workers in main process.
+
+    Args:
+        release_queues(list): release queue for each worker, slab id
+            will be put into the queue when releasing slab.
+    """
+
+    def __init__(self, release_queues):
+        self._release_queues = release_queues
+        self._slabs = {}
+
+    def get_tensors(self, slab_batch):
+        key = (slab_batch.worker_id, slab_batch.slab_id)
+        if slab_batch.metas is not None:
+            self._slabs[key] = [
+                core.LoDTensor._new_shared_filename(meta)
+                for meta in slab_batch.metas
+            ]
+        tensors = []
+        for tensor, dims in zip(self._slabs[key], slab_batch.dims):
+            if tensor.shape()[0] != dims[0]:
+                tensor = tensor._slice(0, dims[0])
+            tensors.append(tensor)
+        return tensors
+
+    def release(self, slab_batch):
+        if slab_batch is not None:
+            self._release_queues[slab_batch.worker_id].put(slab_batch.slab_id)
+
+    def clear(self):
+        self._slabs = {}
@@ -14,6 +14,8 @@
 
 import os
 import sys
+import copy
+import threading
 import paddle
 import numpy as np
 import traceback
@@ -27,6 +29,8 @@ from ..multiprocess_utils import (
 )
 from ..framework import _non_static_mode, _in_eager_without_dygraph_check
 from .flat import _flatten_batch
+from .slab import _SharedMemorySlabPool
+from .collate import _CollateEngine
 
 import queue
 
@@ -48,7 +52,12 @@ class _DatasetKind:
 
     @staticmethod
     def create_fetcher(
-        kind, dataset, auto_collate_batch, collate_fn, drop_last
+        kind,
+        dataset,
+        auto_collate_batch,
+        collate_fn,
+        drop_last,
+        num_skip_samples=0,
     ):
         if kind == _DatasetKind.MAP:
             return _MapDatasetFetcher(
@@ -56,7 +65,11 @@ class _DatasetKind:
             )
         elif kind == _DatasetKind.ITER:
             return _IterableDatasetFetcher(
-                dataset, auto_collate_batch, collate_fn, drop_last
+                dataset,
+                auto_collate_batch,
+                collate_fn,
+                drop_last,
+                num_skip_samples,
             )
         else:
             raise NotImplementedError("unknown Dataset kind {}".format(kind))
@@ -77,6 +90,11 @@ class ParentWatchDog:
 # for IteratorDataset in worker processes.
 _worker_info = None
 
+# worker information for worker threads in thread worker mode, worker
+# threads share _worker_info global variable in same process, so store
+# worker information in thread local storage
+_thread_local = threading.local()
+
 
 def get_worker_info():
     """
@@ -89,6 +107,10 @@ def get_worker_info():
 
     :attr:`id`: the worker processs id, count from 0 to :attr:`num_workers - 1`
 
+    .. note::
+        In thread worker mode(:attr:`worker_mode='thread'` in `paddle.io.DataLoader`),
+        this function returns information of the worker thread it is called in.
+
     :attr:`dataset`: the dataset object in this worker process
 
     Returns:
@@ -141,7 +163,7 @@ def get_worker_info():
             # outputs: [2, 5, 3, 6, 4, 7]
 
     """
-    return _worker_info
+    return getattr(_thread_local, "worker_info", None) or _worker_info
 
 
 class WorkerInfo:
@@ -261,6 +283,115 @@ def _generate_states(base_seed=0, worker_id=0):
     return states
 
 
+class _WorkerFetchLoop:
+    """
+    Fetches batches of the indices got by a worker, shared by worker
+    processes and worker threads. Errors raised by :attr:`init_fn` or
+    fetching are sent to the main process as :code:`_WorkerException`,
+    and fetched batches are sent by :attr:`put_batch` of each worker.
+    """
+
+    def __init__(
+        self,
+        dataset,
+        dataset_kind,
+        out_queue,
+        done_event,
+        auto_collate_batch,
+        collate_fn,
+        drop_last,
+        init_fn,
+        worker_id,
+        num_skip_samples=0,
+        fetch_place=None,
+    ):
+        self._dataset = dataset
+        self._dataset_kind = dataset_kind
+        self._out_queue = out_queue
+        self._done_event = done_event
+        self._auto_collate_batch = auto_collate_batch
+        self._collate_fn = collate_fn
+        self._worker_id = worker_id
+        self._fetch_place = fetch_place
+        self._iterator_drained = False
+
+        self._init_exception = None
+        try:
+            if init_fn is not None:
+                init_fn(worker_id)
+            self._fetcher = _DatasetKind.create_fetcher(
+                dataset_kind,
+                dataset,
+                auto_collate_batch,
+                collate_fn,
+                drop_last,
+                num_skip_samples,
+            )
+        except:
+            self._init_exception = _WorkerException(worker_id)
+
+    def _fetch(self, indices):
+        if self._fetch_place is None:
+            return self._fetcher.fetch(indices, self._done_event)
+        with paddle.fluid.dygraph.guard(place=self._fetch_place):
+            return self._fetcher.fetch(indices, self._done_event)
+
+    def step(self, data, put_batch):
+        """
+        Handles data got from indices queue, calls :attr:`put_batch` with
+        index and fetched batch if there is one, and returns False if the
+        worker should exit.
+        """
+        if isinstance(data, _ResumeIteration):
+            self._out_queue.put((data, None, None))
+            self._iterator_drained = False
+            self._fetcher = _DatasetKind.create_fetcher(
+                self._dataset_kind,
+                self._dataset,
+                self._auto_collate_batch,
+                self._collate_fn,
+                True,
+            )
+            return True
+
+        # None as poison piil, so worker event should be set
+        if data is None:
+            assert (
+                self._done_event.is_set() or self._iterator_drained
+            ), "get None when worker done_event set"
+            return False
+        # If worker done event is set but get still get data in
+        # indices_queue, remaining data should be get and skipped.
+        if self._done_event.is_set() or self._iterator_drained:
+            return True
+
+        idx, indices = data
+        if self._init_exception is not None:
+            self._out_queue.put((idx, self._init_exception, None))
+            self._init_exception = None
+            return True
+        try:
+            batch = self._fetch(indices)
+        except Exception as e:
+            if (
+                isinstance(e, StopIteration)
+                and self._dataset_kind == _DatasetKind.ITER
+            ):
+                self._out_queue.put(
+                    _IterableDatasetStopIteration(self._worker_id)
+                )
+                self._iterator_drained = True
+            else:
+                self._out_queue.put(
+                    (idx, _WorkerException(self._worker_id), None)
+                )
+        else:
+            # fetching stopped as the worker is done
+            if batch is not None:
+                put_batch(idx, batch)
+        return True
+
+
 def _worker_loop(
     dataset,
     dataset_kind,
@@ -275,6 +406,9 @@ def _worker_loop(
     num_workers,
     use_shared_memory,
     base_seed,
+    slab_num=0,
+    slab_release_queue=None,
+    num_skip_samples=0,
 ):
     try:
         # NOTE: [ mmap files clear ] When the child process exits unexpectedly,
@@ -307,17 +441,59 @@ def _worker_loop(
             seed=base_seed,
         )
 
-        init_exception = None
-        try:
-            if init_fn is not None:
-                init_fn(worker_id)
-            fetcher = _DatasetKind.create_fetcher(
-                dataset_kind, dataset, auto_collate_batch, collate_fn, drop_last
+        # NOTE: GPU tensor operation is not supported in sub-process
+        #       but default device is GPU in paddle-gpu version, which
+        #       may copy CPU tensor to GPU even if users want to use
+        #       CPU tensor operation, so we add CPUPlace guard here
+        #       to make sure tensor will be operated only on CPU
+        fetch_loop = _WorkerFetchLoop(
+            dataset,
+            dataset_kind,
+            out_queue,
+            done_event,
+            auto_collate_batch,
+            collate_fn,
+            drop_last,
+            init_fn,
+            worker_id,
+            num_skip_samples,
+            fetch_place=paddle.CPUPlace(),
+        )
+
+        # NOTE: see [ shared memory slab transport ] in slab.py
+        slab_pool = None
+        if use_shared_memory and slab_num > 0:
+            slab_pool = _SharedMemorySlabPool(
+                worker_id, slab_num, slab_release_queue
             )
-        except:
-            init_exception = _WorkerException(worker_id)
+            # collate batch into slab directly to avoid copying
+            if isinstance(collate_fn, _CollateEngine):
+                collate_fn.set_allocator(slab_pool.allocate)
+
+        def put_batch(idx, batch):
+            batch, structure = _flatten_batch(batch)
+            slab_batch = None
+            if slab_pool is not None:
+                slab_batch = slab_pool.put(batch)
+            if slab_batch is not None:
+                out_queue.put((idx, slab_batch, structure))
+            elif use_shared_memory:
+
+                def numpy2lodtensor(arr):
+                    lodtensor = core.Tensor()
+                    lodtensor.set(arr, core.CPUPlace())
+                    return lodtensor
+
+                tensor_list = [
+                    numpy2lodtensor(b)
+                    if isinstance(b, np.ndarray)
+                    else b.value().get_tensor()
+                    for b in batch
+                ]
+                out_queue.put((idx, tensor_list, structure))
+            else:
+                out_queue.put((idx, batch, structure))
 
-        iterator_drained = False
         parent_watch_dog = ParentWatchDog()
 
         while parent_watch_dog.is_alive():
@@ -326,67 +502,8 @@ def _worker_loop(
             except queue.Empty:
                 continue
 
-            if isinstance(data, _ResumeIteration):
-                out_queue.put((data, None, None))
-                iterator_drained = False
-                fetcher = _DatasetKind.create_fetcher(
-                    dataset_kind, dataset, auto_collate_batch, collate_fn, True
-                )
-                continue
-
-            # None as poison piil, so worker event should be set
-            if data is None:
-                assert (
-                    done_event.is_set() or iterator_drained
-                ), "get None when worker done_event set"
+            if not fetch_loop.step(data, put_batch):
                 break
-            # If worker done event is set but get still get data in
-            # indices_queue, remaining data should be get and skipped.
-            if done_event.is_set() or iterator_drained:
-                continue
-
-            idx, indices = data
-            try:
-                if init_exception is not None:
-                    batch = init_exception
-                    init_exception = None
-                else:
-                    # NOTE: GPU tensor operation is not supported in sub-process
-                    #       but default device is GPU in paddle-gpu version, which
-                    #       may copy CPU tensor to GPU even if users want to use
-                    #       CPU tensor operation, so we add CPUPlace guard here
-                    #       to make sure tensor will be operated only on CPU
-                    with paddle.fluid.dygraph.guard(place=paddle.CPUPlace()):
-                        batch = fetcher.fetch(indices)
-            except Exception as e:
-                if (
-                    isinstance(e, StopIteration)
-                    and dataset_kind == _DatasetKind.ITER
-                ):
-                    out_queue.put(_IterableDatasetStopIteration(worker_id))
-                    iterator_drained = True
-                else:
-                    out_queue.put((idx, _WorkerException(worker_id), None))
-            else:
-                if isinstance(batch, _WorkerException):
-                    out_queue.put((idx, batch, None))
-                batch, structure = _flatten_batch(batch)
-                if use_shared_memory:
-
-                    def numpy2lodtensor(arr):
-                        lodtensor = core.Tensor()
-                        lodtensor.set(arr, core.CPUPlace())
-                        return lodtensor
-
-                    tensor_list = [
-                        numpy2lodtensor(b)
-                        if isinstance(b, np.ndarray)
-                        else b.value().get_tensor()
-                        for b in batch
-                    ]
-                    out_queue.put((idx, tensor_list, structure))
-                else:
-                    out_queue.put((idx, batch, structure))
     except KeyboardInterrupt:
         # NOTE: Main process will raise KeyboardInterrupt anyways, ignore it in child process
         pass
@@ -395,3 +512,65 @@ def _worker_loop(
     finally:
         if use_shared_memory:
             _cleanup_mmap()
+
+
+def _thread_worker_loop(
+    dataset,
+    dataset_kind,
+    indices_queue,
+    out_queue,
+    done_event,
+    auto_collate_batch,
+    collate_fn,
+    drop_last,
+    init_fn,
+    worker_id,
+    num_workers,
+    base_seed,
+    num_skip_samples=0,
+):
+    """
+    Worker loop in thread worker mode, same as :code:`_worker_loop` except
+    that process level settings(signal handler, random seed, shared memory)
+    are not performed, and batches are put into :attr:`out_queue` directly.
+    """
+    # NOTE: worker threads share dataset object, copy iterable dataset
+    #       for each worker to iterate and be splitted separately, e.g.
+    #       by modifying attributes of dataset in init_fn
+    if dataset_kind == _DatasetKind.ITER:
+        dataset = copy.copy(dataset)
+
+    _thread_local.worker_info = WorkerInfo(
+        id=worker_id,
+        num_workers=num_workers,
+        dataset=dataset,
+        seed=base_seed,
+    )
+
+    fetch_loop = _WorkerFetchLoop(
+        dataset,
+        dataset_kind,
+        out_queue,
+        done_event,
+        auto_collate_batch,
+        collate_fn,
+        drop_last,
+        init_fn,
+        worker_id,
+        num_skip_samples,
+    )
+
+    def put_batch(idx, batch):
+        batch, structure = _flatten_batch(batch)
+        out_queue.put((idx, batch, structure))
+
+    while True:
+        try:
+            data = indices_queue.get(timeout=MP_STATUS_CHECK_INTERVAL)
+        except queue.Empty:
+            if done_event.is_set():
+                break
+            continue
+
+        if not fetch_loop.step(data, put_batch):
+            break
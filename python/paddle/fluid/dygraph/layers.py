@@ -22,6 +22,7 @@ import weakref
 import warnings
 from copy import deepcopy
 import inspect
+from concurrent.futures import ThreadPoolExecutor
 
 import paddle
 import paddle.profiler as profiler
@@ -54,6 +55,7 @@ from paddle.fluid.framework import _current_expected_place as _get_device
 from paddle.fluid.core import VarDesc
 from paddle.fluid.dygraph import no_grad
 import paddle.utils.deprecated as deprecated
+from paddle import _C_ops
 
 __all__ = ['Layer']
 
@@ -88,6 +90,137 @@ def _addindent(string, indent):
     return s1[0] + '\n' + '\n'.join(s2)
 
 
+# NOTE: [ state dict index cache ] Structured names of parameters and
+# buffers are cached by Layer for state_dict, and are rebuilt when any
+# Layer is structurally changed, i.e. its parameters, buffers, sublayers or
+# state dict hooks are added, removed or replaced, which is tracked by the
+# version bumped by _LayerItemDict.
+_layer_structure_version = 0
+
+
+def _bump_layer_structure_version():
+    global _layer_structure_version
+    _layer_structure_version += 1
+
+
+class _LayerItemDict(collections.OrderedDict):
+    """
+    OrderedDict holding parameters, buffers, sublayers or hooks of Layer,
+    which bumps the layer structure version when it is modified.
+    """
+
+    def __setitem__(self, key, value):
+        _bump_layer_structure_version()
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key):
+        _bump_layer_structure_version()
+        super().__delitem__(key)
+
+    def pop(self, *args):
+        _bump_layer_structure_version()
+        return super().pop(*args)
+
+    def popitem(self, last=True):
+        _bump_layer_structure_version()
+        return super().popitem(last)
+
+    def clear(self):
+        _bump_layer_structure_version()
+        super().clear()
+
+    def update(self, *args, **kwargs):
+        _bump_layer_structure_version()
+        super().update(*args, **kwargs)
+
+    def setdefault(self, key, default=None):
+        _bump_layer_structure_version()
+        return super().setdefault(key, default)
+
+    def move_to_end(self, key, last=True):
+        _bump_layer_structure_version()
+        super().move_to_end(key, last)
+
+
+_LAYER_ITEM_DICT_NAMES = frozenset(
+    ['_parameters', '_buffers', '_sub_layers', '_state_dict_hooks']
+)
+
+
+# numpy values in set_state_dict larger than it in total are packed into
+# the contiguous buffer by a thread pool
+_STATE_PACK_PARALLEL_BYTES = 64 * 1024 * 1024
+_STATE_PACK_NUM_THREADS = 4
+
+
+def _pack_states(states, dtype):
+    """
+    Packs numpy arrays into a contiguous buffer, and returns the buffer and
+    offsets of arrays.
+    """
+    offsets = [0]
+    for state in states:
+        offsets.append(offsets[-1] + state.size)
+    buffer = np.empty([offsets[-1]], dtype)
+
+    def _pack(idx):
+        buffer[offsets[idx] : offsets[idx + 1]] = states[idx].reshape([-1])
+
+    if buffer.nbytes >= _STATE_PACK_PARALLEL_BYTES:
+        # numpy releases GIL while copying, and reading arrays mapped from
+        # files, e.g. loaded by `paddle.load` , may page in from disk
+        with ThreadPoolExecutor(max_workers=_STATE_PACK_NUM_THREADS) as pool:
+            list(pool.map(_pack, range(len(states))))
+    else:
+        for idx in range(len(states)):
+            _pack(idx)
+    return buffer, offsets
+
+
+@no_grad
+def _set_state_values(matched_param_state):
+    """
+    Sets values of parameters and buffers in dygraph mode. Tensor values on
+    the place of parameters are copied on device instead of via numpy, and
+    numpy values with the same dtype are packed into a contiguous buffer,
+    which is copied to device at once and assigned to parameters.
+    """
+    place = framework._current_expected_place()
+    packed = collections.OrderedDict()
+    for param, state in matched_param_state:
+        if not (param._is_initialized() and param.place._equals(place)):
+            param.set_value(state)
+        elif (
+            isinstance(state, core.eager.Tensor)
+            and state._is_initialized()
+            and state.dtype == param.dtype
+            and state.place._equals(place)
+        ):
+            if state is not param:
+                _C_ops.assign_out_(state, param)
+        elif (
+            isinstance(state, np.ndarray)
+            and state.dtype not in (np.object_, np.uint16)
+            and convert_np_dtype_to_dtype_(state.dtype) == param.dtype
+        ):
+            packed.setdefault(state.dtype, []).append((param, state))
+        else:
+            param.set_value(state)
+
+    for dtype, pairs in packed.items():
+        if len(pairs) == 1:
+            pairs[0][0].set_value(pairs[0][1])
+            continue
+        buffer, offsets = _pack_states([state for _, state in pairs], dtype)
+        buffer = paddle.to_tensor(buffer, place=place)
+        for idx, (param, state) in enumerate(pairs):
+            value = _C_ops.reshape(
+                buffer._slice(offsets[idx], offsets[idx + 1]),
+                list(state.shape),
+            )
+            _C_ops.assign_out_(value, param)
+
+
 class HookRemoveHelper:
     """A HookRemoveHelper that can be used to remove hook."""
 
@@ -154,11 +287,11 @@ class Layer:
         self._dtype = dtype
         self._init_in_dynamic_mode = in_dygraph_mode()
 
-        self._parameters = collections.OrderedDict()
+        self._parameters = _LayerItemDict()
         # Buffers the variable (not parameter) created in layer
-        self._buffers = collections.OrderedDict()
+        self._buffers = _LayerItemDict()
         self._non_persistable_buffer_names_set = set()
-        self._sub_layers = collections.OrderedDict()
+        self._sub_layers = _LayerItemDict()
         self._loaddict_holder = collections.OrderedDict()
 
         # Record generated op_descs in this layer
@@ -170,7 +303,9 @@ class Layer:
 
         self._casted_by_pure_fp16 = False
 
-        self._state_dict_hooks = collections.OrderedDict()
+        self._state_dict_hooks = _LayerItemDict()
+        # see [ state dict index cache ]
+        self._state_dict_cache = {}
         # Records orignal functions after @to_static to support to rollback
         self._original_funcs = collections.OrderedDict()
 
@@ -1219,6 +1354,7 @@ class Layer:
 
     def __setstate__(self, state):
         self.__dict__.update(state)
+        self.__dict__['_state_dict_cache'] = {}
 
     def __getattr__(self, name):
         if '_parameters' in self.__dict__:
@@ -1247,6 +1383,12 @@ class Layer:
 
         if isinstance(getattr(type(self), name, None), property):
             object.__setattr__(self, name, value)
+        if name in _LAYER_ITEM_DICT_NAMES and not isinstance(
+            value, _LayerItemDict
+        ):
+            # keep tracking structure changes, see [ state dict index cache ]
+            _bump_layer_structure_version()
+            value = _LayerItemDict(value)
         params = self.__dict__.get('_parameters', None)
         if isinstance(value, framework.Parameter):
             if params is None:
@@ -1447,15 +1589,11 @@ class Layer:
         if include_sublayers:
             for layer_name, layer_item in self._sub_layers.items():
                 if layer_item is not None:
-                    destination_temp = destination.copy()
-                    destination_temp.update(
-                        layer_item._obtain_parameters_buffers(
-                            destination_temp,
-                            include_sublayers,
-                            structured_name_prefix + layer_name + ".",
-                        )
+                    layer_item._obtain_parameters_buffers(
+                        destination,
+                        include_sublayers,
+                        structured_name_prefix + layer_name + ".",
                     )
-                    destination = destination_temp
         return destination
 
     def _state_dict_impl(
@@ -1476,6 +1614,22 @@ class Layer:
             use_hook(bool, optional) : If true, the operations contained in _state_dict_hooks will be appended to the destination. Default: True
         """
 
+        if destination is None and include_sublayers:
+            entries = self._state_dict_entries(
+                include_non_persistable_buffer, use_hook
+            )
+            if entries is not None:
+                destination = collections.OrderedDict(
+                    (structured_name_prefix + name, tensor)
+                    for name, tensor in entries
+                )
+                if use_hook:
+                    for state_dict_hook in self._state_dict_hooks.values():
+                        hook_result = state_dict_hook(destination)
+                        if hook_result is not None:
+                            destination = hook_result
+                return destination
+
         if destination is None:
             destination = collections.OrderedDict()
         for name, data in self._parameters.items():
@@ -1495,17 +1649,17 @@ class Layer:
         if include_sublayers:
             for layer_name, layer_item in self._sub_layers.items():
                 if layer_item is not None:
-                    destination_temp = destination.copy()
-                    destination_temp.update(
-                        layer_item._state_dict_impl(
-                            destination_temp,
-                            include_sublayers,
-                            structured_name_prefix + layer_name + ".",
-                            include_non_persistable_buffer,
-                            use_hook,
-                        )
+                    # the dict is filled in place, and the result returned
+                    # by state dict hooks of sublayer is merged into it
+                    result = layer_item._state_dict_impl(
+                        destination,
+                        include_sublayers,
+                        structured_name_prefix + layer_name + ".",
+                        include_non_persistable_buffer,
+                        use_hook,
                     )
-                    destination = destination_temp
+                    if result is not destination:
+                        destination.update(result)
         if use_hook:
             for state_dict_hook in self._state_dict_hooks.values():
                 hook_result = state_dict_hook(destination)
@@ -1514,6 +1668,31 @@ class Layer:
 
         return destination
 
+    def _state_dict_entries(self, include_non_persistable_buffer, use_hook):
+        """
+        Returns the cached list of (structured name, tensor) of the Layer
+        tree, or None if it cannot be cached because some sublayers have
+        state dict hooks. See [ state dict index cache ].
+        """
+        cache = self.__dict__.setdefault('_state_dict_cache', {})
+        cached = cache.get(include_non_persistable_buffer)
+        if cached is None or cached[0] != _layer_structure_version:
+            has_sublayer_hooks = any(
+                len(layer._state_dict_hooks) > 0 for layer in self.sublayers()
+            )
+            entries = list(
+                self._state_dict_impl(
+                    collections.OrderedDict(),
+                    include_non_persistable_buffer=include_non_persistable_buffer,
+                    use_hook=False,
+                ).items()
+            )
+            cached = (_layer_structure_version, entries, has_sublayer_hooks)
+            cache[include_non_persistable_buffer] = cached
+        if use_hook and cached[2]:
+            return None
+        return cached[1]
+
     def to_static_state_dict(
         self,
         destination=None,
@@ -1667,8 +1846,7 @@ class Layer:
             if key not in match_keys:
                 unexpected_keys.append(key)
         if in_dygraph_mode():
-            for param, state in matched_param_state:
-                param.set_value(state)
+            _set_state_values(matched_param_state)
         else:
 
             def _set_var(var, ndarray):
@@ -12,7 +12,18 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import collections
+import copy
+import gzip
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from ... import core
 from ...compiler import CompiledProgram
+from ...framework import _non_static_mode
 
 
 class SerializableBase:
@@ -232,3 +243,233 @@ class CheckpointSaver:
             except Exception as e:
                 print(e)
                 continue
+
+
+class AsyncCheckpointSaver:
+    """
+    Save checkpoints of dynamic graph training in background.
+
+    :code:`save` snapshots Tensors of given objects, e.g. :code:`state_dict`
+    of model and optimizer, into host buffers, queues the writing and
+    returns a future immediately. The copies are issued asynchronously into
+    pinned memory buffers for GPU Tensors, so training continues without
+    waiting for copying or writing. A background thread waits for the
+    copies, writes each object to a temporary file in the format of
+    :code:`paddle.save` , optionally compressed by gzip in the same pass,
+    which can be loaded by :code:`paddle.load` directly, renames it to the
+    target path and removes old checkpoints beyond :attr:`max_to_keep` .
+
+    Each pending saving owns a set of snapshot buffers, which is reused by
+    following savings after it is written. At most :attr:`max_pending`
+    savings are pending, :code:`save` waits for the oldest one if the
+    limit is reached, so that host memory of snapshots is bounded.
+
+    Args:
+        max_to_keep(int, optional): max number of checkpoints to keep, old
+            checkpoints saved by this saver will be removed. None for
+            keeping all checkpoints. Default None.
+        compress(bool, optional): whether to compress files by gzip.
+            Default False.
+        protocol(int, optional): pickle protocol of :code:`paddle.save` .
+            Default 4.
+        max_pending(int, optional): max number of savings being written or
+            queued. Default 2.
+
+    Examples:
+
+        .. code-block:: python
+
+            import paddle
+            from paddle.incubate.checkpoint import AsyncCheckpointSaver
+
+            layer = paddle.nn.Linear(10, 10)
+            opt = paddle.optimizer.Adam(parameters=layer.parameters())
+            saver = AsyncCheckpointSaver(max_to_keep=2)
+
+            for step in range(10):
+                loss = layer(paddle.rand([4, 10])).mean()
+                loss.backward()
+                opt.step()
+                opt.clear_grad()
+                if step % 5 == 0:
+                    future = saver.save(
+                        {'.pdparams': layer.state_dict(),
+                         '.pdopt': opt.state_dict()},
+                        'checkpoint/step_{}'.format(step))
+
+            # wait for all savings
+            saver.wait()
+    """
+
+    def __init__(
+        self, max_to_keep=None, compress=False, protocol=4, max_pending=2
+    ):
+        assert (
+            _non_static_mode()
+        ), "AsyncCheckpointSaver only supports dygraph mode"
+        assert max_to_keep is None or (
+            isinstance(max_to_keep, int) and max_to_keep > 0
+        ), "max_to_keep should be None or a positive integer"
+        assert (
+            isinstance(max_pending, int) and max_pending > 0
+        ), "max_pending should be a positive integer"
+        self.max_to_keep = max_to_keep
+        self.compress = compress
+        self.protocol = protocol
+        self.max_pending = max_pending
+
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._pending = collections.deque()
+        # snapshot buffer sets which are not used by pending savings
+        self._free_buffers = []
+        self._copy_from_gpu = False
+        self._saved = []
+        self._lock = threading.Lock()
+
+    def _snapshot(self, obj, key, buffers):
+        import paddle
+
+        if isinstance(obj, (core.VarBase, core.eager.Tensor)):
+            buffer = buffers.get(key, None)
+            if (
+                buffer is None
+                or buffer.shape != obj.shape
+                or buffer.dtype != obj.dtype
+            ):
+                place = paddle.CPUPlace()
+                if obj.place.is_gpu_place():
+                    place = paddle.CUDAPinnedPlace()
+                    self._copy_from_gpu = True
+                buffer = obj._copy_to(place, False)
+                buffers[key] = buffer
+            else:
+                if obj.place.is_gpu_place():
+                    self._copy_from_gpu = True
+                buffer.copy_(obj, False)
+            buffer.name = obj.name
+            return buffer
+        if isinstance(obj, dict):
+            return type(obj)(
+                (k, self._snapshot(v, key + (k,), buffers))
+                for k, v in obj.items()
+            )
+        if isinstance(obj, (list, tuple)):
+            return type(obj)(
+                self._snapshot(v, key + (i,), buffers)
+                for i, v in enumerate(obj)
+            )
+        # other values may be modified by training while writing too
+        if isinstance(obj, np.ndarray):
+            return np.array(obj, copy=True)
+        return copy.deepcopy(obj)
+
+    def save(self, objs, path):
+        """
+        Save objects in background.
+
+        Args:
+            objs(dict): objects to save, keys are suffixes of file path,
+                values are objects supported by :code:`paddle.save` .
+            path(str): path prefix of files, :code:`path + suffix` is
+                the file path of each object.
+
+        Returns:
+            concurrent.futures.Future: future of the saving, whose result
+                is :attr:`path` .
+        """
+        assert isinstance(objs, dict), "objs should be a dict"
+        self._wait(self.max_pending - 1)
+
+        with self._lock:
+            buffers = self._free_buffers.pop() if self._free_buffers else {}
+        self._copy_from_gpu = False
+        snapshot = {
+            suffix: self._snapshot(obj, (suffix,), buffers)
+            for suffix, obj in objs.items()
+        }
+        event = None
+        if self._copy_from_gpu:
+            import paddle
+
+            # copies are issued on current stream, wait for them in
+            # background thread instead of synchronizing here
+            event = paddle.device.cuda.current_stream().record_event()
+
+        future = self._executor.submit(
+            self._save, snapshot, path, event, buffers
+        )
+        self._pending.append(future)
+        return future
+
+    def _save(self, snapshot, path, event, buffers):
+        try:
+            if event is not None:
+                event.synchronize()
+            self._write(snapshot, path)
+        finally:
+            with self._lock:
+                self._free_buffers.append(buffers)
+
+        with self._lock:
+            self._saved.append((path, list(snapshot.keys())))
+            while (
+                self.max_to_keep is not None
+                and len(self._saved) > self.max_to_keep
+            ):
+                old_path, suffixes = self._saved.pop(0)
+                if old_path == path:
+                    continue
+                for suffix in suffixes:
+                    if os.path.exists(old_path + suffix):
+                        os.remove(old_path + suffix)
+        return path
+
+    def _write(self, snapshot, path):
+        import paddle
+        from paddle.framework.io import _save_to_file_object
+
+        dirname = os.path.dirname(path)
+        if dirname and not os.path.exists(dirname):
+            os.makedirs(dirname, exist_ok=True)
+
+        for suffix, obj in snapshot.items():
+            file_path = path + suffix
+            tmp_path = "{}.tmp".format(file_path)
+            try:
+                if self.compress:
+                    # pickled data is compressed while writing, instead of
+                    # compressing the saved file again
+                    with gzip.open(tmp_path, 'wb', compresslevel=1) as f:
+                        _save_to_file_object(obj, f, self.protocol)
+                else:
+                    paddle.save(obj, tmp_path, protocol=self.protocol)
+                os.replace(tmp_path, file_path)
+            except:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+
+    def _wait(self, max_pending):
+        # savings are finished in order by the only background thread
+        while self._pending and (
+            len(self._pending) > max_pending or self._pending[0].done()
+        ):
+            self._pending.popleft().result()
+
+    def wait(self):
+        """
+        Wait for all pending savings to be finished, exception raised in
+        saving will be raised here.
+        """
+        self._wait(0)
+
+    def close(self):
+        """
+        Wait for pending savings and release snapshot buffers.
+        """
+        try:
+            self.wait()
+        finally:
+            self._executor.shutdown()
+            self._pending.clear()
+            self._free_buffers = []
@@ -19,6 +19,8 @@ import threading
 import paddle
 import time
 import copy
+import json
+import weakref
 
 from .framework import (
     Program,
@@ -40,14 +42,16 @@ from .multiprocess_utils import (
     _cleanup,
     _set_SIGCHLD_handler,
 )
-from .dataloader import BatchSampler, Dataset, IterableDataset, Subset
+from .dataloader import BatchSampler, Dataset, IterableDataset
 from .dataloader.dataloader_iter import (
     _DataLoaderIterSingleProcess,
     _DataLoaderIterMultiProcess,
+    _DataLoaderIterMultiThread,
     _DatasetKind,
     default_collate_fn,
 )
 from .dataloader.batch_sampler import _InfiniteIterableSampler
+from .dataloader.sampler import _get_sampler_state
 from .layers.io import (
     monkey_patch_reader_methods,
     _copy_reader_var_,
@@ -171,141 +175,319 @@ class DataLoaderBase:
         return arr
 
 
+# NOTE: configurations tuned by AuToTune will be saved in this file for
+# each dataset and host, and will be loaded in following runs to skip tuning
+AUTOTUNE_CACHE_PATH = os.path.expanduser(
+    '~/.cache/paddle/dataloader/autotune.json'
+)
+
+
+def _available_cpu_count():
+    # CPUs available for current process, which may be limited by
+    # affinity settings on shared nodes
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return multiprocessing.cpu_count()
+
+
+class _BatchIndicesSampler:
+    """
+    Batch sampler yields given batch indices, used by AuToTune to load
+    a slice of batches of an epoch with a trial configuration.
+    """
+
+    def __init__(self, batch_indices):
+        self.batch_indices = batch_indices
+
+    def __iter__(self):
+        return iter(self.batch_indices)
+
+    def __len__(self):
+        return len(self.batch_indices)
+
+
 class AuToTune:
+    """
+    Online auto-tuner of DataLoader configurations, including num_workers,
+    prefetch_factor, use_shared_memory, use_buffer_reader and pin_memory.
+
+    Tuning is performed in the first epoch with real training: batch indices
+    of the epoch are split into slices of trial steps, each slice is loaded
+    with a trial configuration, and the trial is measured by the average
+    step time between outputting batches, which includes the trainer step
+    time. Configurations are searched knob by knob: for each knob, all
+    candidate values are tried with the best values of other knobs found so
+    far. Tuning stops when all knobs are searched, tuning steps run out, or
+    loading is no longer the bottleneck, i.e. time waiting for batches is
+    less than a small ratio of step time, the remaining batches of the epoch
+    will be loaded with the best configuration. The best configuration will
+    be saved to :attr:`AUTOTUNE_CACHE_PATH` for the dataset and host, and
+    loaded directly in following runs.
+    """
+
+    # skip first steps of each trial to exclude worker starting cost
+    WARMUP_STEPS = 2
+    # loading is not the bottleneck if time waiting for batches is less
+    # than this ratio of step time
+    BOTTLENECK_RATIO = 0.05
+    # trial is considered better only if step time is less than this
+    # ratio of the best step time, to avoid jitter of measurement
+    IMPROVE_RATIO = 0.95
+
     def __init__(self, loader):
         self.loader = loader
-        self.max_num_worker = multiprocessing.cpu_count() / 2
+        self.max_num_worker = _available_cpu_count() / 2
 
     def __call__(self):
-        # use default loader
+        """
+        Load tuned configuration of the loader from cache file.
+
+        Returns:
+            bool: whether online tuning is needed for the loader.
+        """
         if (not USE_AUTOTUNE) or (not self.need_autotune()):
-            return self.loader.num_workers
+            return False
+        config = self.load_config()
+        if config is not None:
+            logging.info("auto_tune dataLoader load config: " + str(config))
+            self.apply_config(self.loader, config)
+            return False
+        return True
 
-        # get autotune loader
-        auto_tune_loader = self.get_autotune_loader()
-        if auto_tune_loader is None:
-            return self.loader.num_workers
+    def need_autotune(self):
+        if sys.platform == 'darwin' or sys.platform == 'win32':
+            return False
+        # only map-style dataset with automatic batching is supported
+        # for batches of an epoch should be splitted for trials
+        return (
+            self.loader.dataset_kind == _DatasetKind.MAP
+            and self.loader.batch_sampler is not None
+        )
 
-        # pick the best num_workers
-        auto_tune_start = time.time()
+    def cache_key(self):
+        import socket
+
+        dataset = self.loader.dataset
+        return "{}:{}:{}.{}:{}:{}:{}".format(
+            socket.gethostname(),
+            _available_cpu_count(),
+            type(dataset).__module__,
+            type(dataset).__name__,
+            len(dataset),
+            len(self.loader.batch_sampler),
+            ",".join(str(p) for p in self.loader.places),
+        )
+
+    def load_config(self):
+        if not os.path.exists(AUTOTUNE_CACHE_PATH):
+            return None
+        try:
+            with open(AUTOTUNE_CACHE_PATH, 'r') as f:
+                return json.load(f).get(self.cache_key(), None)
+        except (OSError, ValueError):
+            return None
+
+    def save_config(self, config):
+        try:
+            configs = {}
+            if os.path.exists(AUTOTUNE_CACHE_PATH):
+                with open(AUTOTUNE_CACHE_PATH, 'r') as f:
+                    configs = json.load(f)
+            configs[self.cache_key()] = config
+            os.makedirs(os.path.dirname(AUTOTUNE_CACHE_PATH), exist_ok=True)
+            # write to a temporary file and rename to avoid broken file
+            # when multiple processes saving at same time
+            tmp_path = "{}.{}".format(AUTOTUNE_CACHE_PATH, os.getpid())
+            with open(tmp_path, 'w') as f:
+                json.dump(configs, f)
+            os.replace(tmp_path, AUTOTUNE_CACHE_PATH)
+        except (OSError, ValueError) as e:
+            logging.warning(
+                "auto_tune dataLoader save config failed: " + str(e)
+            )
+
+    def get_config(self, loader):
+        return {
+            'num_workers': loader.num_workers,
+            'prefetch_factor': loader.prefetch_factor,
+            'use_shared_memory': loader.use_shared_memory,
+            'use_buffer_reader': loader.use_buffer_reader,
+            'pin_memory': loader.pin_memory,
+        }
+
+    def apply_config(self, loader, config):
+        loader.num_workers = config['num_workers']
+        loader.prefetch_factor = config['prefetch_factor']
+        loader.use_shared_memory = (
+            config['use_shared_memory'] and config['num_workers'] > 0
+        )
+        loader.use_buffer_reader = config['use_buffer_reader']
+        loader.pin_memory = config['pin_memory']
+
+    def get_knobs(self):
+        num_workers = [0]
+        n = 1
+        while n <= self.max_num_worker:
+            num_workers.append(n)
+            n *= 2
+        knobs = [
+            ('num_workers', num_workers),
+            ('prefetch_factor', [2, 4, 8]),
+            ('use_shared_memory', [True, False]),
+            ('use_buffer_reader', [True, False]),
+        ]
+        if _non_static_mode() and core.is_compiled_with_cuda():
+            knobs.append(('pin_memory', [True, False]))
+        return knobs
+
+    def get_trial_loader(self, config, batch_indices):
+        loader = copy.copy(self.loader)
+        self.apply_config(loader, config)
+        loader.batch_sampler = _BatchIndicesSampler(batch_indices)
+        loader._autotuner = None
+        loader._persistent_workers = False
+        loader._iterator = None
+        loader._last_iterator = None
+        loader._resume_state = None
+        return loader
+
+    def tune(self):
+        """
+        Tune the loader in an epoch.
+
+        Returns:
+            _AutoTuneIter: iterator of the epoch.
+        """
+        return _AutoTuneIter(self)
+
+
+class _AutoTuneIter:
+    def __init__(self, tuner):
+        self._tuner = tuner
+        self._batch_indices = list(tuner.loader.batch_sampler)
+        self._pos = 0
+        self._trial_steps = max(TUNING_STEPS // 20, AuToTune.WARMUP_STEPS + 3)
+        self._tuning_steps = TUNING_STEPS
+
+        # trials of each knob, each item is (knob, value)
+        self._trials = [
+            (knob, v) for knob, values in tuner.get_knobs() for v in values
+        ]
+        self._best_config = tuner.get_config(tuner.loader)
+        self._best_cost = float('inf')
+        self._best_wait = 0.0
+        self._tuning = True
+        self._config = None
+
+        self._iter = None
+        self._steps = 0
+        self._step_costs = []
+        self._wait_costs = []
+        self._last_time = None
+
+        self._auto_tune_start = time.time()
         logging.debug("========= DataLoader Auto Tune =========")
-        logging.debug(
-            "User config for DataLoader: " + str(self.loader.num_workers)
+        logging.debug("User config for DataLoader: " + str(self._best_config))
+        self._next_trial()
+
+    def __iter__(self):
+        return self
+
+    def __len__(self):
+        return len(self._batch_indices)
+
+    def _start(self, config, end):
+        loader = self._tuner.get_trial_loader(
+            config, self._batch_indices[self._pos : end]
         )
-        best_num_workers = 0
-        min_cost = float("inf")
+        self._pos = end
+        self._config = config
+        self._iter = iter(loader)
+        self._steps = 0
+        self._step_costs = []
+        self._wait_costs = []
+
+    def _next_trial(self):
+        remain = len(self._batch_indices) - self._pos
+        while self._tuning:
+            if (
+                len(self._trials) == 0
+                or self._tuning_steps < self._trial_steps
+                or remain < self._trial_steps
+            ):
+                self._finish()
+                break
+            knob, value = self._trials.pop(0)
+            if self._best_cost < float('inf') and (
+                self._best_config[knob] == value
+            ):
+                continue
+            if knob == 'use_shared_memory' and (
+                self._best_config['num_workers'] == 0
+            ):
+                continue
+            config = dict(self._best_config)
+            config[knob] = value
+            self._tuning_steps -= self._trial_steps
+            self._start(config, self._pos + self._trial_steps)
+            return
+        if self._pos < len(self._batch_indices):
+            self._start(self._best_config, len(self._batch_indices))
+        else:
+            self._iter = iter([])
+
+    def _evaluate(self):
+        costs = self._step_costs[AuToTune.WARMUP_STEPS :] or self._step_costs
+        waits = self._wait_costs[AuToTune.WARMUP_STEPS :] or self._wait_costs
+        cost = sum(costs) / len(costs)
+        wait = sum(waits) / len(waits)
         logging.debug(
-            "Tuning Range for num_workers: 0 ~ " + str(self.max_num_worker)
+            "config: " + str(self._config) + " avg_cost: " + str(cost)
         )
-        num_workers = 0
-        while num_workers < self.max_num_worker:
-            auto_tune_loader.num_workers = num_workers
-            avg_cost = self.evaluate_reader_cost(auto_tune_loader)
-            if min_cost * 0.75 > avg_cost:
-                min_cost = avg_cost
-                best_num_workers = num_workers
-            else:
-                update_num = self.is_best(
-                    auto_tune_loader,
-                    best_num_workers,
-                    min_cost,
-                    self.max_num_worker,
-                )
-                if update_num == best_num_workers:
-                    break
-                else:
-                    best_num_workers = update_num
-            logging.debug(
-                "num_workers: "
-                + str(num_workers)
-                + " avg_cost: "
-                + str(avg_cost)
-            )
-            num_workers += 2
+        if cost < self._best_cost * AuToTune.IMPROVE_RATIO:
+            self._best_cost = cost
+            self._best_wait = wait
+            self._best_config = self._config
+        if self._best_wait < self._best_cost * AuToTune.BOTTLENECK_RATIO:
+            logging.debug("DataLoader is not the bottleneck, stop tuning")
+            self._trials = []
+
+    def _finish(self):
+        self._tuning = False
+        self._tuner.apply_config(self._tuner.loader, self._best_config)
+        # no trial finished if tuning steps or batches not enough
+        if self._best_cost < float('inf'):
+            self._tuner.save_config(self._best_config)
         logging.info(
-            "auto_tune dataLoader best_num_workers: " + str(best_num_workers)
+            "auto_tune dataLoader best config: " + str(self._best_config)
         )
         logging.debug(
             "AutoTuning Cost for DataLoader: "
-            + str(time.time() - auto_tune_start)
+            + str(time.time() - self._auto_tune_start)
             + ' seconds'
         )
 
-        # tune the default loader's num_workers
-        return best_num_workers
-
-    def need_autotune(self):
-        if sys.platform == 'darwin' or sys.platform == 'win32':
-            return False
-        else:
-            return True
-
-    def get_sub_dataset(self, dataset, batch_size):
-        num_samples = min(batch_size * TUNING_STEPS, len(dataset))
-        sub_dataset = Subset(dataset, indices=list(range(num_samples)))
-        return sub_dataset
-
-    def get_autotune_loader(self):
-        loader = copy.copy(self.loader)
-        batch_size = self.loader.batch_sampler.batch_size
-        if isinstance(
-            self.loader.batch_sampler, paddle.io.DistributedBatchSampler
-        ):
-            dataset = self.loader.batch_sampler.dataset
-            sub_dataset = self.get_sub_dataset(dataset, batch_size)
-            loader.batch_sampler = paddle.io.DistributedBatchSampler(
-                dataset=sub_dataset,
-                batch_size=batch_size,
-                num_replicas=self.loader.batch_sampler.nranks,
-                rank=self.loader.batch_sampler.local_rank,
-                shuffle=self.loader.batch_sampler.shuffle,
-                drop_last=self.loader.batch_sampler.drop_last,
-            )
-        elif isinstance(self.loader.batch_sampler, paddle.io.BatchSampler):
-            dataset = self.loader.batch_sampler.sampler.data_source
-            sub_dataset = self.get_sub_dataset(dataset, batch_size)
-            loader.batch_sampler = paddle.io.BatchSampler(
-                dataset=sub_dataset,
-                batch_size=batch_size,
-                drop_last=self.loader.batch_sampler.drop_last,
-            )
-        else:
-            loader = None
-        return loader
-
-    def evaluate_reader_cost(self, reader):
-        costs = []
-        avg_cost = 0
-        start = time.time()
-        for i, data in enumerate(reader):
-            costs.append(time.time() - start)
+    def __next__(self):
+        while True:
             start = time.time()
-        if len(costs) > 2:
-            avg_cost = sum(costs[2:]) / len(costs[2:])
-        else:
-            avg_cost = sum(costs[0:]) / len(costs[0:])
-        return avg_cost
-
-    def is_best(self, reader, best_workers, best_time, num_work_boundary):
-        step = 0
-        num_workers = best_workers + 1
-        boundary = 1
-        while num_workers < num_work_boundary and step < 5:
-            self.loader.num_workers = num_workers
-            time = self.evaluate_reader_cost(reader)
-            logging.debug(
-                "for back num_workers: "
-                + str(num_workers)
-                + " avg_cost: "
-                + str(time)
-            )
-            step += 1
-            if time < best_time * 0.70 * boundary:
-                return num_workers
-            else:
-                num_workers += 1
-            boundary *= 0.80
-        return best_workers
+            try:
+                data = next(self._iter)
+            except StopIteration:
+                if not self._tuning:
+                    raise
+                self._evaluate()
+                self._next_trial()
+                self._last_time = None
+                continue
+            end = time.time()
+            if self._tuning:
+                # step cost includes trainer step time since last batch
+                # output, and time waiting for this batch
+                if self._last_time is not None:
+                    self._step_costs.append(end - self._last_time)
+                    self._wait_costs.append(end - start)
+                self._last_time = end
+            return data
 
 
 class DataLoader:
@@ -406,6 +588,35 @@ class DataLoader:
         worker_init_fn(callable, optional): init function which will be called with
             worker id on each subproces starting if not set as None. Default
             None.
+        persistent_workers(bool, optional): whether to keep worker processes
+            alive after an epoch finished, only enabled in multi-process mode
+            (num_workers > 0). For map-style dataset on single place, indices
+            of next epoch will be put to workers in the last steps of current
+            epoch to prefetch the first batches of next epoch, if epoch of
+            :code:`paddle.io.DistributedBatchSampler` is set to a different
+            value from the prefetched one by :code:`set_epoch`, prefetched
+            batches will be dropped. Default False.
+        use_shared_memory_slab(bool, optional): whether to transport batches
+            from subprocesses by a pool of shared memory slabs preallocated
+            in each subprocess, which avoids copying batch data and creating
+            shared memory files for every batch. Slabs are sized by the first
+            batch, batches with different field number, dtypes or shapes(except
+            smaller size in the 1st dimension) will fall back to default
+            shared memory transport. Output Tensors on CPUPlace share memory
+            with the slab, which will be reused once next batch is required,
+            so please copy the output data if it is required to be held after
+            next batch is read. Only enabled when :attr:`use_shared_memory` is
+            True in multi-process mode(num_workers > 0). Default False.
+        worker_mode(str, optional): the type of workers to load data when
+            :attr:`num_workers` > 0, can be 'process' or 'thread'. 'process'
+            loads data in subprocesses, 'thread' loads data in a pool of
+            threads in main process, which avoids the cost of starting
+            subprocesses, copying dataset and inter-process communication,
+            and is suitable for datasets spending most time in operations
+            releasing the GIL, e.g. file reading, image decoding and numpy
+            operations. In 'thread' mode, worker threads share the random
+            state of main process, and each worker thread iterates on a
+            shallow copy of :code:`paddle.io.IterableDataset`. Default 'process'.
 
     Returns:
         DataLoader: an iterable object for data iterating, each elemnet of the generated data is a Tensor.
@@ -496,9 +707,12 @@ class DataLoader:
         timeout=0,
         worker_init_fn=None,
         persistent_workers=False,
+        use_shared_memory_slab=False,
+        worker_mode='process',
     ):
         self.return_list = return_list
         self.collate_fn = collate_fn
+        self._collate_engine = None
         self.use_buffer_reader = use_buffer_reader
         self.prefetch_factor = prefetch_factor
         self.worker_init_fn = worker_init_fn
@@ -520,8 +734,17 @@ class DataLoader:
         self.places = _convert_places(places)
 
         assert num_workers >= 0, "num_workers should be a non-negative value"
-        if num_workers > 0 and (
-            sys.platform == 'darwin' or sys.platform == 'win32'
+        assert worker_mode in [
+            'process',
+            'thread',
+        ], "worker_mode should be 'process' or 'thread', but got {}".format(
+            worker_mode
+        )
+        self.worker_mode = worker_mode
+        if (
+            num_workers > 0
+            and worker_mode == 'process'
+            and (sys.platform == 'darwin' or sys.platform == 'win32')
         ):
             warnings.warn(
                 "DataLoader with multi-process mode is not supported on MacOs and Windows currently."
@@ -533,8 +756,9 @@ class DataLoader:
         assert prefetch_factor > 0, "prefetch_factor should be a positive value"
 
         self.use_shared_memory = use_shared_memory
-        if use_shared_memory and num_workers == 0:
+        if use_shared_memory and (num_workers == 0 or worker_mode == 'thread'):
             self.use_shared_memory = False
+        self.use_shared_memory_slab = use_shared_memory_slab
 
         assert timeout >= 0, "timeout should be a non-negative value"
         self.timeout = timeout
@@ -593,7 +817,12 @@ class DataLoader:
 
         self._persistent_workers = persistent_workers
         self._iterator = None
-        self.num_workers = AuToTune(self).__call__()
+        self._last_iterator = None
+        self._resume_state = None
+        self._autotuner = None
+        autotuner = AuToTune(self)
+        if autotuner():
+            self._autotuner = autotuner
 
     def __len__(self):
         if self.dataset_kind == _DatasetKind.ITER:
@@ -605,16 +834,113 @@ class DataLoader:
                 return len(self.dataset)
 
     def __iter__(self):
+        # NOTE: tune configurations online in the first epoch, see AuToTune,
+        #       epoch resumed from state_dict is not tuned
+        if self._autotuner is not None:
+            autotuner, self._autotuner = self._autotuner, None
+            if self._resume_state is None:
+                return autotuner.tune()
+
         if self.num_workers == 0:
-            return _DataLoaderIterSingleProcess(self)
-        elif self._persistent_workers:
-            if self._iterator is None:
-                self._iterator = _DataLoaderIterMultiProcess(self)
-            else:
-                self._iterator._reset()
-            return self._iterator
+            iterator = _DataLoaderIterSingleProcess(self)
         else:
-            return _DataLoaderIterMultiProcess(self)
+            if self.worker_mode == 'thread':
+                iter_cls = _DataLoaderIterMultiThread
+            else:
+                iter_cls = _DataLoaderIterMultiProcess
+            if self._persistent_workers:
+                if self._iterator is None:
+                    self._iterator = iter_cls(self)
+                else:
+                    self._iterator._reset()
+                iterator = self._iterator
+            else:
+                iterator = iter_cls(self)
+        # keep a weak reference to get state of current epoch, which
+        # does not prevent the iterator from being released
+        self._last_iterator = weakref.ref(iterator)
+        return iterator
+
+    def state_dict(self):
+        """
+        Get the state of data loading, which can be saved in checkpoint
+        and set by :code:`set_state_dict` to resume data loading from the
+        position after the last output batch in the middle of an epoch.
+
+        State contains sampler state the current epoch started from, e.g.
+        random seed of :code:`paddle.io.RandomSampler` and epoch of
+        :code:`paddle.io.DistributedBatchSampler` , and number of output
+        batches. For map-style dataset, indices of output batches will be
+        skipped in resuming without loading data. For IterableDataset,
+        number of samples consumed from each worker is recorded, and will
+        be skipped by calling :code:`_skip_samples(num_samples)` of dataset
+        before iterating if the method is defined, otherwise be read and
+        dropped, so IterableDataset should generate samples in each worker
+        deterministically, and be resumed with the same :attr:`num_workers` .
+        If no epoch is in progress, state of the next epoch is returned.
+
+        Returns:
+            dict: state of data loading.
+
+        Examples:
+
+            .. code-block:: python
+
+                import numpy as np
+                from paddle.io import Dataset, DataLoader
+
+                class RandomDataset(Dataset):
+                    def __getitem__(self, idx):
+                        return np.array([idx]).astype('int64')
+
+                    def __len__(self):
+                        return 100
+
+                loader = DataLoader(RandomDataset(), batch_size=10,
+                                    shuffle=True)
+                for i, data in enumerate(loader()):
+                    if i == 4:
+                        state = loader.state_dict()
+                        break
+
+                # resume from the 6th batch
+                loader.set_state_dict(state)
+                for data in loader():
+                    pass
+        """
+        if self._resume_state is not None:
+            return self._resume_state
+
+        iterator = self._iterator
+        if iterator is None and self._last_iterator is not None:
+            iterator = self._last_iterator()
+        if iterator is not None and not iterator._epoch_done:
+            return iterator.state_dict()
+
+        sampler_state = None
+        if self.batch_sampler is not None:
+            sampler_state = _get_sampler_state(self.batch_sampler)
+        return {
+            'sampler': sampler_state,
+            'num_batches': 0,
+            'worker_samples': None,
+            'num_workers': self.num_workers,
+        }
+
+    def set_state_dict(self, state_dict):
+        """
+        Set the state of data loading got by :code:`state_dict` , next
+        iteration will be resumed from the state. Persistent workers will
+        be restarted if they are alive.
+
+        Args:
+            state_dict(dict): state of data loading.
+        """
+        if self._iterator is not None:
+            self._iterator._try_shutdown_all()
+            self._iterator = None
+        self._last_iterator = None
+        self._resume_state = state_dict
 
     def __call__(self):
         return self.__iter__()
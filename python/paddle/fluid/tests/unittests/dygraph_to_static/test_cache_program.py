@@ -168,5 +168,44 @@ class TestToOutputWithCache(unittest.TestCase):
             self.assertEqual(ret.numpy(), 5050)
 
 
+def sum_by_row(x):
+    return paddle.sum(x, axis=1)
+
+
+class TestProgramCacheLimit(unittest.TestCase):
+    def test_lru_eviction(self):
+        with fluid.dygraph.guard():
+            static_func = to_static(sum_by_row, max_cache_size=2)
+            for width in [2, 3, 2, 4, 3]:
+                static_func(paddle.ones([2, width]))
+            # 3 is evicted by 4 since 2 is used recently
+            stats = static_func.get_cache_stats()
+            self.assertEqual(stats['hits'], 1)
+            self.assertEqual(stats['misses'], 4)
+            self.assertEqual(stats['evictions'], 2)
+            self.assertEqual(stats['size'], 2)
+            self.assertGreater(stats['trace_time'], 0)
+
+        with self.assertRaises(ValueError):
+            to_static(sum_by_row, max_cache_size=0)(paddle.ones([2, 2]))
+
+    def test_shape_buckets(self):
+        with fluid.dygraph.guard():
+            static_func = to_static(
+                sum_by_row, shape_buckets={'x': {1: [4, 8]}}
+            )
+            for width in [1, 3, 4, 5, 8, 10]:
+                x = paddle.rand([2, width])
+                out = static_func(x)
+                np.testing.assert_allclose(
+                    out.numpy(), x.numpy().sum(axis=1), rtol=1e-05
+                )
+            # widths larger than buckets are traced with their own shapes
+            self.assertEqual(static_func.get_traced_count(), 3)
+
+        with self.assertRaises(ValueError):
+            to_static(sum_by_row, shape_buckets={'y': {1: [4]}})
+
+
 if __name__ == '__main__':
     unittest.main()
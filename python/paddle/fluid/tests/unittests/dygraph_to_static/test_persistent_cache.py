@@ -0,0 +1,143 @@
+# Copyright (c) 2022 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import inspect
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+
+import paddle
+from paddle.jit.dy2static.persistent_cache import _PERSISTENT_CACHE
+from paddle.jit.dy2static.program_translator import (
+    ConcreteProgram,
+    FunctionCache,
+    ProgramCache,
+)
+
+
+def dyfunc_with_if(x):
+    if paddle.mean(x) > 0:
+        x = x + 1
+    else:
+        x = x - 1
+    return x
+
+
+class SimpleNet(paddle.nn.Layer):
+    def __init__(self):
+        super().__init__()
+        self.linear = paddle.nn.Linear(10, 3)
+
+    @paddle.jit.to_static
+    def forward(self, x):
+        out = self.linear(x)
+        if paddle.mean(out) > 0:
+            out = out * 2
+        return out, paddle.mean(out)
+
+
+class TestPersistentCache(unittest.TestCase):
+    def setUp(self):
+        paddle.disable_static()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        paddle.jit.set_cache_dir(self.temp_dir.name)
+
+    def tearDown(self):
+        _PERSISTENT_CACHE._cache_dir_set = False
+        self.temp_dir.cleanup()
+
+    def test_code_cache(self):
+        function_cache = FunctionCache()
+        static_func = function_cache.convert_with_cache(dyfunc_with_if)
+        self.assertEqual(os.listdir(self.temp_dir.name), ['code'])
+
+        # a new FunctionCache loads transformed code without parsing
+        function_cache = FunctionCache()
+        cached_func = function_cache.convert_with_cache(dyfunc_with_if)
+        self.assertEqual(len(function_cache._code_to_ast_caches), 0)
+        self.assertEqual(
+            inspect.getsource(cached_func), inspect.getsource(static_func)
+        )
+
+        x = paddle.ones([2, 2])
+        np.testing.assert_array_equal(
+            paddle.jit.to_static(dyfunc_with_if)(x).numpy(),
+            dyfunc_with_if(x).numpy(),
+        )
+
+    def test_program_cache(self):
+        paddle.seed(2022)
+        net = SimpleNet()
+        x = paddle.rand([4, 10])
+        out, loss = net(x)
+        cache_key = net.forward.program_cache._recent_cache_key
+        key = _PERSISTENT_CACHE.program_key(cache_key)
+        self.assertTrue(
+            os.path.exists(
+                os.path.join(self.temp_dir.name, 'program', key + '.pkl')
+            )
+        )
+
+        # programs are loaded from cache instead of tracing
+        net.forward._program_cache = ProgramCache()
+        with mock.patch.object(
+            ConcreteProgram, 'from_func_spec', side_effect=AssertionError
+        ):
+            cached_out, cached_loss = net(x)
+        np.testing.assert_allclose(cached_out.numpy(), out.numpy())
+        cached_loss.backward()
+        self.assertIsNotNone(net.linear.weight.grad)
+
+        # different input spec misses the cache
+        self.assertNotEqual(
+            _PERSISTENT_CACHE.program_key(
+                type(cache_key).from_func_and_args(
+                    cache_key.function_spec,
+                    (paddle.rand([4, 10, 1]),),
+                    {},
+                    net,
+                )
+            ),
+            key,
+        )
+
+    def test_program_key_with_build_strategy(self):
+        def build_key():
+            build_strategy = paddle.static.BuildStrategy()
+            build_strategy.enable_inplace = False
+            static_func = paddle.jit.to_static(
+                dyfunc_with_if, build_strategy=build_strategy
+            )
+            static_func(paddle.ones([2, 2]))
+            return _PERSISTENT_CACHE.program_key(
+                static_func.program_cache._recent_cache_key
+            )
+
+        # keys of equal strategies are the same though they are different
+        # pybind objects
+        key = build_key()
+        self.assertIsNotNone(key)
+        self.assertEqual(build_key(), key)
+
+    def test_disabled(self):
+        paddle.jit.set_cache_dir(None)
+        FunctionCache().convert_with_cache(dyfunc_with_if)
+        self.assertEqual(os.listdir(self.temp_dir.name), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
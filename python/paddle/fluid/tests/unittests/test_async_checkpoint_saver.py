@@ -0,0 +1,165 @@
+# Copyright (c) 2022 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+import numpy as np
+
+import paddle
+from paddle.incubate.checkpoint import AsyncCheckpointSaver
+
+
+class TestAsyncCheckpointSaver(unittest.TestCase):
+    def setUp(self):
+        paddle.disable_static()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.layer = paddle.nn.Linear(10, 10)
+        self.opt = paddle.optimizer.Adam(parameters=self.layer.parameters())
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def train_step(self):
+        loss = self.layer(paddle.rand([4, 10])).mean()
+        loss.backward()
+        self.opt.step()
+        self.opt.clear_grad()
+
+    def check_saved(self, path, state_dict, compress=False):
+        with open(path + '.pdparams', 'rb') as f:
+            self.assertEqual(f.read(2) == b'\x1f\x8b', compress)
+        loaded = paddle.load(path + '.pdparams')
+        for key, value in state_dict.items():
+            np.testing.assert_array_equal(loaded[key].numpy(), value)
+            self.assertEqual(
+                loaded[key].name, self.layer.state_dict()[key].name
+            )
+
+    def test_save(self):
+        for compress in [False, True]:
+            saver = AsyncCheckpointSaver(max_to_keep=2, compress=compress)
+            paths = []
+            for step in range(3):
+                self.train_step()
+                path = os.path.join(
+                    self.temp_dir.name, str(compress), 'step_{}'.format(step)
+                )
+                state_dict = {
+                    k: v.numpy() for k, v in self.layer.state_dict().items()
+                }
+                future = saver.save(
+                    {
+                        '.pdparams': self.layer.state_dict(),
+                        '.pdopt': self.opt.state_dict(),
+                    },
+                    path,
+                )
+                # updating parameters does not change the snapshot
+                self.train_step()
+                self.assertEqual(future.result(), path)
+                self.check_saved(path, state_dict, compress)
+                paths.append(path)
+            saver.close()
+
+            # only the last 2 checkpoints are kept
+            self.assertFalse(os.path.exists(paths[0] + '.pdparams'))
+            self.assertFalse(os.path.exists(paths[0] + '.pdopt'))
+            for path in paths[1:]:
+                self.assertTrue(os.path.exists(path + '.pdparams'))
+                self.assertTrue(os.path.exists(path + '.pdopt'))
+            self.assertFalse(os.path.exists(paths[-1] + '.pdparams.tmp'))
+
+    def test_pending(self):
+        saver = AsyncCheckpointSaver(max_pending=2, compress=True)
+        write = saver._write
+        started = threading.Event()
+        release = threading.Event()
+
+        def blocked_write(snapshot, path):
+            started.set()
+            release.wait()
+            write(snapshot, path)
+
+        paths, state_dicts, futures = [], [], []
+        with mock.patch.object(saver, '_write', blocked_write):
+            for step in range(2):
+                self.train_step()
+                paths.append(
+                    os.path.join(self.temp_dir.name, 'step_{}'.format(step))
+                )
+                state_dicts.append(
+                    {k: v.numpy() for k, v in self.layer.state_dict().items()}
+                )
+                # saving does not wait for the previous pending one
+                futures.append(
+                    saver.save(
+                        {'.pdparams': self.layer.state_dict()}, paths[-1]
+                    )
+                )
+                started.wait()
+            self.assertFalse(any(future.done() for future in futures))
+            release.set()
+            saver.wait()
+
+        # each pending saving has its own snapshot buffers
+        self.assertEqual(len(saver._free_buffers), 2)
+        for path, state_dict in zip(paths, state_dicts):
+            self.check_saved(path, state_dict, compress=True)
+        saver.close()
+
+    def test_snapshot_non_tensor(self):
+        saver = AsyncCheckpointSaver()
+        write = saver._write
+        release = threading.Event()
+
+        def blocked_write(snapshot, path):
+            release.wait()
+            write(snapshot, path)
+
+        path = os.path.join(self.temp_dir.name, 'step_0')
+        array = np.zeros([4], dtype='float32')
+        meta = {'step': [0]}
+        with mock.patch.object(saver, '_write', blocked_write):
+            future = saver.save(
+                {'.pdstate': {'array': array, 'meta': meta}}, path
+            )
+            # modifying values in place does not change the snapshot
+            array += 1
+            meta['step'].append(1)
+            release.set()
+            future.result()
+        loaded = paddle.load(path + '.pdstate')
+        np.testing.assert_array_equal(loaded['array'], np.zeros([4]))
+        self.assertEqual(loaded['meta'], {'step': [0]})
+        saver.close()
+
+    def test_error(self):
+        saver = AsyncCheckpointSaver()
+        path = os.path.join(self.temp_dir.name, 'layer')
+        future = saver.save({'.pdparams': {'layer': self.layer}}, path)
+        with self.assertRaises(ValueError):
+            future.result()
+        # the partially written file is removed
+        self.assertFalse(os.path.exists(path + '.pdparams.tmp'))
+        # the error is raised by waiting as well
+        with self.assertRaises(ValueError):
+            saver.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -98,6 +98,67 @@ class TestAutoTune(unittest.TestCase):
         )
 
 
+class IndexDataset(Dataset):
+    def __init__(self, num_samples):
+        self.num_samples = num_samples
+
+    def __getitem__(self, idx):
+        return np.array([idx]).astype('int64')
+
+    def __len__(self):
+        return self.num_samples
+
+
+class TestOnlineAutoTune(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache_path = paddle.fluid.reader.AUTOTUNE_CACHE_PATH
+        paddle.fluid.reader.AUTOTUNE_CACHE_PATH = os.path.join(
+            self.temp_dir.name, 'autotune.json'
+        )
+        paddle.incubate.autotune.set_config(
+            config={"dataloader": {"enable": True, "tuning_steps": 60}}
+        )
+
+    def tearDown(self):
+        paddle.incubate.autotune.set_config(
+            config={"dataloader": {"enable": False}}
+        )
+        paddle.fluid.reader.AUTOTUNE_CACHE_PATH = self.cache_path
+        self.temp_dir.cleanup()
+
+    def read_epoch(self, loader):
+        indices = []
+        for data in loader():
+            indices.extend(data.numpy()[:, 0].tolist())
+        return indices
+
+    def test_tune_in_first_epoch(self):
+        if sys.platform == 'darwin' or sys.platform == 'win32':
+            return
+        paddle.disable_static()
+        dataset = IndexDataset(400)
+        loader = DataLoader(dataset, batch_size=2, num_workers=2)
+        self.assertTrue(loader._autotuner is not None)
+        # every batch should be output exactly once in tuning epoch
+        self.assertEqual(self.read_epoch(loader), list(range(400)))
+        self.assertTrue(loader._autotuner is None)
+        self.assertEqual(self.read_epoch(loader), list(range(400)))
+
+        cache_path = paddle.fluid.reader.AUTOTUNE_CACHE_PATH
+        self.assertTrue(os.path.exists(cache_path))
+        with open(cache_path) as f:
+            config = list(json.load(f).values())[0]
+        self.assertEqual(loader.num_workers, config['num_workers'])
+        self.assertEqual(loader.prefetch_factor, config['prefetch_factor'])
+
+        # tuned config should be loaded from cache file
+        loader = DataLoader(dataset, batch_size=2, num_workers=2)
+        self.assertTrue(loader._autotuner is None)
+        self.assertEqual(loader.num_workers, config['num_workers'])
+        self.assertEqual(self.read_epoch(loader), list(range(400)))
+
+
 class TestAutoTuneAPI(unittest.TestCase):
     def test_set_config_warnings(self):
         with warnings.catch_warnings(record=True) as w:
@@ -0,0 +1,142 @@
+# Copyright (c) 2022 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+
+import numpy as np
+
+import paddle
+from paddle.fluid.dataloader.collate import _CollateEngine, default_collate_fn
+from paddle.io import DataLoader, Dataset
+
+BATCH_SIZE = 4
+
+
+def make_sample(idx):
+    return {
+        'image': np.full([3, 4], idx).astype('float32'),
+        'label': idx,
+        'name': 'sample_{}'.format(idx),
+        'extra': (np.array([idx]).astype('int64'), float(idx)),
+    }
+
+
+class TestCollateEngine(unittest.TestCase):
+    def assert_batch_equal(self, out, expect):
+        self.assertEqual(type(out), type(expect))
+        if isinstance(expect, dict):
+            self.assertEqual(list(out.keys()), list(expect.keys()))
+            for k in expect:
+                self.assert_batch_equal(out[k], expect[k])
+        elif isinstance(expect, list):
+            self.assertEqual(len(out), len(expect))
+            for o, e in zip(out, expect):
+                self.assert_batch_equal(o, e)
+        elif isinstance(expect, np.ndarray):
+            self.assertEqual(out.dtype, expect.dtype)
+            np.testing.assert_array_equal(out, expect)
+        else:
+            self.assertEqual(out, expect)
+
+    def test_same_as_default(self):
+        engine = _CollateEngine()
+        for start in range(0, 20, BATCH_SIZE):
+            batch = [make_sample(i) for i in range(start, start + BATCH_SIZE)]
+            self.assert_batch_equal(engine(batch), default_collate_fn(batch))
+        self.assertTrue(engine._schema is not False)
+
+    def test_fallback(self):
+        engine = _CollateEngine()
+        batch = [make_sample(i) for i in range(BATCH_SIZE)]
+        engine(batch)
+
+        # dtype changed
+        batch = [make_sample(i) for i in range(BATCH_SIZE)]
+        for sample in batch:
+            sample['image'] = sample['image'].astype('float64')
+        self.assert_batch_equal(engine(batch), default_collate_fn(batch))
+
+        # number type changed
+        batch = [make_sample(i) for i in range(BATCH_SIZE)]
+        batch[1]['label'] = 1.5
+        self.assert_batch_equal(engine(batch), default_collate_fn(batch))
+
+        # shape changed
+        batch = [make_sample(i) for i in range(BATCH_SIZE)]
+        for sample in batch:
+            sample['image'] = np.zeros([5, 4]).astype('float32')
+        self.assert_batch_equal(engine(batch), default_collate_fn(batch))
+
+    def test_allocator(self):
+        buffers = []
+
+        def allocator(batch_size, shapes, dtypes):
+            outs = [np.empty(s, dtype=d) for s, d in zip(shapes, dtypes)]
+            buffers.extend(outs)
+            return outs
+
+        engine = _CollateEngine()
+        engine.set_allocator(allocator)
+        batch = [make_sample(i) for i in range(BATCH_SIZE)]
+        out = engine(batch)
+        self.assert_batch_equal(out, default_collate_fn(batch))
+        self.assertEqual(len(buffers), 4)
+        self.assertTrue(out['image'] is buffers[0])
+        self.assertTrue(out['label'] is buffers[1])
+
+    def test_tensor_not_supported(self):
+        paddle.disable_static()
+        engine = _CollateEngine()
+        batch = [paddle.to_tensor([i]) for i in range(BATCH_SIZE)]
+        out = engine(batch)
+        self.assertEqual(engine._schema, False)
+        self.assertEqual(out.shape, [BATCH_SIZE, 1])
+
+
+class SampleDataset(Dataset):
+    def __getitem__(self, idx):
+        return make_sample(idx)
+
+    def __len__(self):
+        return 40
+
+
+class TestDataLoaderCollateEngine(unittest.TestCase):
+    def run_main(self, num_workers, use_shared_memory_slab):
+        paddle.disable_static()
+        loader = DataLoader(
+            SampleDataset(),
+            batch_size=BATCH_SIZE,
+            num_workers=num_workers,
+            use_shared_memory_slab=use_shared_memory_slab,
+        )
+        for i, data in enumerate(loader()):
+            label = np.arange(i * BATCH_SIZE, (i + 1) * BATCH_SIZE)
+            np.testing.assert_array_equal(data['label'].numpy(), label)
+            np.testing.assert_array_equal(
+                data['image'].numpy()[:, 0, 0], label.astype('float32')
+            )
+            np.testing.assert_array_equal(data['extra'][0].numpy()[:, 0], label)
+            self.assertEqual(
+                data['name'], ['sample_{}'.format(l) for l in label]
+            )
+
+    def test_main(self):
+        self.run_main(0, False)
+        self.run_main(2, False)
+        self.run_main(2, True)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+# Copyright (c) 2022 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import time
+import unittest
+
+import numpy as np
+
+import paddle
+from paddle.fluid import core
+from paddle.io import DataLoader, Dataset, DevicePrefetcher
+
+SAMPLE_NUM = 40
+BATCH_SIZE = 4
+
+
+class IndexDataset(Dataset):
+    def __init__(self, delay=0.0):
+        self.delay = delay
+
+    def __getitem__(self, idx):
+        time.sleep(self.delay)
+        return {
+            'image': np.full([8], idx).astype('float32'),
+            'label': np.array([idx]).astype('int64'),
+        }
+
+    def __len__(self):
+        return SAMPLE_NUM
+
+
+class ErrorLoader:
+    def __iter__(self):
+        for i in range(SAMPLE_NUM):
+            if i == 10:
+                raise ValueError("error batch")
+            yield [paddle.to_tensor([i])]
+
+
+class TestDevicePrefetcher(unittest.TestCase):
+    def setUp(self):
+        paddle.disable_static()
+
+    def get_places(self):
+        places = [paddle.CPUPlace()]
+        if core.is_compiled_with_cuda():
+            places.append(paddle.CUDAPlace(0))
+        return places
+
+    def get_loader(self, dataset):
+        return DataLoader(
+            dataset, batch_size=BATCH_SIZE, places=paddle.CPUPlace()
+        )
+
+    def test_main(self):
+        for place in self.get_places():
+            prefetcher = DevicePrefetcher(
+                self.get_loader(IndexDataset()), place=place, num_prefetch=3
+            )
+            self.assertEqual(len(prefetcher), SAMPLE_NUM // BATCH_SIZE)
+            for _ in range(2):
+                labels = []
+                for data in prefetcher:
+                    self.assertTrue(data['image'].place._equals(place))
+                    self.assertTrue(data['label'].place._equals(place))
+                    labels.extend(data['label'].numpy()[:, 0].tolist())
+                self.assertEqual(labels, list(range(SAMPLE_NUM)))
+                stats = prefetcher.stats()
+                self.assertEqual(
+                    stats['hits'] + stats['misses'], SAMPLE_NUM // BATCH_SIZE
+                )
+
+    def test_stats(self):
+        # batches are staged while steps running, most batches hit
+        prefetcher = DevicePrefetcher(self.get_loader(IndexDataset()))
+        for _ in prefetcher:
+            time.sleep(0.05)
+        self.assertTrue(prefetcher.stats()['hits'] > 0)
+
+        # loading is slower than steps, most batches miss
+        prefetcher = DevicePrefetcher(self.get_loader(IndexDataset(0.02)))
+        for _ in prefetcher:
+            pass
+        stats = prefetcher.stats()
+        self.assertTrue(stats['misses'] > stats['hits'])
+        self.assertTrue(stats['wait_time'] > 0)
+
+    def test_break(self):
+        prefetcher = DevicePrefetcher(self.get_loader(IndexDataset()))
+        for i, _ in enumerate(prefetcher):
+            if i == 2:
+                break
+        labels = []
+        for data in prefetcher:
+            labels.extend(data['label'].numpy()[:, 0].tolist())
+        self.assertEqual(labels, list(range(SAMPLE_NUM)))
+
+    def test_exception(self):
+        prefetcher = DevicePrefetcher(ErrorLoader())
+        labels = []
+        with self.assertRaises(ValueError):
+            for data in prefetcher:
+                labels.append(int(data[0]))
+        # batches before exception should be returned
+        self.assertEqual(labels, list(range(10)))
+
+
+if __name__ == '__main__':
+    unittest.main()
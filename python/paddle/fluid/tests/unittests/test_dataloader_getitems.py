@@ -0,0 +1,108 @@
+# Copyright (c) 2022 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+
+import numpy as np
+
+import paddle
+from paddle.io import ComposeDataset, DataLoader, Dataset, Subset
+
+SAMPLE_NUM = 40
+FEATURE_SIZE = 8
+BATCH_SIZE = 4
+
+
+class ColumnarDataset(Dataset):
+    def __init__(self, sample_num):
+        self.features = np.arange(sample_num * FEATURE_SIZE).astype('float32')
+        self.features = self.features.reshape([sample_num, FEATURE_SIZE])
+        self.labels = np.arange(sample_num).astype('int64').reshape([-1, 1])
+        self.getitem_cnt = 0
+        self.getitems_cnt = 0
+
+    def __getitem__(self, idx):
+        self.getitem_cnt += 1
+        return self.features[idx], self.labels[idx]
+
+    def __getitems__(self, indices):
+        self.getitems_cnt += 1
+        features = self.features[indices]
+        labels = self.labels[indices]
+        return list(zip(features, labels))
+
+    def __len__(self):
+        return self.features.shape[0]
+
+
+class TestDatasetGetitems(unittest.TestCase):
+    def test_subset(self):
+        dataset = ColumnarDataset(SAMPLE_NUM)
+        subset = Subset(dataset, indices=[3, 1, 7, 5])
+        samples = subset.__getitems__([0, 2, 3])
+        self.assertEqual(dataset.getitems_cnt, 1)
+        self.assertEqual(dataset.getitem_cnt, 0)
+        for sample, idx in zip(samples, [3, 7, 5]):
+            np.testing.assert_array_equal(sample[0], dataset.features[idx])
+            np.testing.assert_array_equal(sample[1], dataset.labels[idx])
+
+    def test_subset_fallback(self):
+        subset = Subset(dataset=list(range(10)), indices=[1, 3, 5])
+        self.assertEqual(subset.__getitems__([0, 2]), [1, 5])
+
+    def test_compose_dataset(self):
+        dataset1 = ColumnarDataset(SAMPLE_NUM)
+        dataset2 = ColumnarDataset(SAMPLE_NUM)
+        dataset = ComposeDataset([dataset1, dataset2])
+        samples = dataset.__getitems__([2, 4])
+        for sample, idx in zip(samples, [2, 4]):
+            self.assertEqual(len(sample), 4)
+            for field, expect in zip(sample, dataset[idx]):
+                np.testing.assert_array_equal(field, expect)
+
+
+class TestDataLoaderGetitems(unittest.TestCase):
+    def run_main(self, num_workers):
+        paddle.disable_static()
+        dataset = ColumnarDataset(SAMPLE_NUM)
+        loader = DataLoader(
+            dataset,
+            batch_size=BATCH_SIZE,
+            num_workers=num_workers,
+            drop_last=True,
+        )
+        for i, (feature, label) in enumerate(loader()):
+            self.assertEqual(feature.shape, [BATCH_SIZE, FEATURE_SIZE])
+            start = i * BATCH_SIZE
+            np.testing.assert_array_equal(
+                feature.numpy(), dataset.features[start : start + BATCH_SIZE]
+            )
+            np.testing.assert_array_equal(
+                label.numpy(), dataset.labels[start : start + BATCH_SIZE]
+            )
+        if num_workers == 0:
+            # dataset is not copied in single process mode, check
+            # whether batches are fetched by __getitems__
+            self.assertEqual(dataset.getitems_cnt, SAMPLE_NUM // BATCH_SIZE)
+            self.assertEqual(dataset.getitem_cnt, 0)
+
+    def test_single_process(self):
+        self.run_main(num_workers=0)
+
+    def test_multi_process(self):
+        self.run_main(num_workers=2)
+
+
+if __name__ == '__main__':
+    unittest.main()
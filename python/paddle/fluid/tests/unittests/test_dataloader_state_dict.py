@@ -0,0 +1,214 @@
+# Copyright (c) 2022 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import math
+import unittest
+
+import numpy as np
+
+import paddle
+from paddle.io import (
+    DataLoader,
+    Dataset,
+    DistributedBatchSampler,
+    IterableDataset,
+    RandomSampler,
+    WeightedRandomSampler,
+    get_worker_info,
+)
+
+SAMPLE_NUM = 40
+BATCH_SIZE = 4
+RESUME_BATCH = 3
+
+
+class IndexDataset(Dataset):
+    def __init__(self):
+        self.loaded = []
+
+    def __getitem__(self, idx):
+        self.loaded.append(idx)
+        return np.array([idx]).astype('int64')
+
+    def __len__(self):
+        return SAMPLE_NUM
+
+
+class SplitIterableDataset(IterableDataset):
+    def __init__(self, start, end):
+        self.start = start
+        self.end = end
+
+    def __iter__(self):
+        worker_info = get_worker_info()
+        num_workers, worker_id = 1, 0
+        if worker_info is not None:
+            num_workers, worker_id = worker_info.num_workers, worker_info.id
+        per_worker = int(
+            math.ceil((self.end - self.start) / float(num_workers))
+        )
+        iter_start = self.start + worker_id * per_worker
+        iter_end = min(iter_start + per_worker, self.end)
+        for i in range(iter_start, iter_end):
+            yield np.array([i]).astype('int64')
+
+
+def _read_indices(loader, num_batches=None):
+    indices = []
+    for i, data in enumerate(loader()):
+        indices.append(data.numpy()[:, 0].tolist())
+        if num_batches is not None and i + 1 == num_batches:
+            break
+    return indices
+
+
+class TestDataLoaderStateDict(unittest.TestCase):
+    def check_resume(self, create_loader):
+        paddle.disable_static()
+        np.random.seed(2022)
+        expected = _read_indices(create_loader())
+
+        np.random.seed(2022)
+        loader = create_loader()
+        indices = _read_indices(loader, RESUME_BATCH)
+        state = loader.state_dict()
+        self.assertEqual(state['num_batches'], RESUME_BATCH)
+
+        # disturb random state, resumed order should not be changed
+        np.random.random(10)
+        loader = create_loader()
+        loader.set_state_dict(state)
+        indices += _read_indices(loader)
+        self.assertEqual(indices, expected)
+        return loader
+
+    def test_shuffle(self):
+        for num_workers in [0, 2]:
+            self.check_resume(
+                lambda: DataLoader(
+                    IndexDataset(),
+                    batch_size=BATCH_SIZE,
+                    shuffle=True,
+                    num_workers=num_workers,
+                )
+            )
+
+    def test_sampler_state(self):
+        np.random.seed(2022)
+        sampler = RandomSampler(IndexDataset())
+        state = sampler.state_dict()
+        # numbers drawn after the state is got do not change the order
+        np.random.random(10)
+        indices = list(sampler)
+        self.assertNotEqual(list(sampler), indices)
+        sampler.set_state_dict(state)
+        self.assertEqual(list(sampler), indices)
+
+        np.random.seed(2022)
+        sampler = RandomSampler(IndexDataset())
+        sampler_iter = iter(sampler)
+        # the global random state is not rewound by iteration
+        numbers = np.random.random(10)
+        self.assertEqual(list(sampler_iter), indices)
+        np.random.seed(2022)
+        sampler.state_dict()
+        np.testing.assert_array_equal(np.random.random(10), numbers)
+
+        sampler = WeightedRandomSampler(np.array([0.1, 0.3, 0.5, 0.7, 0.2]), 10)
+        state = sampler.state_dict()
+        indices = list(sampler)
+        sampler.set_state_dict(state)
+        self.assertEqual(list(sampler), indices)
+
+    def test_skip_without_loading(self):
+        paddle.disable_static()
+        dataset = IndexDataset()
+        loader = DataLoader(dataset, batch_size=BATCH_SIZE)
+        loader.set_state_dict(
+            {
+                'sampler': None,
+                'num_batches': RESUME_BATCH,
+                'worker_samples': None,
+                'num_workers': 0,
+            }
+        )
+        indices = sum(_read_indices(loader), [])
+        self.assertEqual(
+            indices, list(range(RESUME_BATCH * BATCH_SIZE, SAMPLE_NUM))
+        )
+        self.assertEqual(sorted(dataset.loaded), indices)
+
+    def test_distributed_batch_sampler(self):
+        def create_loader():
+            dataset = IndexDataset()
+            batch_sampler = DistributedBatchSampler(
+                dataset,
+                batch_size=BATCH_SIZE,
+                num_replicas=2,
+                rank=0,
+                shuffle=True,
+            )
+            batch_sampler.set_epoch(1)
+            return DataLoader(
+                dataset, batch_sampler=batch_sampler, num_workers=2
+            )
+
+        loader = self.check_resume(create_loader)
+        # epoch increased after resumed epoch finished
+        self.assertEqual(loader.batch_sampler.epoch, 2)
+        self.assertEqual(loader.state_dict()['sampler'], {'epoch': 2})
+
+    def test_persistent_workers(self):
+        self.check_resume(
+            lambda: DataLoader(
+                IndexDataset(),
+                batch_size=BATCH_SIZE,
+                shuffle=True,
+                num_workers=2,
+                persistent_workers=True,
+            )
+        )
+
+    def test_iterable_dataset(self):
+        for num_workers in [0, 2]:
+            for worker_mode in ['process', 'thread']:
+                self.check_resume(
+                    lambda: DataLoader(
+                        SplitIterableDataset(0, SAMPLE_NUM),
+                        batch_size=BATCH_SIZE,
+                        num_workers=num_workers,
+                        worker_mode=worker_mode,
+                    )
+                )
+
+    def test_iterable_num_workers_mismatch(self):
+        paddle.disable_static()
+        loader = DataLoader(
+            SplitIterableDataset(0, SAMPLE_NUM),
+            batch_size=BATCH_SIZE,
+            num_workers=2,
+        )
+        _read_indices(loader, RESUME_BATCH)
+        state = loader.state_dict()
+
+        loader = DataLoader(
+            SplitIterableDataset(0, SAMPLE_NUM), batch_size=BATCH_SIZE
+        )
+        loader.set_state_dict(state)
+        with self.assertRaises(ValueError):
+            _read_indices(loader)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+# Copyright (c) 2022 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import math
+import threading
+import unittest
+
+import numpy as np
+
+import paddle
+from paddle.io import DataLoader, Dataset, IterableDataset, get_worker_info
+
+SAMPLE_NUM = 40
+BATCH_SIZE = 4
+
+
+class IndexDataset(Dataset):
+    def __init__(self):
+        self.thread_names = set()
+
+    def __getitem__(self, idx):
+        self.thread_names.add(threading.current_thread().name)
+        return np.array([idx]).astype('int64')
+
+    def __len__(self):
+        return SAMPLE_NUM
+
+
+class SplitIterableDataset(IterableDataset):
+    def __init__(self, start, end):
+        self.start = start
+        self.end = end
+
+    def __iter__(self):
+        worker_info = get_worker_info()
+        per_worker = int(
+            math.ceil((self.end - self.start) / float(worker_info.num_workers))
+        )
+        iter_start = self.start + worker_info.id * per_worker
+        iter_end = min(iter_start + per_worker, self.end)
+        for i in range(iter_start, iter_end):
+            yield np.array([i]).astype('int64')
+
+
+class ErrorDataset(Dataset):
+    def __getitem__(self, idx):
+        if idx == 5:
+            raise ValueError("error sample")
+        return np.array([idx]).astype('int64')
+
+    def __len__(self):
+        return SAMPLE_NUM
+
+
+class TestThreadWorker(unittest.TestCase):
+    def test_map_dataset(self):
+        paddle.disable_static()
+        dataset = IndexDataset()
+        for persistent_workers in [False, True]:
+            loader = DataLoader(
+                dataset,
+                batch_size=BATCH_SIZE,
+                num_workers=4,
+                worker_mode='thread',
+                persistent_workers=persistent_workers,
+            )
+            for _ in range(2):
+                indices = []
+                for data in loader():
+                    indices.extend(data.numpy()[:, 0].tolist())
+                self.assertEqual(indices, list(range(SAMPLE_NUM)))
+        self.assertTrue(len(dataset.thread_names) > 1)
+
+    def test_iterable_dataset(self):
+        paddle.disable_static()
+        loader = DataLoader(
+            SplitIterableDataset(0, SAMPLE_NUM),
+            batch_size=BATCH_SIZE,
+            num_workers=2,
+            worker_mode='thread',
+        )
+        indices = []
+        for data in loader():
+            indices.extend(data.numpy()[:, 0].tolist())
+        self.assertEqual(sorted(indices), list(range(SAMPLE_NUM)))
+        self.assertTrue(get_worker_info() is None)
+
+    def test_exception(self):
+        paddle.disable_static()
+        loader = DataLoader(
+            ErrorDataset(),
+            batch_size=BATCH_SIZE,
+            num_workers=2,
+            worker_mode='thread',
+        )
+        # worker exception is reraised in reader thread, which kills
+        # the blocking queue and fails reading in main thread
+        with self.assertRaises(Exception):
+            for _ in loader():
+                pass
+
+    def test_invalid_mode(self):
+        with self.assertRaises(AssertionError):
+            DataLoader(IndexDataset(), num_workers=2, worker_mode='fiber')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,180 @@
+# Copyright (c) 2022 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+import paddle
+from paddle.incubate.distributed.utils.io import load_sharded, save_sharded
+from paddle.incubate.distributed.utils.io.dist_sharded import (
+    _flatten_state_dict,
+    _local_shard_metas,
+    _plan_shards,
+    _read_shards,
+    _write_metadata,
+    _write_shard_file,
+)
+
+
+class TestShardedSaveLoad(unittest.TestCase):
+    def setUp(self):
+        paddle.disable_static()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, 'checkpoint')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_layer_and_optimizer(self):
+        layer = paddle.nn.Linear(4, 8)
+        scheduler = paddle.optimizer.lr.StepDecay(0.1, step_size=1)
+        opt = paddle.optimizer.Adam(scheduler, parameters=layer.parameters())
+        layer(paddle.rand([2, 4])).mean().backward()
+        opt.step()
+        scheduler.step()
+
+        save_sharded(layer.state_dict(), os.path.join(self.path, 'model'))
+        save_sharded(opt.state_dict(), os.path.join(self.path, 'opt'))
+
+        new_layer = paddle.nn.Linear(4, 8)
+        new_layer.set_state_dict(
+            load_sharded(
+                new_layer.state_dict(), os.path.join(self.path, 'model')
+            )
+        )
+        for key, value in layer.state_dict().items():
+            np.testing.assert_array_equal(
+                new_layer.state_dict()[key].numpy(), value.numpy()
+            )
+
+        opt_state = opt.state_dict()
+        load_state = load_sharded(opt_state, os.path.join(self.path, 'opt'))
+        self.assertEqual(load_state['LR_Scheduler'], opt_state['LR_Scheduler'])
+        for key, value in opt_state.items():
+            if isinstance(value, paddle.Tensor):
+                np.testing.assert_array_equal(
+                    load_state[key].numpy(), value.numpy()
+                )
+
+    def simulate_save(self, rank_state_dicts, mp_degree, split_axes):
+        flats = [_flatten_state_dict(sd) for sd in rank_state_dicts]
+        rank_metas = [
+            _local_shard_metas(flat, split_axes, rank % mp_degree, mp_degree)
+            for rank, flat in enumerate(flats)
+        ]
+        rank_keys, tensors = _plan_shards(rank_metas)
+        os.makedirs(self.path)
+        for rank, flat in enumerate(flats):
+            if len(rank_keys[rank]) > 0:
+                _write_shard_file(flat, rank_keys[rank], self.path, rank)
+        _write_metadata(tensors, flats[0], self.path)
+        return rank_keys, tensors
+
+    def simulate_load(self, state_dict, mp_rank, mp_degree, split_axes):
+        metadata = paddle.load(os.path.join(self.path, 'metadata.pdmeta'))
+        metas = _local_shard_metas(
+            _flatten_state_dict(state_dict), split_axes, mp_rank, mp_degree
+        )
+        return _read_shards(metadata['tensors'], metas, self.path)
+
+    def test_reshard(self):
+        weight = np.random.random([4, 6]).astype('float32')
+        bias = np.random.random([6]).astype('float32')
+        split_axes = {('w',): 1}
+
+        # mp 2 and dp 2, rank 0/2 and 1/3 hold the same shards
+        rank_state_dicts = [
+            {
+                'w': paddle.to_tensor(weight[:, mp * 3 : (mp + 1) * 3]),
+                'b': paddle.to_tensor(bias),
+            }
+            for mp in [0, 1, 0, 1]
+        ]
+        rank_keys, tensors = self.simulate_save(rank_state_dicts, 2, split_axes)
+        # the replicated bias is written by an idle rank
+        self.assertEqual(rank_keys, [[('w',)], [('w',)], [('b',)], []])
+        self.assertEqual(tensors[('w',)]['global_shape'], [4, 6])
+        self.assertEqual(len(tensors[('w',)]['shards']), 2)
+        self.assertFalse(
+            os.path.exists(os.path.join(self.path, 'rank3.pdshard'))
+        )
+
+        # load without mp
+        state_dict = {'w': paddle.zeros([4, 6]), 'b': paddle.zeros([6])}
+        arrays = self.simulate_load(state_dict, 0, 1, split_axes)
+        np.testing.assert_array_equal(arrays[('w',)], weight)
+        np.testing.assert_array_equal(arrays[('b',)], bias)
+
+        # load with mp 3, local shards cross saved shards
+        for mp_rank in range(3):
+            state_dict = {'w': paddle.zeros([4, 2])}
+            arrays = self.simulate_load(state_dict, mp_rank, 3, split_axes)
+            np.testing.assert_array_equal(
+                arrays[('w',)], weight[:, mp_rank * 2 : (mp_rank + 1) * 2]
+            )
+
+        with self.assertRaises(ValueError):
+            self.simulate_load({'w': paddle.zeros([4, 4])}, 0, 1, split_axes)
+
+    def test_balanced_writers(self):
+        # pure data parallel, all shards are replicated on all ranks
+        shapes = {('a',): [8, 4], ('b',): [4, 4], ('c',): [4, 4], ('d',): [2]}
+        metas = {
+            key: {
+                'global_shape': shape,
+                'offsets': [0] * len(shape),
+                'shape': shape,
+            }
+            for key, shape in shapes.items()
+        }
+        rank_keys, tensors = _plan_shards([metas] * 4)
+        self.assertEqual(rank_keys, [[('a',)], [('b',)], [('c',)], [('d',)]])
+
+        rank_keys, _ = _plan_shards([metas] * 2)
+        loads = [
+            sum(int(np.prod(shapes[key])) for key in keys) for keys in rank_keys
+        ]
+        self.assertEqual(loads, [34, 32])
+        for key in shapes:
+            self.assertEqual(len(tensors[key]['shards']), 1)
+
+    def test_errors(self):
+        with self.assertRaises(ValueError):
+            load_sharded({}, self.path)
+        with self.assertRaises(ValueError):
+            _plan_shards(
+                [
+                    {
+                        ('w',): {
+                            'global_shape': [2],
+                            'offsets': [0],
+                            'shape': [2],
+                        }
+                    },
+                    {
+                        ('w',): {
+                            'global_shape': [3],
+                            'offsets': [0],
+                            'shape': [3],
+                        }
+                    },
+                ]
+            )
+
+
+if __name__ == '__main__':
+    unittest.main()
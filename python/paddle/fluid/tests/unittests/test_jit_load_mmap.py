@@ -0,0 +1,147 @@
+# Copyright (c) 2022 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+import paddle
+
+
+class LinearNet(paddle.nn.Layer):
+    def __init__(self):
+        super().__init__()
+        self._linear = paddle.nn.Linear(8, 4)
+        self._bn = paddle.nn.BatchNorm1D(4)
+
+    @paddle.jit.to_static(
+        input_spec=[paddle.static.InputSpec(shape=[None, 8], dtype='float32')]
+    )
+    def forward(self, x):
+        return self._bn(self._linear(x))
+
+
+class TestJitLoadMmap(unittest.TestCase):
+    def setUp(self):
+        paddle.disable_static()
+        paddle.set_device('cpu')
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, 'linear/model')
+        self.layer = LinearNet()
+        self.layer.eval()
+        paddle.jit.save(self.layer, self.path)
+        self.x = paddle.rand([2, 8])
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_eval(self):
+        loaded = paddle.jit.load(self.path, mmap=True)
+        loaded.eval()
+        self.assertEqual(len(loaded._lazy_vars), 6)
+        for param in loaded.parameters():
+            self.assertFalse(param._is_initialized())
+
+        # each layer maps the file copy-on-write
+        other = paddle.jit.load(self.path, mmap=True)
+        other.eval()
+        for name, array in other._lazy_vars.items():
+            self.assertIsNot(array, loaded._lazy_vars[name])
+            self.assertTrue(array.flags.writeable)
+
+        # only arrays aligned to their dtype share memory
+        aligned = {
+            name
+            for name, array in loaded._lazy_vars.items()
+            if array.flags.aligned
+        }
+        np.testing.assert_allclose(
+            loaded(self.x).numpy(), self.layer(self.x).numpy(), rtol=1e-05
+        )
+        self.assertEqual(loaded._shared_lazy_vars, aligned)
+        self.assertEqual(set(loaded._lazy_vars), aligned)
+
+        expected = {
+            value.name: value.numpy()
+            for value in self.layer.state_dict().values()
+        }
+        suffix_varname_dict = loaded._program_holder_dict[
+            'forward'
+        ]._suffix_varname_dict
+        state_dict = loaded.state_dict()
+        for name, dy_name in loaded._persistable_var_name_dict.items():
+            np.testing.assert_array_equal(
+                state_dict[dy_name].numpy(),
+                expected[suffix_varname_dict[name]],
+            )
+
+        # writes to shared variables go to private pages of the layer
+        other(self.x)
+        for name in loaded._shared_lazy_vars:
+            dy_name = loaded._persistable_var_name_dict[name]
+            var = state_dict[dy_name]
+            value = var.numpy()
+            with paddle.no_grad():
+                paddle.assign(paddle.zeros_like(var), output=var)
+            other_var = other.state_dict()[
+                other._persistable_var_name_dict[name]
+            ]
+            np.testing.assert_array_equal(other_var.numpy(), value)
+        reloaded = paddle.jit.load(self.path, mmap=True)
+        reloaded.eval()
+        np.testing.assert_allclose(
+            reloaded(self.x).numpy(), self.layer(self.x).numpy(), rtol=1e-05
+        )
+
+    def test_set_value_before_materialized(self):
+        loaded = paddle.jit.load(self.path, mmap=True)
+        loaded.eval()
+        dy_names = {
+            dy_name: name
+            for name, dy_name in loaded._persistable_var_name_dict.items()
+        }
+        dy_name, param = next(loaded.named_parameters())
+        value = np.ones(param.shape, dtype='float32')
+        param.set_value(value)
+        loaded(self.x)
+        # the value set is not overwritten by the mapped array
+        np.testing.assert_array_equal(param.numpy(), value)
+        self.assertNotIn(dy_names[dy_name], loaded._lazy_vars)
+
+    def test_train(self):
+        loaded = paddle.jit.load(self.path, mmap=True)
+        loaded.eval()
+        loaded(self.x)
+        loaded.train()
+        self.assertEqual(len(loaded._lazy_vars), 0)
+        self.assertEqual(len(loaded._shared_lazy_vars), 0)
+
+        sgd = paddle.optimizer.SGD(
+            learning_rate=0.1, parameters=loaded.parameters()
+        )
+        loaded(self.x).mean().backward()
+        sgd.step()
+
+        # the params file is not changed by training
+        reloaded = paddle.jit.load(self.path, mmap=True)
+        reloaded.eval()
+        np.testing.assert_allclose(
+            reloaded(self.x).numpy(), self.layer(self.x).numpy(), rtol=1e-05
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
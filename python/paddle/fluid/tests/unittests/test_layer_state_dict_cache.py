@@ -0,0 +1,111 @@
+# Copyright (c) 2022 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import collections
+import unittest
+from unittest import mock
+
+import numpy as np
+
+import paddle
+from paddle.fluid.dygraph import layers
+
+
+class Net(paddle.nn.Layer):
+    def __init__(self):
+        super().__init__()
+        self.blocks = paddle.nn.LayerList(
+            [paddle.nn.Linear(4, 4) for _ in range(3)]
+        )
+        self.norm = paddle.nn.BatchNorm1D(4)
+
+
+class TestStateDictCache(unittest.TestCase):
+    def setUp(self):
+        paddle.disable_static()
+
+    def test_cache_invalidation(self):
+        net = Net()
+        keys = list(net.state_dict().keys())
+        self.assertEqual(len(keys), 10)
+        self.assertEqual(
+            list(net._state_dict_impl(collections.OrderedDict()).keys()), keys
+        )
+        net.norm.register_buffer('cache', paddle.zeros([1]), persistable=False)
+        self.assertNotIn('norm.cache', net.state_dict())
+        self.assertIn('norm.cache', net.to_static_state_dict())
+
+        # cached entries are used without traversing sublayers
+        with mock.patch.object(
+            paddle.nn.Linear, '_state_dict_impl', side_effect=AssertionError
+        ):
+            self.assertEqual(list(net.state_dict().keys()), keys)
+
+        net.blocks.append(paddle.nn.Linear(4, 4))
+        self.assertEqual(len(net.state_dict()), 12)
+        del net.blocks[0]
+        self.assertEqual(len(net.state_dict()), 10)
+        self.assertIn('blocks.0.weight', net.state_dict())
+        net.blocks[0].register_buffer('step', paddle.zeros([1]))
+        self.assertIn('blocks.0.step', net.state_dict())
+        new_weight = net.create_parameter([4, 4])
+        net.blocks[0].weight = new_weight
+        self.assertIs(net.state_dict()['blocks.0.weight'], new_weight)
+
+        # state dict hooks of sublayers disable the cache, they get the
+        # dict of the root layer with structured names
+        def hook(state_dict):
+            state_dict.pop('blocks.0.step')
+
+        helper = net.blocks[0].register_state_dict_hook(hook)
+        self.assertNotIn('blocks.0.step', net.state_dict())
+        self.assertIn('blocks.0.step', net.state_dict(use_hook=False))
+        helper.remove()
+        self.assertIn('blocks.0.step', net.state_dict())
+
+        # prefix is applied to cached names
+        self.assertIn(
+            'net.norm.weight',
+            net.state_dict(structured_name_prefix='net.'),
+        )
+
+    def test_set_state_dict(self):
+        net, other = Net(), Net()
+        state_dict = {k: v.numpy() for k, v in other.state_dict().items()}
+        with mock.patch.object(layers, '_STATE_PACK_PARALLEL_BYTES', 0):
+            missing_keys, unexpected_keys = net.set_state_dict(state_dict)
+        self.assertEqual(missing_keys, [])
+        self.assertEqual(unexpected_keys, [])
+        for key, value in other.state_dict().items():
+            np.testing.assert_array_equal(
+                net.state_dict()[key].numpy(), value.numpy()
+            )
+
+        # tensor values are assigned on device
+        other.blocks[0].weight.set_value(np.ones([4, 4], 'float32'))
+        net.set_state_dict(other.state_dict())
+        np.testing.assert_array_equal(
+            net.blocks[0].weight.numpy(), np.ones([4, 4], 'float32')
+        )
+        self.assertIsNot(net.blocks[0].weight, other.blocks[0].weight)
+        self.assertFalse(net.blocks[0].weight.stop_gradient)
+
+        # mismatched values are skipped
+        state_dict['blocks.0.weight'] = np.zeros([2, 2], 'float32')
+        missing_keys, _ = net.set_state_dict(state_dict)
+        self.assertEqual(missing_keys, ['blocks.0.weight'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+# Copyright (c) 2022 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+
+import numpy as np
+
+import paddle
+from paddle.io import DataLoader, Dataset, DistributedBatchSampler
+
+SAMPLE_NUM = 30
+BATCH_SIZE = 4
+EPOCH_NUM = 4
+
+
+class IndexDataset(Dataset):
+    def __getitem__(self, idx):
+        return np.array([idx]).astype('int64')
+
+    def __len__(self):
+        return SAMPLE_NUM
+
+
+class TestPersistentWorkersPrefetch(unittest.TestCase):
+    def get_sampler(self):
+        return DistributedBatchSampler(
+            IndexDataset(), batch_size=BATCH_SIZE, shuffle=True
+        )
+
+    def read_epochs(self, persistent_workers, epochs):
+        sampler = self.get_sampler()
+        loader = DataLoader(
+            IndexDataset(),
+            batch_sampler=sampler,
+            num_workers=2,
+            persistent_workers=persistent_workers,
+        )
+        results = []
+        for epoch in epochs:
+            if epoch is not None:
+                sampler.set_epoch(epoch)
+            indices = []
+            for data in loader():
+                indices.extend(data.numpy()[:, 0].tolist())
+            results.append(indices)
+        return results
+
+    def test_set_epoch(self):
+        paddle.disable_static()
+        epochs = list(range(EPOCH_NUM))
+        expect = self.read_epochs(False, epochs)
+        self.assertEqual(self.read_epochs(True, epochs), expect)
+
+    def test_auto_epoch(self):
+        paddle.disable_static()
+        epochs = [None] * EPOCH_NUM
+        expect = self.read_epochs(False, epochs)
+        self.assertEqual(self.read_epochs(True, epochs), expect)
+
+    def test_repeat_epoch(self):
+        # prefetched batches should be dropped if epoch set to
+        # a value different from prefetched one
+        paddle.disable_static()
+        epochs = [0, 0, 3, 1]
+        expect = self.read_epochs(False, epochs)
+        self.assertEqual(self.read_epochs(True, epochs), expect)
+
+    def test_break(self):
+        paddle.disable_static()
+        loader = DataLoader(
+            IndexDataset(),
+            batch_size=BATCH_SIZE,
+            num_workers=2,
+            persistent_workers=True,
+        )
+        for _ in range(EPOCH_NUM):
+            for i, data in enumerate(loader()):
+                if i == len(loader) - 2:
+                    break
+            indices = []
+            for data in loader():
+                indices.extend(data.numpy()[:, 0].tolist())
+            self.assertEqual(indices, list(range(SAMPLE_NUM)))
+
+
+if __name__ == '__main__':
+    unittest.main()
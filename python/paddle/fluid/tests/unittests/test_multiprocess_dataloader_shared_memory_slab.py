@@ -0,0 +1,74 @@
+# Copyright (c) 2022 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+
+import numpy as np
+
+import paddle
+from paddle.io import DataLoader, Dataset
+
+IMAGE_SIZE = 16
+SAMPLE_NUM = 50
+BATCH_SIZE = 8
+
+
+class IndexDataset(Dataset):
+    def __init__(self, sample_num):
+        self.sample_num = sample_num
+
+    def __getitem__(self, idx):
+        image = np.full([IMAGE_SIZE], idx).astype('float32')
+        label = np.array([idx]).astype('int64')
+        return {'image': image, 'label': label, 'name': str(idx)}
+
+    def __len__(self):
+        return self.sample_num
+
+
+class TestSharedMemorySlab(unittest.TestCase):
+    def run_main(self, num_workers, persistent_workers, epoch_num=3):
+        paddle.disable_static()
+        dataset = IndexDataset(SAMPLE_NUM)
+        loader = DataLoader(
+            dataset,
+            batch_size=BATCH_SIZE,
+            num_workers=num_workers,
+            drop_last=False,
+            persistent_workers=persistent_workers,
+            use_shared_memory_slab=True,
+        )
+        for _ in range(epoch_num):
+            indices = []
+            for data in loader():
+                image = data['image'].numpy()
+                label = data['label'].numpy()
+                self.assertEqual(image.shape[0], label.shape[0])
+                self.assertTrue(image.shape[0] <= BATCH_SIZE)
+                for i in range(label.shape[0]):
+                    np.testing.assert_array_equal(
+                        image[i], np.full([IMAGE_SIZE], label[i, 0])
+                    )
+                    self.assertEqual(data['name'][i], str(label[i, 0]))
+                indices.extend(label[:, 0].tolist())
+            self.assertEqual(indices, list(range(SAMPLE_NUM)))
+
+    def test_main(self):
+        for num_workers in [1, 2]:
+            for persistent_workers in [False, True]:
+                self.run_main(num_workers, persistent_workers)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,134 @@
+# Copyright (c) 2022 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from io import BytesIO
+from unittest import mock
+
+import numpy as np
+
+import paddle
+import paddle.framework.io as io
+from paddle.framework.io import compact_checkpoint, prune_chunk_store
+
+
+class TestIncrementalSaveLoad(unittest.TestCase):
+    def setUp(self):
+        paddle.disable_static()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.chunk_store = os.path.join(self.temp_dir.name, 'chunks')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def list_chunks(self):
+        return {
+            digest
+            for dirname in os.listdir(self.chunk_store)
+            if os.path.isdir(os.path.join(self.chunk_store, dirname))
+            for digest in os.listdir(os.path.join(self.chunk_store, dirname))
+        }
+
+    def check_state_dict(self, load_dict, state_dict):
+        self.assertEqual(list(load_dict.keys()), list(state_dict.keys()))
+        for key, value in state_dict.items():
+            self.assertEqual(load_dict[key].name, value.name)
+            np.testing.assert_array_equal(load_dict[key].numpy(), value.numpy())
+
+    def test_incremental(self):
+        backbone = paddle.nn.Linear(64, 64)
+        head = paddle.nn.Linear(64, 2)
+        state_dict = dict(backbone.state_dict())
+        state_dict.update(
+            {'head.' + k: v for k, v in head.state_dict().items()}
+        )
+        path_1 = os.path.join(self.temp_dir.name, 'step_1.pdparams')
+        paddle.save(state_dict, path_1, chunk_store=self.chunk_store)
+        chunks_1 = self.list_chunks()
+        self.assertEqual(len(chunks_1), 4)
+
+        # only chunks of changed tensor are written
+        head.weight.set_value(head.weight + 1.0)
+        path_2 = os.path.join(self.temp_dir.name, 'step_2.pdparams')
+        paddle.save(state_dict, path_2, chunk_store=self.chunk_store)
+        chunks_2 = self.list_chunks()
+        self.assertEqual(len(chunks_2 - chunks_1), 1)
+        self.check_state_dict(paddle.load(path_2), state_dict)
+
+        # tensors larger than a chunk only write changed chunks
+        with mock.patch.object(io, '_MMAP_CHUNK_SIZE', 1024):
+            emb = paddle.nn.Embedding(32, 16)
+            path_3 = os.path.join(self.temp_dir.name, 'emb.pdparams')
+            paddle.save(emb.state_dict(), path_3, chunk_store=self.chunk_store)
+            chunks_3 = self.list_chunks()
+            weight = emb.weight.numpy()
+            weight[0] += 1.0
+            emb.weight.set_value(weight)
+            paddle.save(emb.state_dict(), path_3, chunk_store=self.chunk_store)
+            self.assertEqual(len(self.list_chunks() - chunks_3), 1)
+            self.check_state_dict(paddle.load(path_3), emb.state_dict())
+
+        # full snapshot does not depend on chunk store
+        full_path = os.path.join(self.temp_dir.name, 'full.pdparams')
+        compact_checkpoint(path_2, full_path)
+        # path_2 refers 4 chunks, others are removed
+        num_chunks = len(self.list_chunks())
+        self.assertEqual(
+            prune_chunk_store(self.chunk_store, [path_2]), num_chunks - 4
+        )
+        self.assertEqual(prune_chunk_store(self.chunk_store, []), 4)
+        self.check_state_dict(paddle.load(full_path), state_dict)
+        with self.assertRaises(ValueError):
+            paddle.load(path_2)
+
+    @unittest.skipIf(
+        sys.platform == 'win32', "shared lock is exclusive on Windows"
+    )
+    def test_prune_waits_for_saving(self):
+        layer = paddle.nn.Linear(4, 4)
+        path = os.path.join(self.temp_dir.name, 'model.pdparams')
+        paddle.save(layer.state_dict(), path, chunk_store=self.chunk_store)
+
+        removed = []
+        # holds the lock like a saving in progress
+        with io._chunk_store_lock(self.chunk_store, shared=True):
+            # saving at the same time is not blocked
+            paddle.save(layer.state_dict(), path, chunk_store=self.chunk_store)
+            thread = threading.Thread(
+                target=lambda: removed.append(
+                    prune_chunk_store(self.chunk_store, [])
+                )
+            )
+            thread.start()
+            thread.join(0.5)
+            self.assertTrue(thread.is_alive())
+            self.assertEqual(len(self.list_chunks()), 2)
+        thread.join()
+        self.assertEqual(removed, [2])
+
+    def test_errors(self):
+        with self.assertRaises(ValueError):
+            paddle.save({}, BytesIO(), chunk_store=self.chunk_store)
+        path = os.path.join(self.temp_dir.name, 'model.pdparams')
+        paddle.save({}, path, use_mmap_format=True)
+        with self.assertRaises(ValueError):
+            compact_checkpoint(path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,133 @@
+# Copyright (c) 2022 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import collections
+import os
+import tempfile
+import unittest
+from io import BytesIO
+
+import numpy as np
+
+import paddle
+
+
+class TestSaveLoadMmapFormat(unittest.TestCase):
+    def setUp(self):
+        paddle.disable_static()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, 'model.pdparams')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_state_dict(self):
+        layer = paddle.nn.Linear(5, 10)
+        state_dict = layer.state_dict()
+        paddle.save(state_dict, self.path, use_mmap_format=True)
+
+        for mmap in [True, False]:
+            load_dict = paddle.load(self.path, mmap=mmap)
+            self.assertEqual(list(load_dict.keys()), list(state_dict.keys()))
+            for key, value in state_dict.items():
+                self.assertTrue(isinstance(load_dict[key], paddle.Tensor))
+                self.assertEqual(load_dict[key].name, value.name)
+                np.testing.assert_array_equal(
+                    load_dict[key].numpy(), value.numpy()
+                )
+
+        # numpy arrays are views of the mapping
+        load_dict = paddle.load(self.path, return_numpy=True)
+        self.assertFalse(load_dict['weight'].flags.writeable)
+        new_layer = paddle.nn.Linear(5, 10)
+        new_layer.set_state_dict(load_dict)
+        np.testing.assert_array_equal(
+            new_layer.weight.numpy(), layer.weight.numpy()
+        )
+
+    def test_load_keys(self):
+        obj = {
+            'model': {'w': paddle.rand([3, 4])},
+            'array': np.arange(6).reshape([2, 3]),
+            'epoch': 10,
+        }
+        paddle.save(obj, self.path, use_mmap_format=True)
+        load_obj = paddle.load(self.path, keys=['array', 'epoch'])
+        self.assertEqual(list(load_obj.keys()), ['array', 'epoch'])
+        np.testing.assert_array_equal(load_obj['array'], obj['array'])
+        self.assertEqual(load_obj['epoch'], 10)
+
+        with self.assertRaises(ValueError):
+            paddle.load(self.path, keys=['optimizer'])
+
+    def test_tied_tensors(self):
+        weight = paddle.rand([64, 16])
+        array = np.arange(6)
+        obj = {'embedding': weight, 'output': weight, 'arrays': [array, array]}
+        paddle.save(obj, self.path, use_mmap_format=True)
+        untied = dict(obj, output=paddle.rand([64, 16]))
+        untied_path = self.path + '.untied'
+        paddle.save(untied, untied_path, use_mmap_format=True)
+        # tied tensor is written once
+        self.assertLess(
+            os.path.getsize(self.path), os.path.getsize(untied_path)
+        )
+
+        load_obj = paddle.load(self.path)
+        self.assertIs(load_obj['embedding'], load_obj['output'])
+        self.assertIs(load_obj['arrays'][0], load_obj['arrays'][1])
+        np.testing.assert_array_equal(
+            load_obj['output'].numpy(), weight.numpy()
+        )
+
+    def test_load_keys_pickle_format(self):
+        obj = collections.OrderedDict(
+            [('epoch', 10), ('model', {'w': paddle.rand([3])}), ('step', 100)]
+        )
+        paddle.save(obj, self.path)
+        load_obj = paddle.load(self.path, keys=['step', 'epoch'])
+        self.assertIsInstance(load_obj, collections.OrderedDict)
+        self.assertEqual(list(load_obj.keys()), ['epoch', 'step'])
+
+        with self.assertRaises(ValueError):
+            paddle.load(self.path, keys=['epoch', 'optimizer'])
+
+    def test_memory_buffer(self):
+        tensor = paddle.rand([2, 3])
+        nested = [paddle.rand([4]), (np.ones([2], 'int64'), 'str')]
+        byio = BytesIO()
+        paddle.save(tensor, byio, use_mmap_format=True)
+        paddle.save(nested, byio, use_mmap_format=True)
+        byio.seek(0)
+
+        load_tensor = paddle.load(byio)
+        np.testing.assert_array_equal(load_tensor.numpy(), tensor.numpy())
+        load_nested = paddle.load(byio)
+        np.testing.assert_array_equal(load_nested[0].numpy(), nested[0].numpy())
+        np.testing.assert_array_equal(load_nested[1][0], nested[1][0])
+        self.assertEqual(load_nested[1][1], 'str')
+
+        with self.assertRaises(ValueError):
+            byio.seek(0)
+            paddle.load(byio, keys=['w'])
+
+    def test_errors(self):
+        with self.assertRaises(ValueError):
+            paddle.save(paddle.nn.Linear(2, 2), self.path, use_mmap_format=True)
+        with self.assertRaises(TypeError):
+            paddle.save({}, self.path, use_mmap_format=1)
+
+
+if __name__ == '__main__':
+    unittest.main()
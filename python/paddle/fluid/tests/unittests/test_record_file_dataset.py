@@ -0,0 +1,133 @@
+# Copyright (c) 2022 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import itertools
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+import paddle
+from paddle.io import DataLoader, RecordFileDataset, RecordFileWriter
+
+SAMPLE_NUM = 100
+SHARD_RECORDS = 7
+
+
+class TestRecordFileDataset(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, 'data', 'train')
+        with RecordFileWriter(
+            self.path, max_shard_records=SHARD_RECORDS
+        ) as writer:
+            for i in range(SAMPLE_NUM):
+                writer.write((np.full([4], i).astype('float32'), np.array([i])))
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def get_labels(self, dataset):
+        return [int(label[0]) for _, label in dataset]
+
+    def test_read(self):
+        for use_mmap in [False, True]:
+            dataset = RecordFileDataset(
+                self.path,
+                num_replicas=1,
+                rank=0,
+                use_mmap=use_mmap,
+                check_crc=True,
+            )
+            self.assertEqual(dataset.num_records, SAMPLE_NUM)
+            self.assertEqual(
+                len(dataset.shards),
+                (SAMPLE_NUM + SHARD_RECORDS - 1) // SHARD_RECORDS,
+            )
+            self.assertEqual(self.get_labels(dataset), list(range(SAMPLE_NUM)))
+
+    def test_split_by_rank(self):
+        labels = []
+        for rank in range(3):
+            dataset = RecordFileDataset(
+                self.path,
+                shuffle=True,
+                shuffle_window=10,
+                num_replicas=3,
+                rank=rank,
+            )
+            labels.extend(self.get_labels(dataset))
+        self.assertEqual(sorted(labels), list(range(SAMPLE_NUM)))
+
+    def test_dataloader_workers(self):
+        paddle.disable_static()
+        dataset = RecordFileDataset(self.path, num_replicas=1, rank=0)
+        loader = DataLoader(dataset, batch_size=4, num_workers=2)
+        labels = []
+        for _, label in loader():
+            labels.extend(label.numpy()[:, 0].tolist())
+        self.assertEqual(sorted(labels), list(range(SAMPLE_NUM)))
+
+    def test_shuffle_epoch(self):
+        dataset = RecordFileDataset(
+            self.path, shuffle=True, shuffle_window=16, num_replicas=1, rank=0
+        )
+        dataset.set_epoch(1)
+        epoch1 = self.get_labels(dataset)
+        self.assertEqual(self.get_labels(dataset), epoch1)
+        dataset.set_epoch(2)
+        epoch2 = self.get_labels(dataset)
+        self.assertNotEqual(epoch1, epoch2)
+        self.assertEqual(sorted(epoch2), list(range(SAMPLE_NUM)))
+
+    def test_resume(self):
+        for shuffle in [False, True]:
+            dataset = RecordFileDataset(
+                self.path,
+                shuffle=shuffle,
+                shuffle_window=16,
+                num_replicas=1,
+                rank=0,
+            )
+            dataset.set_epoch(3)
+            expect = self.get_labels(dataset)
+
+            it = iter(dataset)
+            first = [int(l[0]) for _, l in itertools.islice(it, 37)]
+            state = dataset.state_dict()
+            it.close()
+            part = state['parts'][0]
+            self.assertEqual(part['num_yielded'], 37)
+            if not shuffle:
+                self.assertEqual(
+                    (part['shard'], part['offset']),
+                    (37 // SHARD_RECORDS, 37 % SHARD_RECORDS),
+                )
+
+            dataset = RecordFileDataset(
+                self.path,
+                shuffle=shuffle,
+                shuffle_window=16,
+                num_replicas=1,
+                rank=0,
+            )
+            dataset.set_state_dict(state)
+            self.assertEqual(first + self.get_labels(dataset), expect)
+            # next iteration starts from beginning
+            self.assertEqual(self.get_labels(dataset), expect)
+
+
+if __name__ == '__main__':
+    unittest.main()
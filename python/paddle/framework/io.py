@@ -14,11 +14,16 @@
 
 import collections
 import copyreg
+import gzip
+import hashlib
+import mmap
 import os
 import pickle
+import struct
 import sys
 import warnings
 from collections.abc import Iterable
+from io import BytesIO
 
 import numpy as np
 
@@ -220,6 +225,8 @@ def _parse_load_config(configs):
         'params_filename',
         'keep_name_table',
         'return_numpy',
+        'keys',
+        'mmap',
     ]
 
     # input check
@@ -236,12 +243,19 @@ def _parse_load_config(configs):
     inner_config.params_filename = configs.get('params_filename', None)
     inner_config.keep_name_table = configs.get('keep_name_table', None)
     inner_config.return_numpy = configs.get('return_numpy', False)
+    inner_config.keys = configs.get('keys', None)
+    inner_config.mmap = configs.get('mmap', True)
 
     return inner_config
 
 
 def _parse_save_config(configs):
-    supported_configs = ['use_binary_format', 'pickle_protocol']
+    supported_configs = [
+        'use_binary_format',
+        'pickle_protocol',
+        'use_mmap_format',
+        'chunk_store',
+    ]
 
     # input check
     for key in configs:
@@ -255,6 +269,8 @@ def _parse_save_config(configs):
     inner_config = _SaveLoadConfig()
     inner_config.use_binary_format = configs.get('use_binary_format', False)
     inner_config.pickle_protocol = configs.get('pickle_protocol', None)
+    inner_config.use_mmap_format = configs.get('use_mmap_format', False)
+    inner_config.chunk_store = configs.get('chunk_store', None)
 
     return inner_config
 
@@ -339,6 +355,396 @@ def _pickle_save(obj, f, protocol):
         pickler.dump(obj)
 
 
+# NOTE: [ mmap tensor file format ] Tensors are written as raw buffers
+# aligned to _MMAP_ALIGNMENT bytes one by one while pickling the object
+# structure, and the pickled structure and tensor index are written as
+# header at the end, whose offset is recorded after the magic. In loading
+# the file is memory mapped, tensors are built from the mapping directly
+# instead of unpickling a copy of all data. Values of dict are pickled
+# separately in header, so that part of keys can be loaded. Layout:
+#   magic | header offset(uint64) | header size(uint64) | tensor data | header
+_MMAP_MAGIC = b'PDTENSv1'
+_MMAP_PREFIX = struct.Struct('<8sQQ')
+_MMAP_ALIGNMENT = 64
+_MMAP_VERSION = 1
+
+# NOTE: [ incremental checkpoint ] With `chunk_store`, tensor data is not
+# written to the file, but split into chunks of _MMAP_CHUNK_SIZE bytes and
+# stored in the chunk store directory by their digests, and the header
+# records digests of chunks of each tensor. Chunks of unchanged tensors, or
+# unchanged parts of tensors e.g. embedding with sparse updates, exist in
+# the store already and are not written again.
+_MMAP_CHUNKED_VERSION = 2
+_MMAP_CHUNK_SIZE = 4 * 1024 * 1024
+_CHUNK_STORE_LOCK = '.lock'
+
+
+def _chunk_path(chunk_store, digest):
+    return os.path.join(chunk_store, digest[:2], digest)
+
+
+def _chunk_store_lock(chunk_store, shared):
+    # saving holds a shared lock while writing chunks and the file which
+    # refers to them, and pruning holds an exclusive lock, so that chunks
+    # found existing by saving are not removed before the file is written
+    from paddle.utils._file_lock import _FileLock
+
+    return _FileLock(os.path.join(chunk_store, _CHUNK_STORE_LOCK), shared)
+
+
+def _write_chunks(data, chunk_store):
+    data = data.reshape([-1]).view('uint8')
+    digests = []
+    for start in range(0, max(len(data), 1), _MMAP_CHUNK_SIZE):
+        chunk = data[start : start + _MMAP_CHUNK_SIZE]
+        digest = hashlib.blake2b(chunk, digest_size=20).hexdigest()
+        chunk_path = _chunk_path(chunk_store, digest)
+        if not os.path.exists(chunk_path):
+            os.makedirs(os.path.dirname(chunk_path), exist_ok=True)
+            # write to a temporary file and rename, so that interrupted
+            # saving leaves no partial chunks
+            tmp_path = '{}.tmp.{}'.format(chunk_path, os.getpid())
+            with open(tmp_path, 'wb') as f:
+                f.write(chunk)
+            os.replace(tmp_path, chunk_path)
+        digests.append(digest)
+    return tuple(digests)
+
+
+def _read_chunks(array, digests, chunk_store):
+    buffer = array.reshape([-1]).view('uint8')
+    offset = 0
+    for digest in digests:
+        chunk_path = _chunk_path(chunk_store, digest)
+        if not os.path.exists(chunk_path):
+            raise ValueError(
+                "Chunk {} is not found in chunk store {}.".format(
+                    digest, chunk_store
+                )
+            )
+        with open(chunk_path, 'rb') as f:
+            offset += f.readinto(buffer[offset:])
+    if offset != len(buffer):
+        raise ValueError(
+            "Chunks in chunk store {} are incomplete.".format(chunk_store)
+        )
+
+
+def _is_gzip_file(path):
+    if not (_is_file_path(path) and os.path.isfile(path)):
+        return False
+    with open(path, 'rb') as f:
+        return f.read(2) == b'\x1f\x8b'
+
+
+def _is_mmap_format(f):
+    pos = f.tell()
+    magic = f.read(len(_MMAP_MAGIC))
+    f.seek(pos)
+    return magic == _MMAP_MAGIC
+
+
+def _mmap_save(obj, f, protocol, chunk_store=None):
+    if isinstance(obj, Program):
+        raise ValueError(
+            "`use_mmap_format` of `paddle.save` do not support saving Program."
+        )
+
+    base = f.tell()
+    f.write(_MMAP_PREFIX.pack(_MMAP_MAGIC, 0, 0))
+    offset = _MMAP_PREFIX.size
+    tensors = []
+
+    def write_tensor(kind, name, data):
+        nonlocal offset
+        data = np.ascontiguousarray(data)
+        if chunk_store is not None:
+            # see [ incremental checkpoint ]
+            chunks = _write_chunks(data, chunk_store)
+            tensors.append((kind, name, data.dtype.str, data.shape, chunks))
+            return len(tensors) - 1
+        padding = -offset % _MMAP_ALIGNMENT
+        f.write(b'\0' * padding)
+        offset += padding
+        tensors.append((kind, name, data.dtype.str, data.shape, offset))
+        f.write(data.reshape([-1]).view('uint8'))
+        offset += data.nbytes
+        return len(tensors) - 1
+
+    # {id of object: (object, tensor index)}, persistent_id is called
+    # before memo of pickle is checked, objects referred several times,
+    # e.g. tied weights, are written once and loaded as the same object
+    written = {}
+
+    def write_once(obj, kind, name, to_numpy):
+        if id(obj) not in written:
+            # object is held so that its id is not reused
+            written[id(obj)] = (obj, write_tensor(kind, name, to_numpy(obj)))
+        return written[id(obj)][1]
+
+    class _TensorPickler(pickle.Pickler):
+        # tensors are written to file once met, so that only one tensor
+        # is copied to numpy at the same time
+        def persistent_id(self, obj):
+            if isinstance(obj, (core.VarBase, core.eager.Tensor)):
+                return write_once(obj, 'varbase', obj.name, lambda t: t.numpy())
+            if isinstance(obj, core.LoDTensor):
+                return write_once(obj, 'lodtensor', None, np.array)
+            if isinstance(obj, np.ndarray) and obj.dtype != np.object_:
+                return write_once(obj, 'ndarray', None, lambda a: a)
+            if isinstance(obj, core.SelectedRows):
+                raise NotImplementedError(
+                    "`paddle.save` do not support saving 'SelectedRows'."
+                )
+            if isinstance(obj, fluid.Layer):
+                raise ValueError(
+                    "paddle do not support saving `paddle.nn.Layer` object."
+                )
+            return None
+
+    def dumps(value):
+        buffer = BytesIO()
+        _TensorPickler(buffer, protocol).dump(value)
+        return buffer.getvalue()
+
+    header = {'version': _MMAP_VERSION}
+    if chunk_store is not None:
+        header['version'] = _MMAP_CHUNKED_VERSION
+        # recorded relative to the file, so that they can be moved together
+        header['chunk_store'] = os.path.relpath(
+            chunk_store, os.path.dirname(os.path.abspath(f.name))
+        )
+    if type(obj) in (dict, collections.OrderedDict):
+        header['type'] = type(obj)
+        header['items'] = [(key, dumps(value)) for key, value in obj.items()]
+    else:
+        header['type'] = None
+        header['obj'] = dumps(obj)
+    header['tensors'] = tensors
+    header = pickle.dumps(header, protocol)
+
+    f.write(header)
+    end = f.tell()
+    f.seek(base)
+    f.write(_MMAP_PREFIX.pack(_MMAP_MAGIC, offset, len(header)))
+    f.seek(end)
+
+
+def _mmap_load(f, path, config):
+    base = f.tell()
+    _, header_offset, header_size = _MMAP_PREFIX.unpack(
+        f.read(_MMAP_PREFIX.size)
+    )
+    f.seek(base + header_offset)
+    header = pickle.loads(f.read(header_size))
+    if header['version'] not in (_MMAP_VERSION, _MMAP_CHUNKED_VERSION):
+        raise ValueError(
+            "`paddle.load` do not support mmap format version {}.".format(
+                header['version']
+            )
+        )
+    tensors = header['tensors']
+    chunk_store = _get_chunk_store(header, path)
+
+    # NOTE: arrays built from the mapping are read-only and hold the
+    # mapping, data is read from disk when it is touched. Memory buffer
+    # is read by copying, for it may be written after loading.
+    mapping = None
+    if _is_file_path(path) and config.mmap and chunk_store is None:
+        mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def read_array(dtype, shape, offset):
+        dtype = np.dtype(dtype)
+        if chunk_store is not None:
+            # offset is digests of chunks, see [ incremental checkpoint ]
+            array = np.empty(shape, dtype)
+            _read_chunks(array, offset, chunk_store)
+            return array
+        if mapping is not None:
+            count = int(np.prod(shape, dtype='int64'))
+            return np.frombuffer(mapping, dtype, count, base + offset).reshape(
+                shape
+            )
+        array = np.empty(shape, dtype)
+        f.seek(base + offset)
+        f.readinto(array.reshape([-1]).view('uint8'))
+        return array
+
+    # tensors referred several times are loaded once, also across items
+    # of dict unpickled separately
+    loaded = {}
+
+    def load_tensor(idx):
+        if idx in loaded:
+            return loaded[idx]
+        kind, name, dtype, shape, offset = tensors[idx]
+        array = read_array(dtype, shape, offset)
+        if kind == 'ndarray' or config.return_numpy:
+            tensor = array
+        elif kind == 'varbase':
+            tensor = _tuple_to_tensor((name, array), False)
+        else:
+            tensor = _ndarray_to_tensor(array, False)
+        loaded[idx] = tensor
+        return tensor
+
+    def loads(data):
+        unpickler = pickle.Unpickler(BytesIO(data))
+        unpickler.persistent_load = load_tensor
+        return unpickler.load()
+
+    if header['type'] is None:
+        if config.keys is not None:
+            raise ValueError(
+                "`keys` of `paddle.load` is only supported when a dict "
+                "is saved."
+            )
+        load_result = loads(header['obj'])
+    else:
+        items = header['items']
+        if config.keys is not None:
+            items = _select_keys(items, config.keys, path)
+        load_result = header['type']((key, loads(data)) for key, data in items)
+
+    f.seek(base + header_offset + header_size)
+    return load_result
+
+
+def _select_keys(items, keys, path):
+    """
+    Select items of given keys from (key, value) pairs of a saved dict in
+    saved order, raise ValueError if any key is not saved.
+    """
+    keys = set(keys)
+    missing_keys = keys - set(key for key, _ in items)
+    if len(missing_keys) > 0:
+        raise ValueError(
+            "`paddle.load` can not find keys {} in {}.".format(
+                sorted(missing_keys, key=str), path
+            )
+        )
+    return [item for item in items if item[0] in keys]
+
+
+def _get_chunk_store(header, path):
+    if header['version'] != _MMAP_CHUNKED_VERSION:
+        return None
+    if not _is_file_path(path):
+        raise ValueError(
+            "File saved with `chunk_store` can only be loaded from file path."
+        )
+    return os.path.normpath(
+        os.path.join(
+            os.path.dirname(os.path.abspath(path)), header['chunk_store']
+        )
+    )
+
+
+def _read_mmap_header(path):
+    with open(path, 'rb') as f:
+        if not _is_mmap_format(f):
+            raise ValueError(
+                "{} is not saved with `use_mmap_format` or `chunk_store`.".format(
+                    path
+                )
+            )
+        _, header_offset, header_size = _MMAP_PREFIX.unpack(
+            f.read(_MMAP_PREFIX.size)
+        )
+        f.seek(header_offset)
+        return pickle.loads(f.read(header_size))
+
+
+def compact_checkpoint(path, output_path=None):
+    """
+    Rebuilds a full snapshot from the file saved by ``paddle.save`` with
+    ``chunk_store``, whose tensor data is read from the chunk store and
+    written to the file, so that it can be loaded without the chunk store.
+
+    Args:
+        path(str): The file saved with ``chunk_store``.
+        output_path(str, optional): The path of the full snapshot. Default
+            None to replace the file of ``path`` .
+
+    Examples:
+        .. code-block:: python
+
+            import paddle
+            from paddle.framework.io import compact_checkpoint
+
+            layer = paddle.nn.Linear(3, 4)
+            paddle.save(layer.state_dict(), 'step_100.pdparams', chunk_store='chunks')
+            compact_checkpoint('step_100.pdparams', 'full.pdparams')
+    """
+    header = _read_mmap_header(path)
+    chunk_store = _get_chunk_store(header, path)
+    if chunk_store is None:
+        raise ValueError("{} is not saved with `chunk_store`.".format(path))
+    if output_path is None:
+        output_path = path
+
+    # the pickled structure refers tensors by index, which is not changed
+    # when tensors are written to the file
+    tmp_path = '{}.tmp.{}'.format(output_path, os.getpid())
+    with open(tmp_path, 'wb') as f:
+        f.write(_MMAP_PREFIX.pack(_MMAP_MAGIC, 0, 0))
+        offset = _MMAP_PREFIX.size
+        tensors = []
+        for kind, name, dtype, shape, chunks in header['tensors']:
+            array = np.empty(shape, np.dtype(dtype))
+            _read_chunks(array, chunks, chunk_store)
+            padding = -offset % _MMAP_ALIGNMENT
+            f.write(b'\0' * padding)
+            offset += padding
+            tensors.append((kind, name, dtype, shape, offset))
+            f.write(array.reshape([-1]).view('uint8'))
+            offset += array.nbytes
+
+        header['version'] = _MMAP_VERSION
+        header['tensors'] = tensors
+        del header['chunk_store']
+        header = pickle.dumps(header, 4)
+        f.write(header)
+        f.seek(0)
+        f.write(_MMAP_PREFIX.pack(_MMAP_MAGIC, offset, len(header)))
+    os.replace(tmp_path, output_path)
+
+
+def prune_chunk_store(chunk_store, paths):
+    """
+    Removes chunks in the chunk store which are not referred by files of
+    ``paths`` , e.g. after old checkpoints are deleted or compacted. Pruning
+    waits for ``paddle.save`` into the chunk store in progress, and blocks
+    following ones until it is finished.
+
+    Args:
+        chunk_store(str): The chunk store directory.
+        paths(list[str]): Files saved with ``chunk_store`` to keep.
+
+    Returns:
+        int: The number of removed chunks.
+    """
+    removed = 0
+    # blocks until saving into the chunk store is finished
+    with _chunk_store_lock(chunk_store, shared=False):
+        used = set()
+        for path in paths:
+            header = _read_mmap_header(path)
+            if header['version'] == _MMAP_CHUNKED_VERSION:
+                for tensor in header['tensors']:
+                    used.update(tensor[-1])
+
+        for dirname in os.listdir(chunk_store):
+            chunk_dir = os.path.join(chunk_store, dirname)
+            if not os.path.isdir(chunk_dir):
+                continue
+            for digest in os.listdir(chunk_dir):
+                if digest not in used:
+                    os.remove(os.path.join(chunk_dir, digest))
+                    removed += 1
+    return removed
+
+
 def _contain_x(obj, condition_func):
     if isinstance(obj, core.SelectedRows):
         raise NotImplementedError(
@@ -660,6 +1066,16 @@ def save(obj, path, protocol=4, **configs):
           use_binary_format(bool): When the saved object is static graph variable, you can specify ``use_binary_for_var``.
           If True, save the file in the c++ binary format when saving a single static graph variable; otherwise, save it in pickle format.
           Default: False
+          use_mmap_format(bool): If True, save tensors as aligned raw buffers with an index header instead of pickling them,
+          tensors are written one by one without copying the whole object, and the file can be memory mapped by ``paddle.load``
+          to build tensors without unpickling, and values of part of keys can be loaded if a dict is saved. Program is not supported.
+          Default: False
+          chunk_store(str): The directory of chunk store for incremental checkpoint, only supported when ``path`` is a file path.
+          If specified, the file is saved in the format of ``use_mmap_format`` , but tensor data is split into chunks stored in the
+          directory by their content, and the file records references to chunks. Chunks of tensors not changed since previous
+          checkpoints with the same chunk store are not written again. Use ``paddle.framework.io.compact_checkpoint`` to rebuild a
+          full snapshot without the chunk store, and ``paddle.framework.io.prune_chunk_store`` to remove unused chunks.
+          Default: None
 
     Returns:
         None
@@ -794,8 +1210,27 @@ def save(obj, path, protocol=4, **configs):
             )
         )
 
+    if not isinstance(config.use_mmap_format, bool):
+        raise TypeError(
+            "Type of `use_mmap_format` should be bool, but received {}.".format(
+                type(config.use_mmap_format)
+            )
+        )
+
+    if config.chunk_store is not None and not _is_file_path(path):
+        raise ValueError(
+            "`chunk_store` of `paddle.save` is only supported when saving to file path."
+        )
+
     if config.use_binary_format:
         _save_binary_var(obj, path)
+    elif config.chunk_store is not None:
+        with _chunk_store_lock(config.chunk_store, shared=True):
+            with _open_file_buffer(path, 'wb') as f:
+                _mmap_save(obj, f, protocol, config.chunk_store)
+    elif config.use_mmap_format:
+        with _open_file_buffer(path, 'wb') as f:
+            _mmap_save(obj, f, protocol)
     else:
         # `protocol` need to be used, `pickle_protocol` is a deprecated arg.
         if config.pickle_protocol is not None:
@@ -819,6 +1254,25 @@ def save(obj, path, protocol=4, **configs):
                 _pickle_save(obj, f, protocol)
 
 
+def _save_to_file_object(obj, f, protocol=4):
+    """
+    Save object of dynamic graph in the pickle format of :code:`paddle.save`
+    into a writable file object, e.g. a gzip file, which is not accepted by
+    :code:`paddle.save` .
+    """
+    if _is_state_dict(obj):
+        if protocol < 2 or protocol > 4:
+            raise ValueError(
+                "Expected 1<'protocol'<5, but received protocol={}".format(
+                    protocol
+                )
+            )
+        saved_obj = _unpack_saved_dict(_build_saved_state_dict(obj), protocol)
+        pickle.dump(saved_obj, f, protocol=protocol)
+    else:
+        _pickle_save(obj, f, protocol)
+
+
 def _legacy_save(obj, path, protocol=2):
     # 1. input check
     if not isinstance(obj, dict):
@@ -921,6 +1375,12 @@ def load(path, **configs):
             by default.
             (3) return_numpy(bool): If specified as True, return tensor as numpy.ndarray, otherwise return tensor as paddle.Tensor.
             Default False.
+            (4) keys(list): If the saved object is a dict, only load values of the given keys. For files saved with
+            ``use_mmap_format=True`` , data of other keys is not read. Default None for all keys.
+            (5) mmap(bool): Only for files saved with ``use_mmap_format=True`` . If True, memory map the file and build tensors from
+            the mapping, numpy.ndarray returned with ``return_numpy=True`` is a read-only view of the mapping, whose data is read
+            from disk when it is touched, e.g. copied to parameters by ``Layer.set_state_dict`` . Otherwise, read data into memory.
+            Files saved with ``chunk_store`` are always read into memory from the chunk store. Default True.
 
     Returns:
         Object(Object): a target object can be used in paddle
@@ -1041,11 +1501,21 @@ def load(path, **configs):
 
     '''
 
+    # files compressed by gzip, e.g. saved by AsyncCheckpointSaver with
+    # compress=True, are decompressed into memory
+    if _is_gzip_file(path):
+        with gzip.open(path, 'rb') as f:
+            path = BytesIO(f.read())
+
     if _is_memory_buffer(path) or os.path.isfile(path):
         config = _parse_load_config(configs)
         exception_type = pickle.UnpicklingError
         try:
             with _open_file_buffer(path, 'rb') as f:
+                # see [ mmap tensor file format ]
+                if _is_mmap_format(f):
+                    return _mmap_load(f, path, config)
+
                 # When value of dict is lager than 4GB ,there is a Bug on 'MAC python3'
                 if (
                     _is_file_path(path)
@@ -1079,7 +1549,24 @@ def load(path, **configs):
                             load_result, config.return_numpy
                         )
 
+                    # whole file is unpickled, only return the keys, other
+                    # keys are deleted in place to keep type of the dict
+                    if config.keys is not None:
+                        selected = dict(
+                            _select_keys(
+                                list(load_result.items()), config.keys, path
+                            )
+                        )
+                        for key in list(load_result.keys()):
+                            if key not in selected:
+                                del load_result[key]
+
                 else:
+                    if config.keys is not None:
+                        raise ValueError(
+                            "`keys` of `paddle.load` is only supported when "
+                            "a dict is saved."
+                        )
                     load_result = _parse_load_result(
                         load_result, config.return_numpy
                     )
@@ -17,7 +17,11 @@ import shutil
 import sys
 import zipfile
 
-from paddle.utils.download import get_path_from_url
+from paddle.utils.download import (
+    _cached_md5,
+    _download_lock,
+    get_path_from_url,
+)
 
 __all__ = []
 
@@ -25,6 +29,8 @@ DEFAULT_CACHE_DIR = '~/.cache'
 VAR_DEPENDENCY = 'dependencies'
 MODULE_HUBCONF = 'hubconf.py'
 HUB_DIR = os.path.expanduser(os.path.join('~', '.cache', 'paddle', 'hub'))
+# md5 of the archive extracted to the repo directory
+HUB_ARCHIVE_MD5_FILE = '.paddle_hub_archive_md5'
 
 
 def _remove_if_exists(path):
@@ -80,6 +86,14 @@ def _make_dirs(dirname):
     Path(dirname).mkdir(exist_ok=True)
 
 
+def _read_archive_md5(repo_dir):
+    md5_file = os.path.join(repo_dir, HUB_ARCHIVE_MD5_FILE)
+    if not os.path.exists(md5_file):
+        return None
+    with open(md5_file, 'r') as f:
+        return f.read().strip()
+
+
 def _get_cache_or_reload(repo, force_reload, verbose=True, source='github'):
     # Setup hub_dir to save downloaded files
     hub_dir = HUB_DIR
@@ -107,31 +121,48 @@ def _get_cache_or_reload(repo, force_reload, verbose=True, source='github'):
         if verbose:
             sys.stderr.write('Using cache found in {}\n'.format(repo_dir))
     else:
-        cached_file = os.path.join(hub_dir, normalized_br + '.zip')
-        _remove_if_exists(cached_file)
-
         url = _git_archive_link(repo_owner, repo_name, branch, source=source)
 
-        fpath = get_path_from_url(
-            url,
-            hub_dir,
-            check_exist=not force_reload,
-            decompress=False,
-            method=('wget' if source == 'gitee' else 'get'),
-        )
-        shutil.move(fpath, cached_file)
-
-        with zipfile.ZipFile(cached_file) as cached_zipfile:
-            extraced_repo_name = cached_zipfile.infolist()[0].filename
-            extracted_repo = os.path.join(hub_dir, extraced_repo_name)
-            _remove_if_exists(extracted_repo)
-            # Unzip the code and rename the base folder
-            cached_zipfile.extractall(hub_dir)
-
-        _remove_if_exists(cached_file)
-        _remove_if_exists(repo_dir)
-        # rename the repo
-        shutil.move(extracted_repo, repo_dir)
+        # processes reloading the same repo are serialized
+        with _download_lock(repo_dir):
+            cached_file = os.path.join(hub_dir, normalized_br + '.zip')
+            _remove_if_exists(cached_file)
+
+            fpath = get_path_from_url(
+                url,
+                hub_dir,
+                check_exist=not force_reload,
+                decompress=False,
+                method=('wget' if source == 'gitee' else 'get'),
+            )
+            archive_md5 = _cached_md5(fpath)
+            shutil.move(fpath, cached_file)
+
+            if _read_archive_md5(repo_dir) == archive_md5:
+                # the archive is not changed, skip extracting it again
+                if verbose:
+                    sys.stderr.write(
+                        'Repo archive is not changed, using {}\n'.format(
+                            repo_dir
+                        )
+                    )
+            else:
+                with zipfile.ZipFile(cached_file) as cached_zipfile:
+                    extraced_repo_name = cached_zipfile.infolist()[0].filename
+                    extracted_repo = os.path.join(hub_dir, extraced_repo_name)
+                    _remove_if_exists(extracted_repo)
+                    # Unzip the code and rename the base folder
+                    cached_zipfile.extractall(hub_dir)
+
+                _remove_if_exists(repo_dir)
+                # rename the repo
+                shutil.move(extracted_repo, repo_dir)
+                with open(
+                    os.path.join(repo_dir, HUB_ARCHIVE_MD5_FILE), 'w'
+                ) as f:
+                    f.write(archive_md5)
+
+            _remove_if_exists(cached_file)
 
     return repo_dir
 
@@ -16,7 +16,9 @@ import contextlib
 import inspect
 import os
 import pickle
+import queue
 import socket
+import threading
 import time
 import warnings
 
@@ -35,6 +37,9 @@ from paddle.fluid.executor import global_scope
 from paddle.fluid.framework import Variable
 from paddle.fluid.framework import _current_expected_place as _get_device
 from paddle.fluid.framework import _get_paddle_place, _non_static_mode
+from paddle.fluid.incubate.checkpoint.checkpoint_saver import (
+    AsyncCheckpointSaver,
+)
 from paddle.fluid.io import is_belong_to_optimizer
 from paddle.fluid.layers import collective
 from paddle.fluid.layers.utils import flatten
@@ -69,6 +74,80 @@ def to_numpy(var):
     return np.array(t)
 
 
+def _detach(var):
+    if isinstance(var, (fluid.core.VarBase, fluid.core.eager.Tensor)):
+        return var.detach()
+    return var
+
+
+class _TrainStep(paddle.nn.Layer):
+    """
+    Forward and loss of a train step, which are converted together by
+    `paddle.jit.to_static`, see `Model.prepare(fast_path=True)`.
+    """
+
+    def __init__(self, network, loss):
+        super().__init__()
+        self.network = network
+        self.loss = loss
+
+    def forward(self, inputs, labels):
+        outputs = self.network(*inputs)
+        losses = self.loss(*(to_list(outputs) + labels))
+        return outputs, losses
+
+
+class _PredictOutputWriter:
+    """
+    Converts outputs of batches to numpy and passes them to sink in a
+    background thread, so that the conversion, which waits for device, and
+    the sink overlap with computing following batches. At most `capacity`
+    batches are pending, so that memory does not grow with the dataset.
+    """
+
+    def __init__(self, sink, capacity=2):
+        self._sink = sink
+        self._queue = queue.Queue(maxsize=capacity)
+        self._error = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            outputs = self._queue.get()
+            if outputs is None:
+                break
+            # drop outputs after errors, which are raised in main thread
+            if self._error is not None:
+                continue
+            try:
+                self._sink(
+                    [
+                        o.numpy()
+                        if isinstance(
+                            o, (fluid.core.VarBase, fluid.core.eager.Tensor)
+                        )
+                        else o
+                        for o in outputs
+                    ]
+                )
+            except Exception as e:
+                self._error = e
+
+    def _check_error(self):
+        if self._error is not None:
+            raise self._error
+
+    def put(self, outputs):
+        self._check_error()
+        self._queue.put(outputs)
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+        self._check_error()
+
+
 def flatten_list(l):
     assert isinstance(l, list), "not a list"
     outl = []
@@ -747,6 +826,16 @@ class DynamicGraphAdapter:
         self._amp_configs = {}
         self._amp_custom_lists = {}
         self._use_fp16_guard = True
+        self._async_saver = None
+        # see `Model.fit(sync_free=True)`
+        self._sync_free = False
+        self._pending_metric_outs = []
+        # see `Model.predict(sink=...)`
+        self._device_outputs = False
+        # see `Model.prepare(fast_path=True)`, `_static_train_step` is None
+        # before converting the train step, or False if conversion failed
+        self._fast_path = False
+        self._static_train_step = None
 
         if self._nranks > 1:
             dist.init_parallel_env()
@@ -783,17 +872,25 @@ class DynamicGraphAdapter:
         if self._amp_level != "O0" and self.model._scaler is None:
             self.model._scaler = paddle.amp.GradScaler(**self._amp_configs)
 
-        with paddle.amp.auto_cast(
-            enable=self._amp_level != 'O0',
-            **self._amp_custom_lists,
-            level=self._amp_level
-        ):
-            if self._nranks > 1:
-                outputs = self.ddp_model(*[to_variable(x) for x in inputs])
-            else:
-                outputs = self.model.network(*[to_variable(x) for x in inputs])
+        results = self._static_train_forward(
+            [to_variable(x) for x in inputs], labels
+        )
+        if results is not None:
+            outputs, losses = results
+        else:
+            with paddle.amp.auto_cast(
+                enable=self._amp_level != 'O0',
+                **self._amp_custom_lists,
+                level=self._amp_level
+            ):
+                if self._nranks > 1:
+                    outputs = self.ddp_model(*[to_variable(x) for x in inputs])
+                else:
+                    outputs = self.model.network(
+                        *[to_variable(x) for x in inputs]
+                    )
 
-        losses = self.model._loss(*(to_list(outputs) + labels))
+            losses = self.model._loss(*(to_list(outputs) + labels))
         losses = to_list(losses)
         final_loss = paddle.add_n(losses)
 
@@ -801,13 +898,21 @@ class DynamicGraphAdapter:
             scaled = self.model._scaler.scale(final_loss)
             scaled.backward()
             if update:
-                self.model._scaler.minimize(self.model._optimizer, scaled)
-                self.model.network.clear_gradients()
+                self._update_parameters(final_loss, scaled)
         else:
             final_loss.backward()
             if update:
-                self.model._optimizer.minimize(final_loss)
-                self.model.network.clear_gradients()
+                self._update_parameters(final_loss)
+
+        if self._sync_free:
+            # losses and outputs of metrics are kept on device, metrics are
+            # updated by `_update_pending_metrics` later
+            for metric in self.model._metrics:
+                metric_outs = metric.compute(*(to_list(outputs) + labels))
+                self._pending_metric_outs.append(
+                    (metric, [_detach(m) for m in to_list(metric_outs)])
+                )
+            return [l.detach() for l in losses]
 
         metrics = []
         for metric in self.model._metrics:
@@ -821,6 +926,62 @@ class DynamicGraphAdapter:
             else [to_numpy(l) for l in losses]
         )
 
+    def _static_train_forward(self, inputs, labels):
+        # returns None if the train step is not or cannot be converted
+        if (
+            not self._fast_path
+            or self._static_train_step is False
+            or self._amp_level != 'O0'
+            or self._nranks > 1
+        ):
+            return None
+        if self._static_train_step is not None:
+            return self._static_train_step(inputs, labels)
+
+        train_step = paddle.jit.to_static(
+            _TrainStep(self.model.network, self.model._loss)
+        )
+        try:
+            results = train_step(inputs, labels)
+        except Exception as e:
+            warnings.warn(
+                "Failed to convert the train step by paddle.jit.to_static, "
+                "it runs in dynamic graph mode instead. The error is: "
+                "{}".format(e)
+            )
+            self._static_train_step = False
+            return None
+        self._static_train_step = train_step
+        return results
+
+    def _update_parameters(self, final_loss, scaled=None):
+        optimizer = self.model._optimizer
+        fast_path = self._fast_path and isinstance(
+            optimizer, paddle.optimizer.Optimizer
+        )
+        if scaled is not None:
+            if fast_path:
+                self.model._scaler.step(optimizer)
+                self.model._scaler.update()
+            else:
+                self.model._scaler.minimize(optimizer, scaled)
+        elif fast_path:
+            optimizer.step()
+        else:
+            optimizer.minimize(final_loss)
+
+        if fast_path:
+            # release gradient buffers instead of zeroing gradients of all
+            # sublayers, gradients of DataParallel are in its fused buffers
+            optimizer.clear_grad(set_to_zero=self._nranks > 1)
+        else:
+            self.model.network.clear_gradients()
+
+    def _update_pending_metrics(self):
+        pending, self._pending_metric_outs = self._pending_metric_outs, []
+        for metric, metric_outs in pending:
+            metric.update(*[to_numpy(m) for m in metric_outs])
+
     def eval_batch(self, inputs, labels=None):
         self.model.network.eval()
         self.mode = 'eval'
@@ -843,14 +1004,24 @@ class DynamicGraphAdapter:
             losses = self.model._loss(*(to_list(outputs) + labels))
             losses = to_list(losses)
 
-        if self._nranks > 1:
+        reduce_states = self._reduce_metric_states()
+        if reduce_states:
+            outputs, labels = self._cut_off_local_padding(
+                to_list(outputs), labels
+            )
+        elif self._nranks > 1:
             outputs = [_all_gather(o, self._nranks) for o in to_list(outputs)]
             labels = [_all_gather(l, self._nranks) for l in labels]
         metrics = []
         for metric in self.model._metrics:
+            if reduce_states and to_list(outputs)[0].shape[0] == 0:
+                # all local samples of this batch are padding
+                metrics.append(None)
+                continue
             # cut off padding value.
             if (
-                self.model._test_dataloader is not None
+                not reduce_states
+                and self.model._test_dataloader is not None
                 and self._nranks > 1
                 and isinstance(self.model._test_dataloader, DataLoader)
             ):
@@ -883,6 +1054,39 @@ class DynamicGraphAdapter:
         else:
             return metrics
 
+    def _reduce_metric_states(self):
+        # metrics with states are all-reduced by `Model` every `log_freq`
+        # steps, instead of gathering outputs and labels of all ranks
+        return self._nranks > 1 and all(
+            metric.states() is not None for metric in self.model._metrics
+        )
+
+    def _cut_off_local_padding(self, outputs, labels):
+        # the global batch is the concatenation of local batches of all
+        # ranks, cut off the padding of `DistributedBatchSampler` at its end
+        # as gathering outputs does
+        if self.model._test_dataloader is None or not isinstance(
+            self.model._test_dataloader, DataLoader
+        ):
+            return outputs, labels
+        total_size = len(self.model._test_dataloader.dataset)
+        samples = outputs[0].shape[0]
+        global_samples = samples * self._nranks
+        current_count = self._merge_count.get(self.mode + '_total', 0)
+        if current_count + global_samples >= total_size:
+            num_valid = total_size - current_count - self._local_rank * samples
+            num_valid = int(min(max(num_valid, 0), samples))
+            outputs = [o[:num_valid] for o in outputs]
+            labels = [l[:num_valid] for l in labels]
+            self._merge_count[self.mode + '_total'] = 0
+            self._merge_count[self.mode + '_batch'] = int(
+                total_size - current_count
+            )
+        else:
+            self._merge_count[self.mode + '_total'] += global_samples
+            self._merge_count[self.mode + '_batch'] = global_samples
+        return outputs, labels
+
     def predict_batch(self, inputs):
         self.model.network.eval()
         self.mode = 'test'
@@ -892,22 +1096,33 @@ class DynamicGraphAdapter:
         if self._nranks > 1 and isinstance(self.model._place, fluid.CUDAPlace):
             outputs = [_all_gather(o, self._nranks) for o in to_list(outputs)]
 
+        if self._device_outputs:
+            # converted to numpy by `_PredictOutputWriter`
+            return to_list(outputs)
         return [to_numpy(o) for o in to_list(outputs)]
 
     def parameters(self, *args, **kwargs):
         return self.model.network.parameters(*args, **kwargs)
 
-    def save(self, path):
-        params = self.model.network.state_dict()
-        paddle.save(params, path + '.pdparams')
+    def save(self, path, async_save=False):
+        objs = {'.pdparams': self.model.network.state_dict()}
         if self.model._optimizer is not None:
             if self.model._optimizer.state_dict():
-                optim = self.model._optimizer.state_dict()
-                paddle.save(optim, path + '.pdopt')
+                objs['.pdopt'] = self.model._optimizer.state_dict()
         if hasattr(self.model, '_scaler') and self.model._scaler is not None:
             if self.model._scaler.state_dict():
-                scaler = self.model._scaler.state_dict()
-                paddle.save(scaler, path + '.pdscaler')
+                objs['.pdscaler'] = self.model._scaler.state_dict()
+
+        if async_save:
+            if self._async_saver is None:
+                self._async_saver = AsyncCheckpointSaver()
+            return self._async_saver.save(objs, path)
+
+        # wait for async saving to avoid writing the same files
+        if self._async_saver is not None:
+            self._async_saver.wait()
+        for suffix, obj in objs.items():
+            paddle.save(obj, path + suffix)
 
     def load(self, param_state_pairs, optim_state, scaler_state=None):
         # restore parameter states
@@ -1124,6 +1339,8 @@ class Model:
         self._is_shape_inferred = False
         self._test_dataloader = None
         self.stop_training = False
+        # steps to fetch or all-reduce metrics, which is `log_freq`
+        self._sync_freq = 1
 
         if not _non_static_mode():
             if not isinstance(inputs, (list, tuple, dict, Input)):
@@ -1300,7 +1517,7 @@ class Model:
             self._update_inputs()
         return loss
 
-    def save(self, path, training=True):
+    def save(self, path, training=True, async_save=False):
         """
 
         This function saves parameters, optimizer information or model and
@@ -1323,9 +1540,14 @@ class Model:
                 A exception will be raised.
             training (bool, optional): Whether to save for training. If not, save
                 for inference only. Default: True.
+            async_save (bool, optional): Whether to save for training in background,
+                only supported in dynamic graph mode. If True, states are copied into
+                reusable host buffers and written by a background thread, see
+                :code:`paddle.incubate.checkpoint.AsyncCheckpointSaver` , and a
+                future of the saving is returned. Default: False.
 
         Returns:
-            None
+            None, or concurrent.futures.Future if `async_save` is True.
 
         Examples:
 
@@ -1373,9 +1595,15 @@ class Model:
 
         """
 
+        if async_save and not (training and fluid._non_static_mode()):
+            raise ValueError(
+                "async_save is only supported for training in dynamic graph mode"
+            )
         if ParallelEnv().local_rank == 0:
             if not training:
                 self._save_inference_model(path)
+            elif async_save:
+                return self._adapter.save(path, async_save=True)
             else:
                 self._adapter.save(path)
 
@@ -1617,7 +1845,12 @@ class Model:
             self._adapter._amp_configs[key] = amp_configs[key]
 
     def prepare(
-        self, optimizer=None, loss=None, metrics=None, amp_configs=None
+        self,
+        optimizer=None,
+        loss=None,
+        metrics=None,
+        amp_configs=None,
+        fast_path=False,
     ):
         """
 
@@ -1649,6 +1882,14 @@ class Model:
                 for details. For convenience, 'amp_configs' could be set to
                 'O1' or 'O2' if no more parameters are needed. 'amp_configs'
                 could be None in float32 training. Default: None.
+            fast_path (bool, optional): Whether to reduce Python overhead of training
+                steps in dynamic graph mode. If True, parameters are updated by
+                `optimizer.step`, which uses multi-tensor kernels if the optimizer is
+                created with `use_multi_tensor=True`, and gradients of parameters of the
+                optimizer are released by `optimizer.clear_grad` instead of cleared
+                layer by layer. The forward and loss are also converted together by
+                `paddle.jit.to_static` without AMP or data parallel, and run in dynamic
+                graph mode if the conversion fails. Default: False.
 
         Returns:
             None
@@ -1690,6 +1931,9 @@ class Model:
             ), "{} is not sub class of Metric".format(metric.__class__.__name__)
         self._metrics = to_list(metrics)
         self._prepare_amp(amp_configs)
+        if isinstance(self._adapter, DynamicGraphAdapter):
+            self._adapter._fast_path = fast_path
+            self._adapter._static_train_step = None
 
         self._adapter.prepare()
 
@@ -1710,6 +1954,7 @@ class Model:
         callbacks=None,
         accumulate_grad_batches=1,
         num_iters=None,
+        sync_free=False,
     ):
         """
 
@@ -1758,6 +2003,11 @@ class Model:
             num_iters (int|None, optional): The number of iterations to evaluate the model.
                 If None, evaluate on whole input dataset, otherwise, evaluate `num_iters` times.
                 Default: None.
+            sync_free (bool, optional): Whether to keep losses and outputs of metrics on device
+                during training in dynamic graph mode, which are fetched to update metrics and
+                logs only every `log_freq` steps and at the end of epoch, instead of synchronizing
+                device every step. Callbacks get logs of the last synchronized step between them.
+                It is ignored in static graph mode. Default: False.
 
         Returns:
             None
@@ -1921,29 +2171,41 @@ class Model:
         if any(isinstance(k, EarlyStopping) for k in cbks) and not do_eval:
             warnings.warn("EarlyStopping needs validation data.")
 
+        if isinstance(self._adapter, DynamicGraphAdapter):
+            self._adapter._sync_free = sync_free
+        self._sync_freq = max(log_freq, 1)
+
         cbks.on_begin('train')
-        for epoch in range(epochs):
-            cbks.on_epoch_begin(epoch)
-            logs = self._run_one_epoch(train_loader, cbks, 'train')
-            cbks.on_epoch_end(epoch, logs)
+        try:
+            for epoch in range(epochs):
+                cbks.on_epoch_begin(epoch)
+                logs = self._run_one_epoch(train_loader, cbks, 'train')
+                cbks.on_epoch_end(epoch, logs)
 
-            if do_eval and epoch % eval_freq == 0:
+                if do_eval and epoch % eval_freq == 0:
 
-                eval_steps = self._len_data_loader(eval_loader)
-                cbks.on_begin(
-                    'eval',
-                    {'steps': eval_steps, 'metrics': self._metrics_name()},
-                )
+                    eval_steps = self._len_data_loader(eval_loader)
+                    cbks.on_begin(
+                        'eval',
+                        {'steps': eval_steps, 'metrics': self._metrics_name()},
+                    )
 
-                eval_logs = self._run_one_epoch(eval_loader, cbks, 'eval')
+                    eval_logs = self._run_one_epoch(eval_loader, cbks, 'eval')
 
-                cbks.on_end('eval', eval_logs)
-            if self.stop_training:
-                break
+                    cbks.on_end('eval', eval_logs)
+                if self.stop_training:
+                    break
+        finally:
+            self._reset_sync_free()
 
         cbks.on_end('train', logs)
         self._test_dataloader = None
 
+    def _reset_sync_free(self):
+        if isinstance(self._adapter, DynamicGraphAdapter):
+            self._adapter._sync_free = False
+            self._adapter._pending_metric_outs = []
+
     def evaluate(
         self,
         eval_data,
@@ -1965,7 +2227,9 @@ class Model:
                 When eval_data is the instance of Dataloader, this argument will be
                 ignored. Default: 1.
             log_freq (int, optional): The frequency, in number of steps, the eval logs
-                are printed. Default: 10.
+                are printed. In data parallel dynamic graph mode, if all metrics declare
+                `Metric.states`, their states are all-reduced at this frequency and at
+                the end instead of gathering outputs and labels of all ranks. Default: 10.
             verbose (int, optional): The verbosity mode, should be 0, 1, or 2. 0 = silent,
                 1 = progress bar, 2 = one line per epoch. Default: 2.
             num_workers (int, optional): The number of subprocess to load data,
@@ -2031,6 +2295,7 @@ class Model:
         )
 
         eval_steps = self._len_data_loader(eval_loader)
+        self._sync_freq = max(log_freq, 1)
         self.num_iters = num_iters
         if (
             num_iters is not None
@@ -2064,6 +2329,7 @@ class Model:
         stack_outputs=False,
         verbose=1,
         callbacks=None,
+        sink=None,
     ):
         """
         Compute the output predictions on testing data.
@@ -2086,9 +2352,14 @@ class Model:
             verbose (int, optional): The verbosity mode, should be 0, 1, or 2. 0 = silent,
                 1 = progress bar, 2 = one line per batch. Default: 1.
             callbacks(Callback, optional): A Callback instance, Default: None.
+            sink (callable, optional): A function called with the list of numpy outputs
+                of each batch in order, such as writing them to files. If set, outputs
+                are streamed to it instead of kept in memory, and converted to numpy
+                and passed to it in a background thread overlapped with computing
+                following batches. `stack_outputs` is ignored. Default: None.
 
         Returns:
-            list: output of models.
+            list: output of models, or None if `sink` is set.
 
         Examples:
 
@@ -2122,6 +2393,13 @@ class Model:
                 print(len(result[0]), result[0][0].shape)
                 # 157 (64, 10)
 
+                # stream outputs to file
+                with open('predict.npy', 'wb') as f:
+                    model.predict(
+                        test_dataset,
+                        batch_size=64,
+                        sink=lambda outputs: np.save(f, outputs[0]))
+
                 # declarative mode
                 device = paddle.set_device('cpu')
                 paddle.enable_static()
@@ -2157,16 +2435,28 @@ class Model:
 
         cbks.on_begin('predict', logs)
 
-        outputs = []
-
-        logs, outputs = self._run_one_epoch(test_loader, cbks, 'predict')
+        if sink is not None:
+            writer = _PredictOutputWriter(sink)
+            if isinstance(self._adapter, DynamicGraphAdapter):
+                self._adapter._device_outputs = True
+            try:
+                logs, _ = self._run_one_epoch(
+                    test_loader, cbks, 'predict', output_writer=writer
+                )
+            finally:
+                if isinstance(self._adapter, DynamicGraphAdapter):
+                    self._adapter._device_outputs = False
+                writer.close()
+            outputs = None
+        else:
+            logs, outputs = self._run_one_epoch(test_loader, cbks, 'predict')
 
-        outputs = list(zip(*outputs))
+            outputs = list(zip(*outputs))
 
-        # NOTE: for lod tensor output, we should not stack outputs
-        # for stacking may lose its detail info
-        if stack_outputs:
-            outputs = [np.vstack(outs) for outs in outputs]
+            # NOTE: for lod tensor output, we should not stack outputs
+            # for stacking may lose its detail info
+            if stack_outputs:
+                outputs = [np.vstack(outs) for outs in outputs]
 
         self._test_dataloader = None
 
@@ -2242,9 +2532,23 @@ class Model:
         data_loader,
         callbacks,
         mode,
-        logs={},
+        logs=None,
+        output_writer=None,
     ):
+        # a new dict for each epoch, so that logs of earlier epochs and
+        # calls are not seen by callbacks before they are updated
+        logs = {} if logs is None else logs
         outputs = []
+        sync_free = mode == 'train' and getattr(
+            self._adapter, '_sync_free', False
+        )
+        pending_losses = None
+        reduce_states = (
+            mode == 'eval'
+            and isinstance(self._adapter, DynamicGraphAdapter)
+            and self._adapter._reduce_metric_states()
+        )
+        pending_reduce = False
         for step, data in enumerate(data_loader):
             # data might come from different types of data_loader and have
             # different format, as following:
@@ -2279,28 +2583,47 @@ class Model:
 
                 outs = getattr(self, mode + '_batch')(*_inputs)
 
-                if self._metrics and self._loss:
+                if sync_free:
+                    # losses are tensors on device, which are fetched with
+                    # metrics every `log_freq` steps, see `fit`
+                    pending_losses = outs
+                    if (step + 1) % self._sync_freq == 0:
+                        self._update_sync_free_logs(pending_losses, logs)
+                        pending_losses = None
+                elif self._metrics and self._loss:
                     metrics = [[l[0] for l in outs[0]]]
                 elif self._loss:
                     metrics = [[l[0] for l in outs]]
                 else:
                     metrics = []
 
-                # metrics
-                for metric in self._metrics:
-                    res = metric.accumulate()
-                    metrics.extend(to_list(res))
-
-                assert len(self._metrics_name()) == len(metrics)
-                for k, v in zip(self._metrics_name(), metrics):
-                    logs[k] = v
+                if reduce_states:
+                    # states of metrics are all-reduced every `log_freq`
+                    # steps and at the end of epoch
+                    if self._loss:
+                        logs['loss'] = metrics[0]
+                    pending_reduce = (step + 1) % self._sync_freq != 0
+                    if not pending_reduce:
+                        self._update_global_metric_logs(logs)
+                elif not sync_free:
+                    # metrics
+                    for metric in self._metrics:
+                        res = metric.accumulate()
+                        metrics.extend(to_list(res))
+
+                    assert len(self._metrics_name()) == len(metrics)
+                    for k, v in zip(self._metrics_name(), metrics):
+                        logs[k] = v
             else:
                 if self._inputs is not None:
                     outs = self.predict_batch(data[: len(self._inputs)])
                 else:
                     outs = self.predict_batch(data)
 
-                outputs.append(outs)
+                if output_writer is not None:
+                    output_writer.put(outs)
+                else:
+                    outputs.append(outs)
 
             logs['step'] = step
             if (
@@ -2318,12 +2641,36 @@ class Model:
                     self.stop_training = True
                     del self.num_iters
                     break
+        if pending_losses is not None:
+            self._update_sync_free_logs(pending_losses, logs)
+        if pending_reduce:
+            self._update_global_metric_logs(logs)
         self._reset_metrics()
 
         if mode == 'predict':
             return logs, outputs
         return logs
 
+    def _update_global_metric_logs(self, logs):
+        metrics = []
+        for metric in paddle.metric.all_reduce_metrics(self._metrics):
+            metrics.extend(to_list(metric.accumulate()))
+
+        metrics_name = self._metrics_name()[1 if self._loss else 0 :]
+        assert len(metrics_name) == len(metrics)
+        for k, v in zip(metrics_name, metrics):
+            logs[k] = v
+
+    def _update_sync_free_logs(self, losses, logs):
+        self._adapter._update_pending_metrics()
+        metrics = [[to_numpy(l)[0] for l in losses]]
+        for metric in self._metrics:
+            metrics.extend(to_list(metric.accumulate()))
+
+        assert len(self._metrics_name()) == len(metrics)
+        for k, v in zip(self._metrics_name(), metrics):
+            logs[k] = v
+
     def summary(self, input_size=None, dtype=None):
         """Prints a string summary of the network.
 
@@ -13,5 +13,8 @@
 # limitations under the License.
 
 from ...fluid.incubate.checkpoint import auto_checkpoint  # noqa: F401
+from ...fluid.incubate.checkpoint.checkpoint_saver import (  # noqa: F401
+    AsyncCheckpointSaver,
+)
 
 __all__ = []
@@ -0,0 +1,403 @@
+# Copyright (c) 2022 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+
+import numpy as np
+
+import paddle
+import paddle.distributed as dist
+import paddle.distributed.fleet as fleet
+from paddle.distributed.fleet.utils.log_util import logger
+from paddle.fluid import core
+from paddle.fluid.framework import dygraph_only
+
+__all__ = ["save_sharded", "load_sharded"]
+
+# NOTE: [ sharded checkpoint layout ] A sharded checkpoint is a directory
+# in which every rank writes the shards it owns into its own file, and
+# rank 0 writes a global index after all shards are written. Tensors split
+# by model parallel are recorded with their global shape and the offsets
+# of each shard. Replicated shards (e.g. data parallel) are written only
+# once, by the least loaded of the ranks holding them, assigning larger
+# shards first to balance the bytes written by each rank. Shard files are
+# saved in the memory-mapped format of paddle.save, so that loading reads only the
+# regions overlapping with the local tensors, whatever the parallel
+# degrees are when loading.
+_METADATA_FILE = "metadata.pdmeta"
+_SHARD_FILE = "rank{}.pdshard"
+_METADATA_VERSION = 1
+
+
+def _is_tensor(value):
+    return isinstance(value, (core.VarBase, core.eager.Tensor))
+
+
+def _flatten_state_dict(state_dict, prefix=()):
+    """
+    Flatten nested dicts, e.g. master weights of optimizer, to a dict
+    keyed by tuple of keys.
+    """
+    flat = {}
+    for k, v in state_dict.items():
+        key = prefix + (k,)
+        if isinstance(v, dict) and len(v) > 0:
+            flat.update(_flatten_state_dict(v, key))
+        else:
+            flat[key] = v
+    return flat
+
+
+def _unflatten_state_dict(flat):
+    state_dict = {}
+    for key, value in flat.items():
+        d = state_dict
+        for k in key[:-1]:
+            d = d.setdefault(k, {})
+        d[key[-1]] = value
+    return state_dict
+
+
+def _normalize_split_axes(split_axes):
+    if split_axes is None:
+        return {}
+    assert isinstance(split_axes, dict), "split_axes should be a dict"
+    return {
+        (k,) if isinstance(k, str) else tuple(k): v
+        for k, v in split_axes.items()
+    }
+
+
+def _get_mp_info():
+    if dist.get_world_size() == 1:
+        return 0, 1
+    hcg = fleet.fleet._hcg if hasattr(fleet.fleet, "_hcg") else None
+    if hcg is None:
+        return 0, 1
+    return hcg.get_model_parallel_rank(), hcg.get_model_parallel_world_size()
+
+
+def _get_split_axis(key, tensor, split_axes):
+    if key in split_axes:
+        return split_axes[key]
+    if getattr(tensor, "is_distributed", False):
+        return getattr(tensor, "split_axis", None)
+    return None
+
+
+def _local_shard_metas(flat, split_axes, mp_rank, mp_degree):
+    """
+    Get global shape and offsets of local tensors. Tensors split by model
+    parallel are assumed to be split evenly in order of mp rank.
+    """
+    metas = {}
+    for key, value in flat.items():
+        if not _is_tensor(value):
+            continue
+        shape = list(value.shape)
+        global_shape = list(shape)
+        offsets = [0] * len(shape)
+        axis = _get_split_axis(key, value, split_axes)
+        if axis is not None and mp_degree > 1:
+            global_shape[axis] = shape[axis] * mp_degree
+            offsets[axis] = shape[axis] * mp_rank
+        metas[key] = {
+            "global_shape": global_shape,
+            "offsets": offsets,
+            "shape": shape,
+        }
+    return metas
+
+
+def _plan_shards(rank_metas):
+    """
+    Decide shards written by each rank and build the global index.
+
+    Args:
+        rank_metas(list): local shard metas of each rank.
+
+    Returns:
+        tuple: list of keys written by each rank, and tensor index.
+    """
+    holders = {}
+    tensors = {}
+    for rank, metas in enumerate(rank_metas):
+        for key, meta in metas.items():
+            if key not in tensors:
+                tensors[key] = {
+                    "global_shape": meta["global_shape"],
+                    "shards": [],
+                }
+            elif tensors[key]["global_shape"] != meta["global_shape"]:
+                raise ValueError(
+                    "Global shape of {} is {} on rank {}, but {} on other "
+                    "ranks".format(
+                        key,
+                        meta["global_shape"],
+                        rank,
+                        tensors[key]["global_shape"],
+                    )
+                )
+            shard_id = (key, tuple(meta["offsets"]))
+            holders.setdefault(shard_id, []).append(rank)
+
+    # replicated shards are written by the least loaded rank holding them,
+    # larger shards are assigned first to balance sizes written by ranks
+    sizes = {
+        shard_id: int(np.prod(rank_metas[ranks[0]][shard_id[0]]["shape"]))
+        for shard_id, ranks in holders.items()
+    }
+    loads = [0] * len(rank_metas)
+    writers = {}
+    for shard_id in sorted(holders, key=lambda shard_id: -sizes[shard_id]):
+        rank = min(holders[shard_id], key=lambda r: (loads[r], r))
+        writers[shard_id] = rank
+        loads[rank] += sizes[shard_id]
+
+    rank_keys = [[] for _ in rank_metas]
+    for (key, _), rank in writers.items():
+        meta = rank_metas[rank][key]
+        name = str(len(rank_keys[rank]))
+        rank_keys[rank].append(key)
+        tensors[key]["shards"].append(
+            {
+                "file": _SHARD_FILE.format(rank),
+                "name": name,
+                "offsets": meta["offsets"],
+                "shape": meta["shape"],
+            }
+        )
+    return rank_keys, tensors
+
+
+def _write_shard_file(flat, keys, path, rank):
+    # tensors are copied to host one by one when writing in mmap format
+    shards = {str(i): flat[key] for i, key in enumerate(keys)}
+    shard_path = os.path.join(path, _SHARD_FILE.format(rank))
+    paddle.save(shards, shard_path, use_mmap_format=True)
+
+
+def _write_metadata(tensors, flat, path):
+    objects = {k: v for k, v in flat.items() if not _is_tensor(v)}
+    metadata = {
+        "version": _METADATA_VERSION,
+        "tensors": tensors,
+        "objects": objects,
+    }
+    # write index at last and atomically, the checkpoint is complete
+    # only when the index exists
+    meta_path = os.path.join(path, _METADATA_FILE)
+    tmp_path = meta_path + ".tmp"
+    paddle.save(metadata, tmp_path)
+    os.replace(tmp_path, meta_path)
+
+
+def _overlap(offsets, shape, shard_offsets, shard_shape):
+    """
+    Get slices of the overlapping region in local tensor and in shard,
+    or None if they do not overlap.
+    """
+    dst, src = [], []
+    for off, size, s_off, s_size in zip(
+        offsets, shape, shard_offsets, shard_shape
+    ):
+        begin = max(off, s_off)
+        end = min(off + size, s_off + s_size)
+        if begin >= end:
+            return None
+        dst.append(slice(begin - off, end - off))
+        src.append(slice(begin - s_off, end - s_off))
+    return tuple(dst), tuple(src)
+
+
+def _read_shards(tensors, metas, path):
+    """
+    Assemble local tensors from the overlapping regions of saved shards.
+    """
+    reads = {}
+    for key, meta in metas.items():
+        if key not in tensors:
+            logger.warning(f"{key} is not found in checkpoint {path}")
+            continue
+        saved = tensors[key]
+        if saved["global_shape"] != meta["global_shape"]:
+            raise ValueError(
+                "Global shape of {} in checkpoint is {}, but {} is "
+                "expected".format(
+                    key, saved["global_shape"], meta["global_shape"]
+                )
+            )
+        for shard in saved["shards"]:
+            region = _overlap(
+                meta["offsets"], meta["shape"], shard["offsets"], shard["shape"]
+            )
+            if region is not None:
+                reads.setdefault(shard["file"], []).append(
+                    (key, shard["name"], region)
+                )
+
+    arrays = {}
+    filled = {}
+    for fname, items in reads.items():
+        names = list({name for _, name, _ in items})
+        shards = paddle.load(
+            os.path.join(path, fname), keys=names, return_numpy=True
+        )
+        for key, name, (dst, src) in items:
+            shard = shards[name]
+            if key not in arrays:
+                arrays[key] = np.empty(metas[key]["shape"], dtype=shard.dtype)
+                filled[key] = 0
+            # only pages of the mapped shard in the region are read
+            arrays[key][dst] = shard[src]
+            filled[key] += int(np.prod([s.stop - s.start for s in dst]))
+
+    for key, meta in metas.items():
+        if key in tensors and filled.get(key, 0) != int(np.prod(meta["shape"])):
+            raise ValueError(
+                "{} is not fully covered by shards in checkpoint {}".format(
+                    key, path
+                )
+            )
+    return arrays
+
+
+@dygraph_only
+def save_sharded(state_dict, path, split_axes=None):
+    '''
+    Save a state dict as a sharded checkpoint, in which every rank writes its
+    own shards in parallel, without gathering the state dict to a single rank.
+
+    The checkpoint is a directory containing a shard file for each rank
+    having shards to write, and a metadata file indexing how each tensor
+    is split. Tensors replicated across ranks, e.g. parameters in data
+    parallel, are written only once. The checkpoint can be loaded by
+    :code:`load_sharded` with different world size or parallel degrees.
+
+    Note:
+        Tensors split by model parallel are recognized by the ``split_axis``
+        attribute set by model parallel layers. Tensors without it, e.g.
+        optimizer states of model parallel parameters, should be specified
+        in ``split_axes`` .
+
+    Args:
+        state_dict(dict): the state dict of Layer or Optimizer, nested dicts
+            like ``master_weights`` are supported. Values not Tensor are
+            saved from rank 0.
+        path(str): the directory to save the checkpoint in.
+        split_axes(dict, optional): key and the axis along which the tensor
+            is split by model parallel, keys of nested dicts are tuples of
+            keys. Default: None.
+
+    Returns:
+        None
+
+    Examples:
+        .. code-block:: python
+
+            import paddle
+            from paddle.incubate.distributed.utils.io import save_sharded
+
+            model = paddle.nn.Linear(4, 4)
+            save_sharded(model.state_dict(), "path/to/checkpoint")
+    '''
+    split_axes = _normalize_split_axes(split_axes)
+    mp_rank, mp_degree = _get_mp_info()
+    flat = _flatten_state_dict(state_dict)
+    metas = _local_shard_metas(flat, split_axes, mp_rank, mp_degree)
+
+    world_size = dist.get_world_size()
+    rank = dist.get_rank() if world_size > 1 else 0
+    if world_size > 1:
+        # only metadata of shards is gathered
+        rank_metas = []
+        dist.all_gather_object(rank_metas, metas)
+    else:
+        rank_metas = [metas]
+    rank_keys, tensors = _plan_shards(rank_metas)
+
+    os.makedirs(path, exist_ok=True)
+    if len(rank_keys[rank]) > 0:
+        _write_shard_file(flat, rank_keys[rank], path, rank)
+    if world_size > 1:
+        dist.barrier()
+    if rank == 0:
+        _write_metadata(tensors, flat, path)
+    if world_size > 1:
+        dist.barrier()
+
+
+@dygraph_only
+def load_sharded(state_dict, path, split_axes=None):
+    '''
+    Load a sharded checkpoint saved by :code:`save_sharded` .
+
+    The local ``state_dict`` is used as the template of loading, each rank
+    reads only the regions of saved shards overlapping with its local
+    tensors, so the checkpoint can be resharded to different world size
+    or model parallel degree.
+
+    Args:
+        state_dict(dict): the local state dict of Layer or Optimizer, which
+            determines the keys and shapes to load.
+        path(str): the directory of the checkpoint.
+        split_axes(dict, optional): key and the axis along which the tensor
+            is split by model parallel, the same as ``save_sharded`` .
+            Default: None.
+
+    Returns:
+        dict: the loaded state dict with the same structure as ``state_dict`` ,
+            tensors are placed on CPU.
+
+    Examples:
+        .. code-block:: python
+
+            import paddle
+            from paddle.incubate.distributed.utils.io import (
+                load_sharded,
+                save_sharded,
+            )
+
+            model = paddle.nn.Linear(4, 4)
+            save_sharded(model.state_dict(), "path/to/checkpoint")
+            model.set_state_dict(
+                load_sharded(model.state_dict(), "path/to/checkpoint")
+            )
+    '''
+    meta_path = os.path.join(path, _METADATA_FILE)
+    if not os.path.exists(meta_path):
+        raise ValueError(
+            "{} is not a complete sharded checkpoint, the metadata file is "
+            "not found".format(path)
+        )
+    metadata = paddle.load(meta_path)
+    assert (
+        metadata["version"] == _METADATA_VERSION
+    ), "Unsupported sharded checkpoint version {}".format(metadata["version"])
+
+    split_axes = _normalize_split_axes(split_axes)
+    mp_rank, mp_degree = _get_mp_info()
+    flat = _flatten_state_dict(state_dict)
+    metas = _local_shard_metas(flat, split_axes, mp_rank, mp_degree)
+    arrays = _read_shards(metadata["tensors"], metas, path)
+
+    place = paddle.CPUPlace()
+    loaded = {}
+    for key, value in flat.items():
+        if key in arrays:
+            loaded[key] = paddle.to_tensor(arrays[key], place=place)
+            loaded[key].name = value.name
+        elif not _is_tensor(value) and key in metadata["objects"]:
+            loaded[key] = metadata["objects"][key]
+    return _unflatten_state_dict(loaded)
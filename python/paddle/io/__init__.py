@@ -29,6 +29,9 @@ from ..fluid.dataloader import ChainDataset  # noqa: F401
 from ..fluid.dataloader import WeightedRandomSampler  # noqa: F401
 from ..fluid.dataloader import Subset  # noqa: F401
 from ..fluid.dataloader import random_split  # noqa: F401
+from ..fluid.dataloader import RecordFileWriter  # noqa: F401
+from ..fluid.dataloader import RecordFileDataset  # noqa: F401
+from ..fluid.dataloader import DevicePrefetcher  # noqa: F401
 
 __all__ = [  # noqa
     'Dataset',
@@ -46,4 +49,7 @@ __all__ = [  # noqa
     'WeightedRandomSampler',
     'random_split',
     'Subset',
+    'RecordFileWriter',
+    'RecordFileDataset',
+    'DevicePrefetcher',
 ]
@@ -220,7 +220,12 @@ def ignore_module(modules: List[Any]):
 
 
 def to_static(
-    function=None, input_spec=None, build_strategy=None, property=False
+    function=None,
+    input_spec=None,
+    build_strategy=None,
+    property=False,
+    max_cache_size=None,
+    shape_buckets=None,
 ):
     """
     Converts imperative dygraph APIs into declarative function APIs. Decorator
@@ -240,6 +245,12 @@ def to_static(
             of the computational graph. For more information about build_strategy,
             please refer to :code:`paddle.static.BuildStrategy`. The default is None.
         property(bool, Optional): whether the fucntion is python property. The default is False.
+        max_cache_size(int|None, Optional): the max number of programs cached for the function. The least
+            recently used program will be evicted when exceeding it. None means no limitation. The default is None.
+        shape_buckets(dict|None, Optional): dict of argument name and dict of axis and a list of bucket sizes.
+            Tensor arguments are padded with zeros along the axis to the smallest bucket not less than the size,
+            so that inputs with similar shapes share one program. Outputs are computed with the padded inputs.
+            The default is None.
 
 
     Returns:
@@ -263,6 +274,15 @@ def to_static(
             x_v = func(x)
             print(x_v) # [[2. 2.]]
 
+            # pad the second axis of x to 8 or 16 and cache at most 2 programs
+            @to_static(max_cache_size=2, shape_buckets={'x': {1: [8, 16]}})
+            def func_bucket(x):
+                return paddle.sum(x, axis=1)
+
+            for seq_len in [3, 5, 10]:
+                func_bucket(paddle.ones([1, seq_len]))
+            print(func_bucket.get_cache_stats()['misses']) # 2
+
     """
 
     def decorated(python_func):
@@ -280,6 +300,8 @@ def to_static(
                 input_spec=input_spec,
                 build_strategy=build_strategy,
                 property=property,
+                max_cache_size=max_cache_size,
+                shape_buckets=shape_buckets,
             ),
         )
 
@@ -376,6 +398,10 @@ class _SaveLoadConfig:
         # if True, multi `StaticFunction` will share params in one file.
         self.combine_params = False
 
+        # used for `paddle.jit.load`, if True, params are memory-mapped
+        # from the combined params file and materialized lazily.
+        self.mmap = False
+
     @property
     def output_spec(self):
         return self._output_spec
@@ -476,7 +502,7 @@ def _parse_save_configs(configs):
 
 
 def _parse_load_config(configs):
-    supported_configs = ['model_filename', 'params_filename']
+    supported_configs = ['model_filename', 'params_filename', 'mmap']
 
     # input check
     for key in configs:
@@ -490,6 +516,7 @@ def _parse_load_config(configs):
     inner_config = _SaveLoadConfig()
     inner_config.model_filename = configs.get('model_filename', None)
     inner_config.params_filename = configs.get('params_filename', None)
+    inner_config.mmap = configs.get('mmap', False)
 
     return inner_config
 
@@ -1276,6 +1303,11 @@ def load(path, **configs):
             (2) params_filename (str): The persistable variables file name of the paddle 1.x
             ``save_inference_model`` save format. No default file name, save variables separately
             by default.
+            (3) mmap (bool): Whether to memory-map the combined params file instead of reading it.
+            Params are materialized when they are first used. In eval mode on CPU, they share the
+            read-only mapped memory, which is shared by layers loaded from the same file and by
+            forked processes. They are copied when calling ``train()`` or ``set_state_dict()`` .
+            Default False.
 
 
     Returns:
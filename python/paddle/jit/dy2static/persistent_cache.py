@@ -0,0 +1,370 @@
+# Copyright (c) 2022 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import hashlib
+import inspect
+import os
+import pickle
+
+import paddle
+from paddle.fluid import framework
+from paddle.fluid.compiler import BuildStrategy
+from paddle.fluid.dygraph import layers
+from paddle.fluid.layers.utils import flatten, pack_sequence_as
+
+from . import logging_utils
+from .function_spec import get_buffers, get_parameters
+from .origin_info import global_origin_info_map
+from .utils import func_to_source_code, source_to_func, unwrap
+
+__all__ = []
+
+CACHE_DIR_ENV_NAME = 'TRANSLATOR_CACHE_DIR'
+
+# NOTE: Bump it if the code generated by AST transformers or the layout of
+# cached entries is changed, so that caches built before are not used.
+TRANSFORMER_VERSION = 1
+
+
+class _VarRef:
+    """
+    Placeholder of static Variable in cached inputs and outputs.
+    """
+
+    def __init__(self, name):
+        self.name = name
+
+
+class _InstanceRef:
+    """
+    Placeholder of the decorated Layer instance in cached inputs.
+    """
+
+    pass
+
+
+def _stable_option(value):
+    """
+    Converts the value of a to_static option to a form whose repr is the
+    same across processes, or raises TypeError if it cannot be converted.
+    """
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, (list, tuple)):
+        return type(value).__name__, [_stable_option(v) for v in value]
+    if isinstance(value, dict):
+        return 'dict', sorted(
+            (_stable_option(k), _stable_option(v)) for k, v in value.items()
+        )
+    if isinstance(value, BuildStrategy):
+        # NOTE: repr of pybind objects contains their addresses, so use the
+        # values of the public fields instead.
+        fields = []
+        for name in dir(value):
+            if name.startswith('_'):
+                continue
+            field = getattr(value, name)
+            if not callable(field):
+                fields.append((name, _stable_option(field)))
+        return 'BuildStrategy', fields
+    if hasattr(type(value), '__members__'):
+        # enum values, e.g. BuildStrategy.ReduceStrategy
+        return str(value)
+    raise TypeError(
+        "to_static option of type {} cannot be cached".format(
+            type(value).__name__
+        )
+    )
+
+
+class PersistentCache:
+    """
+    On-disk cache of transformed code and traced programs of @to_static
+    functions, shared by processes to skip AST transformation and tracing
+    on warm starts.
+
+    Entries are keyed by the source code and source files of functions and
+    Layers, input specs, parameters, transformer version and Paddle version.
+    Since Python attributes of Layers and global variables are not part of
+    the key, only functions whose traced programs are fully determined by
+    these should be cached.
+    """
+
+    def __init__(self):
+        self._cache_dir = None
+        self._cache_dir_set = False
+        # {path: ((size, mtime), digest)}
+        self._file_digests = {}
+
+    @property
+    def cache_dir(self):
+        if self._cache_dir_set:
+            return self._cache_dir
+        return os.getenv(CACHE_DIR_ENV_NAME) or None
+
+    @cache_dir.setter
+    def cache_dir(self, cache_dir):
+        self._cache_dir = cache_dir
+        self._cache_dir_set = True
+
+    def enabled(self):
+        return self.cache_dir is not None
+
+    def _hash_key(self, *items):
+        items = (
+            TRANSFORMER_VERSION,
+            paddle.__version__,
+            getattr(paddle.version, 'commit', None),
+        ) + items
+        return hashlib.sha256(repr(items).encode('utf-8')).hexdigest()
+
+    def _file_digest(self, path):
+        stat = os.stat(path)
+        signature = (stat.st_size, stat.st_mtime_ns)
+        cached = self._file_digests.get(path)
+        if cached is None or cached[0] != signature:
+            with open(path, 'rb') as f:
+                cached = (signature, hashlib.sha256(f.read()).hexdigest())
+            self._file_digests[path] = cached
+        return cached[1]
+
+    def _entry_path(self, kind, key):
+        return os.path.join(self.cache_dir, kind, key + '.pkl')
+
+    def _read_entry(self, kind, key):
+        path = self._entry_path(kind, key)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'rb') as f:
+                return pickle.load(f)
+        except Exception as e:
+            logging_utils.warn(
+                "Failed to read dy2static cache {}: {}".format(path, e)
+            )
+            return None
+
+    def _write_entry(self, kind, key, entry):
+        path = self._entry_path(kind, key)
+        try:
+            data = pickle.dumps(entry, protocol=4)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # write to a temporary file and rename, so that processes
+            # saving the same entry concurrently never see partial files
+            tmp_path = '{}.tmp.{}'.format(path, os.getpid())
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logging_utils.log(
+                2, "Failed to write dy2static cache {}: {}".format(path, e)
+            )
+
+    def _code_key(self, func, source_code):
+        return self._hash_key(
+            source_code,
+            inspect.getsourcefile(func),
+            func.__code__.co_firstlineno,
+            func.__qualname__,
+        )
+
+    def load_code(self, func, source_code):
+        """
+        Returns the cached static function of func, or None if not cached.
+        """
+        if not self.enabled():
+            return None
+        entry = self._read_entry('code', self._code_key(func, source_code))
+        if entry is None:
+            return None
+        static_func, file_name = source_to_func(entry['source'], func)
+        global_origin_info_map.update(
+            {
+                (file_name, lineno): info
+                for lineno, info in entry['origin_info'].items()
+            }
+        )
+        logging_utils.log(
+            2, "Load transformed code of {} from cache.".format(func.__name__)
+        )
+        return static_func
+
+    def save_code(
+        self, func, source_code, transformed_code, file_name, origin_info_map
+    ):
+        if not self.enabled():
+            return
+        origin_info = {
+            loc[1]: info
+            for loc, info in origin_info_map.items()
+            if loc[0] == file_name
+        }
+        self._write_entry(
+            'code',
+            self._code_key(func, source_code),
+            {'source': transformed_code, 'origin_info': origin_info},
+        )
+
+    def program_key(self, cache_key):
+        """
+        Returns the persistent key of program for CacheKey, or None if the
+        cache is disabled or the key cannot be generated.
+        """
+        if not self.enabled():
+            return None
+        try:
+            func = unwrap(cache_key.function_spec.dygraph_function)
+            source_files = {inspect.getsourcefile(func)}
+            instance = cache_key.class_instance
+            params = []
+            if instance is not None:
+                for layer in instance.sublayers(include_self=True):
+                    source_files.add(inspect.getsourcefile(type(layer)))
+                tensors = list(get_parameters(instance).values()) + list(
+                    get_buffers(instance).values()
+                )
+                params = [
+                    (t.name, tuple(t.shape), str(t.dtype), t.stop_gradient)
+                    for t in tensors
+                ]
+            return self._hash_key(
+                func_to_source_code(func),
+                func.__qualname__,
+                sorted(
+                    (path, self._file_digest(path))
+                    for path in source_files
+                    if path is not None
+                ),
+                repr(cache_key.input_args_with_spec),
+                repr(cache_key.input_kwargs_with_spec),
+                _stable_option(cache_key.kwargs),
+                params,
+                framework.default_main_program().random_seed,
+            )
+        except (OSError, TypeError) as e:
+            logging_utils.log(
+                2, "Skip dy2static program cache, because: {}".format(e)
+            )
+            return None
+
+    def load_program(self, key, class_instance):
+        """
+        Returns the cached programs, inputs, outputs and parameters, or
+        None if not cached.
+        """
+        entry = self._read_entry('program', key)
+        if entry is None:
+            return None
+
+        main_program = framework.Program.parse_from_string(
+            entry['main_program']
+        )
+        startup_program = framework.Program.parse_from_string(
+            entry['startup_program']
+        )
+        main_program.random_seed = framework.default_main_program().random_seed
+        startup_program.random_seed = (
+            framework.default_startup_program().random_seed
+        )
+
+        tensors = dict(get_parameters(class_instance))
+        tensors.update(get_buffers(class_instance))
+        if any(name not in tensors for name in entry['parameters']):
+            return None
+        parameters = [tensors[name] for name in entry['parameters']]
+
+        block = main_program.global_block()
+
+        def _restore(structure):
+            values = []
+            for value in flatten(structure):
+                if isinstance(value, _VarRef):
+                    value = block.var(value.name)
+                elif isinstance(value, _InstanceRef):
+                    value = class_instance
+                values.append(value)
+            return pack_sequence_as(structure, values)
+
+        return (
+            _restore(entry['inputs']),
+            _restore(entry['outputs']),
+            parameters,
+            main_program,
+            startup_program,
+        )
+
+    def save_program(self, key, concrete_program):
+        def _dump(structure):
+            values = []
+            for value in flatten(structure):
+                if isinstance(value, framework.Variable):
+                    value = _VarRef(value.name)
+                elif isinstance(value, layers.Layer):
+                    value = _InstanceRef()
+                values.append(value)
+            return pack_sequence_as(structure, values)
+
+        self._write_entry(
+            'program',
+            key,
+            {
+                'main_program': concrete_program.main_program.desc.serialize_to_string(),
+                'startup_program': concrete_program.startup_program.desc.serialize_to_string(),
+                'inputs': _dump(concrete_program.inputs),
+                'outputs': _dump(concrete_program.outputs),
+                'parameters': [p.name for p in concrete_program.parameters],
+            },
+        )
+
+
+_PERSISTENT_CACHE = PersistentCache()
+
+
+def set_cache_dir(cache_dir=None):
+    """
+    Sets the directory of persistent cache for dygraph to static graph. The
+    transformed code and traced programs of functions decorated by
+    `@to_static` are saved in the directory, and are loaded by following
+    processes to skip AST transformation and tracing.
+
+    There are two means to set the cache directory:
+
+    1. Call function `set_cache_dir`
+
+    2. Set environment variable `TRANSLATOR_CACHE_DIR`
+
+
+    **Note**:
+    `set_cache_dir` has a higher priority than the environment variable.
+    Cached programs are keyed by source code, input specs and parameters,
+    but not Python attributes of Layers or global variables. Do not enable
+    the cache for functions whose control flow depends on them.
+
+    Args:
+        cache_dir(str|None): The cache directory. None means to disable the
+            persistent cache. Default is None.
+
+    Examples:
+        .. code-block:: python
+
+            import paddle
+
+            paddle.jit.set_cache_dir('./to_static_cache')
+            # The transformed code and programs are cached in ./to_static_cache
+    """
+    _PERSISTENT_CACHE.cache_dir = cache_dir
+
+
+def get_cache_dir():
+    return _PERSISTENT_CACHE.cache_dir
@@ -16,9 +16,11 @@ import collections
 import inspect
 import textwrap
 import threading
+import time
 import weakref
 
-from paddle.fluid import _non_static_mode, framework
+import paddle
+from paddle.fluid import _non_static_mode, core, framework
 from paddle.fluid.data_feeder import check_type
 from paddle.fluid.dygraph import layers
 from paddle.fluid.dygraph.base import param_guard, switch_to_static_graph
@@ -39,6 +41,7 @@ from .origin_info import (
     update_op_callstack_with_origin_info,
 )
 from .partial_program import partial_program_from
+from .persistent_cache import _PERSISTENT_CACHE
 from .utils import (
     ALREADY_D2S,
     ast_to_func,
@@ -116,6 +119,11 @@ class FunctionCache:
         func = unwrap(func)
         source_code = func_to_source_code(func)
 
+        # Load transformed code saved by previous processes if enabled.
+        static_func = _PERSISTENT_CACHE.load_code(func, source_code)
+        if static_func is not None:
+            return static_func
+
         # TODO(liym27):
         #  Consider this case: source_code in self._code_to_ast_caches,
         #  but actually they are methods in different classes.
@@ -131,7 +139,17 @@ class FunctionCache:
         # Get static function from AST
         static_func, file_name = ast_to_func(root_wrapper.node, func)
 
-        create_and_update_origin_info_map(root_wrapper.node, static_func)
+        origin_info_map = create_and_update_origin_info_map(
+            root_wrapper.node, static_func, is_global=False
+        )
+        if _PERSISTENT_CACHE.enabled():
+            _PERSISTENT_CACHE.save_code(
+                func,
+                source_code,
+                ast_to_source_code(root_wrapper.node),
+                file_name,
+                origin_info_map,
+            )
         return static_func
 
     def exist(self, func):
@@ -314,7 +332,10 @@ class StaticFunction:
 
         self._input_spec = input_spec
         self._function_spec = FunctionSpec(function, input_spec)
-        self._program_cache = ProgramCache()
+        self._program_cache = ProgramCache(kwargs.get("max_cache_size", None))
+        self._shape_buckets = self._verify_shape_buckets(
+            kwargs.get("shape_buckets", None)
+        )
         self._descriptor_cache = weakref.WeakKeyDictionary()
         # Note: Hold a reference to ProgramTranslator for switching `enable_to_static`.
         self._program_trans = ProgramTranslator()
@@ -325,6 +346,50 @@ class StaticFunction:
 
         self._property = kwargs.get("property", False)
 
+    def _verify_shape_buckets(self, shape_buckets):
+        if shape_buckets is None:
+            return None
+        check_type(shape_buckets, 'shape_buckets', dict, 'to_static')
+        arg_names = self._function_spec._arg_names
+        verified = {}
+        for name, axis_buckets in shape_buckets.items():
+            if name not in arg_names:
+                raise ValueError(
+                    "Argument `{}` in shape_buckets is not found in arguments {} of {}.".format(
+                        name, arg_names, self._dygraph_function.__name__
+                    )
+                )
+            check_type(axis_buckets, 'shape_buckets', dict, 'to_static')
+            verified[arg_names.index(name)] = {
+                axis: sorted(buckets) for axis, buckets in axis_buckets.items()
+            }
+        return verified
+
+    def _pad_to_buckets(self, args):
+        """
+        Pads Tensor arguments with zeros along the axes in `shape_buckets` to
+        the smallest bucket not less than the size, so that inputs in the
+        same bucket share one program. Sizes larger than all buckets are not
+        padded.
+        """
+        args = list(args)
+        for idx, axis_buckets in self._shape_buckets.items():
+            arg = args[idx]
+            if not isinstance(arg, (core.VarBase, core.eager.Tensor)):
+                continue
+            for axis, buckets in axis_buckets.items():
+                size = arg.shape[axis]
+                bucket = next((b for b in buckets if b >= size), size)
+                if bucket > size:
+                    pad_shape = list(arg.shape)
+                    pad_shape[axis] = bucket - size
+                    arg = paddle.concat(
+                        [arg, paddle.zeros(pad_shape, dtype=arg.dtype)],
+                        axis=axis,
+                    )
+            args[idx] = arg
+        return tuple(args)
+
     @property
     def is_property(self):
         # whether is class proproty to be exported.
@@ -433,6 +498,8 @@ class StaticFunction:
 
         # 2. trace ops from dygraph layers and cache the generated program.
         args, kwargs = self._function_spec.unified_args_and_kwargs(args, kwargs)
+        if self._shape_buckets:
+            args = self._pad_to_buckets(args)
 
         try:
             concrete_program, partial_program_layer = self.get_concrete_program(
@@ -558,6 +625,19 @@ class StaticFunction:
         """
         return len(self._program_cache)
 
+    def get_cache_stats(self):
+        """
+        Returns the statistics of program cache for the decorated function.
+
+        Returns:
+            dict: statistics with following keys, :code:`hits` and
+                :code:`misses` for number of calls hit or miss the cache,
+                :code:`evictions` for number of programs evicted,
+                :code:`trace_time` for total seconds spent on tracing, and
+                :code:`size` for number of cached programs.
+        """
+        return self._program_cache.stats()
+
     @property
     def code(self):
         """
@@ -1030,6 +1110,39 @@ class ConcreteProgram:
             **kwargs
         )
 
+    @staticmethod
+    @switch_to_static_graph
+    def from_persistent_cache(key, cache_key):
+        """
+        Loads the program traced with the same function, input specs and
+        parameters from persistent cache, returns None if not cached.
+
+        Args:
+            key(str): persistent key of the program.
+            cache_key(CacheKey): the CacheKey of program.
+        """
+        class_instance = cache_key.class_instance
+        _verify_init_in_dynamic_mode(class_instance)
+        cached = _PERSISTENT_CACHE.load_program(key, class_instance)
+        if cached is None:
+            return None
+        inputs, outputs, parameters, main_program, startup_program = cached
+        logging_utils.log(
+            2,
+            "Load program of {} from cache.".format(
+                cache_key.function_spec.dygraph_function.__name__
+            ),
+        )
+        return ConcreteProgram(
+            inputs=inputs,
+            outputs=outputs,
+            parameters=parameters,
+            function=cache_key.function_spec.dygraph_function,
+            main_program=main_program,
+            startup_program=startup_program,
+            **cache_key.kwargs
+        )
+
 
 def _extract_indeed_params_buffers(class_instance):
     """
@@ -1075,21 +1188,45 @@ class ProgramCache:
     Wrapper class for the program functions defined by dygraph function.
     """
 
-    def __init__(self):
-        # {hash_id : (concrete_program, partial_layer)}
+    def __init__(self, max_size=None):
+        if max_size is not None:
+            check_type(max_size, 'max_cache_size', int, 'to_static')
+            if max_size <= 0:
+                raise ValueError(
+                    "max_cache_size should be positive, but received {}.".format(
+                        max_size
+                    )
+                )
+        self._max_size = max_size
+        # {hash_id : (concrete_program, partial_layer)}, ordered from least
+        # recently used to most recently used
         self._caches = collections.OrderedDict()
         # trace mostly recent used program
         self._recent_key = None
         self._recent_cache_key = None
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._trace_time = 0.0
 
     def _build_once(self, cache_key):
-        concrete_program = ConcreteProgram.from_func_spec(
-            func_spec=cache_key.function_spec,
-            input_spec=cache_key.input_args_with_spec,
-            input_kwargs_spec=cache_key.input_kwargs_with_spec,
-            class_instance=cache_key.class_instance,
-            **cache_key.kwargs
-        )
+        # Load program traced by previous processes if enabled.
+        persistent_key = _PERSISTENT_CACHE.program_key(cache_key)
+        concrete_program = None
+        if persistent_key is not None:
+            concrete_program = ConcreteProgram.from_persistent_cache(
+                persistent_key, cache_key
+            )
+        if concrete_program is None:
+            concrete_program = ConcreteProgram.from_func_spec(
+                func_spec=cache_key.function_spec,
+                input_spec=cache_key.input_args_with_spec,
+                input_kwargs_spec=cache_key.input_kwargs_with_spec,
+                class_instance=cache_key.class_instance,
+                **cache_key.kwargs
+            )
+            if persistent_key is not None:
+                _PERSISTENT_CACHE.save_program(persistent_key, concrete_program)
         return concrete_program, partial_program_from(concrete_program)
 
     def __getitem__(self, item):
@@ -1101,8 +1238,25 @@ class ProgramCache:
         item_id = hash(item)
         self._recent_cache_key = item
         self._recent_key = item_id
-        if item_id not in self._caches:
+        if item_id in self._caches:
+            self._hits += 1
+            self._caches.move_to_end(item_id)
+        else:
+            self._misses += 1
+            start = time.time()
             self._caches[item_id] = self._build_once(item)
+            self._trace_time += time.time() - start
+            if self._max_size is not None:
+                while len(self._caches) > self._max_size:
+                    evicted_key, _ = self._caches.popitem(last=False)
+                    self._evictions += 1
+                    logging_utils.log(
+                        2,
+                        "Evict program {} from cache of {}.".format(
+                            evicted_key,
+                            item.function_spec.dygraph_function.__name__,
+                        ),
+                    )
             # Note: raise warnings if number of traced program is more than `max_tracing_count`
             current_tracing_count = len(self._caches)
             if current_tracing_count > MAX_TRACED_PROGRAM_COUNT:
@@ -1138,6 +1292,15 @@ class ProgramCache:
     def __len__(self):
         return len(self._caches)
 
+    def stats(self):
+        return {
+            'hits': self._hits,
+            'misses': self._misses,
+            'evictions': self._evictions,
+            'trace_time': self._trace_time,
+            'size': len(self._caches),
+        }
+
     def concrete_programs(self):
         return [cp for key, (cp, _) in self._caches.items()]
 
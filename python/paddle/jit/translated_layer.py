@@ -14,6 +14,7 @@
 
 import os
 import pickle
+import struct
 
 import numpy as np
 
@@ -21,6 +22,10 @@ import paddle
 from paddle import _legacy_C_ops
 from paddle.fluid import backward, core, framework, unique_name
 from paddle.fluid.dygraph import layers
+from paddle.fluid.data_feeder import (
+    _PADDLE_DTYPE_2_NUMPY_DTYPE,
+    convert_np_dtype_to_dtype_,
+)
 from paddle.fluid.dygraph.base import switch_to_static_graph
 from paddle.fluid.executor import (
     _is_dy2st_enable_standalone_executor,
@@ -28,6 +33,7 @@ from paddle.fluid.executor import (
 )
 from paddle.fluid.framework import OpProtoHolder, _non_static_mode
 from paddle.fluid.layers.utils import _hash_with_id
+from paddle.fluid.proto import framework_pb2
 from paddle.jit.dy2static.partial_program import (
     LazyInitialized,
     add_build_strategy_for,
@@ -630,17 +636,106 @@ class _ProgramHolder:
 #   make some control flow execution logic wrong.
 
 
+# NOTE: [ memory-mapped params file ] The params file saved in combined
+# format is a sequence of serialized DenseTensors, each of which is
+# | uint32 version | uint64 lod_level | lod data | uint32 version |
+# | int32 desc_size | TensorDesc proto | tensor data |, so that tensor data
+# can be memory mapped as numpy arrays without loading the file. Files are
+# mapped copy-on-write for each TranslatedLayer: pages are shared by
+# layers and forked processes through the page cache until written, and
+# writes to variables sharing the mapping go to private pages instead of
+# the file. The file is closed when all arrays of the layer are released.
+# Tensor data follows the variable-length TensorDesc proto, so arrays may
+# be unaligned, only arrays aligned to their dtype share memory with
+# tensors and the others are copied.
+_PROTO_DTYPE_TO_NUMPY_DTYPE = {
+    int(k): v for k, v in _PADDLE_DTYPE_2_NUMPY_DTYPE.items()
+}
+
+
+def _map_combined_params(file_path):
+    """
+    Memory maps the params file saved by `save_combine` copy-on-write and
+    returns a list of numpy arrays in the saved order.
+    """
+    buffer = np.memmap(file_path, dtype='uint8', mode='c')
+    arrays = []
+    offset = 0
+    while offset < len(buffer):
+        offset += 4  # DenseTensor version
+        (lod_level,) = struct.unpack_from('<Q', buffer, offset)
+        offset += 8
+        for _ in range(lod_level):
+            (lod_size,) = struct.unpack_from('<Q', buffer, offset)
+            offset += 8 + lod_size
+        offset += 4  # Tensor version
+        (desc_size,) = struct.unpack_from('<i', buffer, offset)
+        offset += 4
+        desc = framework_pb2.VarType.TensorDesc()
+        desc.ParseFromString(buffer[offset : offset + desc_size].tobytes())
+        offset += desc_size
+        dtype = np.dtype(_PROTO_DTYPE_TO_NUMPY_DTYPE[desc.data_type])
+        shape = list(desc.dims)
+        nbytes = int(np.prod(shape)) * dtype.itemsize
+        arrays.append(
+            buffer[offset : offset + nbytes].view(dtype).reshape(shape)
+        )
+        offset += nbytes
+
+    return arrays
+
+
+def _create_lazy_var(is_param, name, array):
+    """
+    Creates persistable variable with the shape and dtype of mapped array,
+    whose value is set when materialized.
+    """
+    dtype = convert_np_dtype_to_dtype_(array.dtype)
+    if array.dtype == np.uint16:
+        dtype = core.VarDesc.VarType.BF16
+    if is_param:
+        if framework._in_eager_without_dygraph_check():
+            return framework.EagerParamBase(
+                shape=list(array.shape),
+                dtype=dtype,
+                name=name,
+                persistable=True,
+            )
+        return framework.ParamBase(
+            shape=list(array.shape), dtype=dtype, name=name, persistable=True
+        )
+    return framework._varbase_creator(
+        name=name, shape=list(array.shape), dtype=dtype, persistable=True
+    )
+
+
 # NOTE: [compatible] deal with model saved by save_inference_model,
 # which need get var info from program desc
 def _load_persistable_vars_by_program(
-    model_path, program_holder, params_filename=None
+    model_path, program_holder, params_filename=None, lazy_vars=None
 ):
     # make sure the path has been checked
     persistable_vars = _get_persistable_vars(program_holder.infer_program)
     load_var_dict = {}
+    lazy = lazy_vars is not None and params_filename is not None
+    if lazy:
+        arrays = _map_combined_params(os.path.join(model_path, params_filename))
+        dict_name_old_new = {
+            v: k for k, v in program_holder._suffix_varname_dict.items()
+        }
+        if len(arrays) != len(dict_name_old_new):
+            raise ValueError("The model to be loaded is incomplete.")
+        for name, array in zip(sorted(dict_name_old_new.keys()), arrays):
+            lazy_vars[dict_name_old_new[name]] = array
     for each_var in persistable_vars:
         orig_each_name = program_holder._suffix_varname_dict[each_var.name()]
-        if _is_parameter(each_var, program_holder.infer_program):
+        if lazy:
+            new_var = _create_lazy_var(
+                _is_parameter(each_var, program_holder.infer_program),
+                each_var.name(),
+                lazy_vars[each_var.name()],
+            )
+        elif _is_parameter(each_var, program_holder.infer_program):
             # create output varbase
             if framework._in_eager_without_dygraph_check():
                 new_var = framework.EagerParamBase(
@@ -676,7 +771,7 @@ def _load_persistable_vars_by_program(
         new_var.stop_gradient = False
         load_var_dict[each_var.name()] = new_var
 
-    if params_filename is not None:
+    if params_filename is not None and not lazy:
         load_var_list = []
         dict_name_old_new = {
             v: k for k, v in program_holder._suffix_varname_dict.items()
@@ -712,7 +807,7 @@ def _load_persistable_vars_by_program(
 
 
 def _load_persistable_vars(
-    model_path, var_info_path, program_holder, params_filename
+    model_path, var_info_path, program_holder, params_filename, lazy_vars=None
 ):
     # 1. load extra var info
     with open(var_info_path, 'rb') as f:
@@ -725,10 +820,18 @@ def _load_persistable_vars(
         value: key for key, value in program_holder._suffix_varname_dict.items()
     }
 
+    assert params_filename is not None, "params_filename should not be None."
+    var_file_path = os.path.join(model_path, params_filename)
+    lazy = lazy_vars is not None and os.path.exists(var_file_path)
+    if lazy:
+        arrays = _map_combined_params(var_file_path)
+        if len(arrays) != len(inv_suffix_varname_dict):
+            raise ValueError("The model to be loaded is incomplete.")
+
     # NOTE(chenweihang): we need load persistable vars based the program,
     # because the program may be pruned when `save_inference_model`, some
     # var in `extra_var_info` may have been pruned
-    for name in sorted(inv_suffix_varname_dict):
+    for idx, name in enumerate(sorted(inv_suffix_varname_dict)):
         if name not in extra_var_info:
             raise RuntimeError(
                 "The model to be loaded is not complete."
@@ -738,7 +841,14 @@ def _load_persistable_vars(
         # get suffix var name, see [why need to append suffix to persistable vars]
         new_name = inv_suffix_varname_dict[name]
         # create output varbase
-        if extra_var_info[name].get('trainable', None) is not None:
+        if lazy:
+            lazy_vars[new_name] = arrays[idx]
+            new_var = _create_lazy_var(
+                extra_var_info[name].get('trainable', None) is not None,
+                new_name,
+                arrays[idx],
+            )
+        elif extra_var_info[name].get('trainable', None) is not None:
             # use default shape and dtype
             if framework._in_eager_without_dygraph_check():
                 new_var = framework.EagerParamBase(
@@ -767,13 +877,11 @@ def _load_persistable_vars(
         load_var_dict[new_name] = new_var
         load_var_list.append(new_var)
 
-    # 3. load all vars
-    assert params_filename is not None, "params_filename should not be None."
-    var_file_path = os.path.join(model_path, params_filename)
+    # 3. load all vars, lazily loaded vars are materialized when used
     if not os.path.exists(var_file_path):
         if len(extra_var_info) != 0:
             raise ValueError("The model to be loaded is incomplete.")
-    else:
+    elif not lazy:
         framework._dygraph_tracer().trace_op(
             type='load_combine',
             inputs={},
@@ -841,7 +949,11 @@ def _construct_program_holders(model_path, model_filename=None):
 
 
 def _construct_params_and_buffers(
-    model_path, programs, params_filename=None, append_suffix=True
+    model_path,
+    programs,
+    params_filename=None,
+    append_suffix=True,
+    lazy_vars=None,
 ):
     var_info_filename = str(params_filename) + ".info"
     var_info_path = os.path.join(model_path, var_info_filename)
@@ -849,7 +961,11 @@ def _construct_params_and_buffers(
 
     if os.path.exists(var_info_path):
         var_dict = _load_persistable_vars(
-            model_path, var_info_path, programs['forward'], params_filename
+            model_path,
+            var_info_path,
+            programs['forward'],
+            params_filename,
+            lazy_vars,
         )
         model_name = params_filename[: -len(INFER_PARAMS_SUFFIX)]
         # Load every file that meets the requirements in the directory model_path.
@@ -869,7 +985,11 @@ def _construct_params_and_buffers(
             var_info_path = os.path.join(model_path, var_info_filename)
             var_dict.update(
                 _load_persistable_vars(
-                    model_path, var_info_path, programs[func_name], file_name
+                    model_path,
+                    var_info_path,
+                    programs[func_name],
+                    file_name,
+                    lazy_vars,
                 )
             )
     elif params_filename is not None and not os.path.exists(params_path):
@@ -877,7 +997,7 @@ def _construct_params_and_buffers(
         return dict()
     else:
         var_dict = _load_persistable_vars_by_program(
-            model_path, programs['forward'], params_filename
+            model_path, programs['forward'], params_filename, lazy_vars
         )
 
     if not append_suffix:
@@ -950,6 +1070,7 @@ def _run_dygraph(instance, input, program_holder):
             ins.name() for ins in program_holder.input_descs
         ]
 
+    instance._materialize_vars(program_holder.persistable_names)
     persistable_vars = []
     for var_name in program_holder.persistable_names:
         dy_var_name = instance._persistable_var_name_dict[var_name]
@@ -1484,6 +1605,10 @@ class TranslatedLayer(layers.Layer):
 
         self._is_test = True
         self._input_args_names = None
+        # {var name: mapped array} of persistable vars not materialized or
+        # sharing memory with the mapped params file
+        self._lazy_vars = {}
+        self._shared_lazy_vars = set()
 
     @staticmethod
     @framework.dygraph_only
@@ -1494,20 +1619,25 @@ class TranslatedLayer(layers.Layer):
             raise ValueError("There is no directory named '%s'" % model_path)
         model_filename = None
         params_filename = None
+        lazy_vars = None
         if configs is not None:
             model_filename = configs.model_filename
             params_filename = configs.params_filename
+            if configs.mmap:
+                lazy_vars = {}
 
         # 1. load program desc & construct _ProgramHolder
         programs = _construct_program_holders(model_path, model_filename)
 
         # 2. load layer parameters & buffers
         persistable_vars = _construct_params_and_buffers(
-            model_path, programs, params_filename
+            model_path, programs, params_filename, lazy_vars=lazy_vars
         )
 
         # 3. construct TranslatedLayer object
         translated_layer = TranslatedLayer(programs, persistable_vars)
+        if lazy_vars is not None:
+            translated_layer._lazy_vars = lazy_vars
 
         # 4. create TranslatedLayer's execution method
         for method_name, program_holder in programs.items():
@@ -1549,9 +1679,81 @@ class TranslatedLayer(layers.Layer):
         __i_m_p_l__.__name__ = method_name
         return __i_m_p_l__
 
+    def _materialize_vars(self, var_names=None, share=None):
+        """
+        Sets values of lazily loaded persistable variables from the mapped
+        params file. In eval mode on CPU, variables share the copy-on-write
+        mapped memory if aligned, otherwise they are copied, and shared
+        variables are copied when materialized with `share=False` .
+        Variables whose values have been set otherwise, e.g. by
+        `set_value` , are not overwritten and no longer lazily loaded.
+        """
+        if not self._lazy_vars:
+            return
+        if var_names is None:
+            var_names = list(self._lazy_vars.keys())
+        place = framework._current_expected_place()
+        if share is None:
+            share = self._is_test
+        share = (
+            share
+            and isinstance(place, core.CPUPlace)
+            and framework._in_eager_without_dygraph_check()
+        )
+
+        for name in var_names:
+            if name not in self._lazy_vars:
+                continue
+            array = self._lazy_vars[name]
+            dy_name = self._persistable_var_name_dict[name]
+            if dy_name in self._parameters:
+                var = self._parameters[dy_name]
+            else:
+                var = self._buffers[dy_name]
+
+            if name in self._shared_lazy_vars:
+                # in-place writes of shared variables are in the mapped
+                # memory, other writes replace memory of the variables
+                if var.get_tensor()._ptr() == array.ctypes.data:
+                    if share:
+                        continue
+                else:
+                    self._shared_lazy_vars.discard(name)
+                    del self._lazy_vars[name]
+                    continue
+            elif var._is_initialized():
+                del self._lazy_vars[name]
+                continue
+
+            # see [ memory-mapped params file ]
+            share_array = share and array.flags.aligned
+            if framework._in_eager_without_dygraph_check():
+                tensor = core.eager.Tensor(
+                    value=array,
+                    name=var.name,
+                    persistable=True,
+                    place=place,
+                    zero_copy=share_array,
+                )
+                tensor._share_underline_tensor_to(var)
+            else:
+                var.set_value(np.array(array))
+
+            if share_array:
+                self._shared_lazy_vars.add(name)
+            else:
+                self._shared_lazy_vars.discard(name)
+                del self._lazy_vars[name]
+
+    def _state_dict_impl(self, *args, **kwargs):
+        self._materialize_vars()
+        return super()._state_dict_impl(*args, **kwargs)
+
     def train(self):
         self._is_test = False
         self.training = True
+        # parameters may be updated in train mode
+        self._materialize_vars(share=False)
 
     def eval(self):
         self._is_test = True
@@ -18,6 +18,7 @@ from .metrics import Precision  # noqa: F401
 from .metrics import Recall  # noqa: F401
 from .metrics import Auc  # noqa: F401
 from .metrics import accuracy  # noqa: F401
+from .metrics import all_reduce_metrics  # noqa: F401
 
 __all__ = [  # noqa
     'Metric',
@@ -26,4 +27,5 @@ __all__ = [  # noqa
     'Recall',
     'Auc',
     'accuracy',
+    'all_reduce_metrics',
 ]
@@ -13,6 +13,7 @@
 # limitations under the License.
 
 import abc
+import copy
 
 import numpy as np
 
@@ -30,6 +31,56 @@ def _is_numpy_(var):
     return isinstance(var, (np.ndarray, np.generic))
 
 
+def _is_tensor_(var):
+    return isinstance(var, (paddle.Tensor, paddle.fluid.core.eager.Tensor))
+
+
+def _check_input(var, name):
+    if not (_is_tensor_(var) or _is_numpy_(var)):
+        raise ValueError(
+            "The '{}' must be a numpy ndarray or Tensor.".format(name)
+        )
+
+
+def _binary_counts(preds, labels, include_half):
+    """
+    Returns the numbers of true positives, false positives and false
+    negatives, where predictions in [0.5, 1.5) (or (0.5, 1.5) if not
+    include_half) are positive and labels equal to 1 are positive.
+
+    If both preds and labels are Tensors, counting is done on their device
+    and only the counts are fetched.
+    """
+    if _is_tensor_(preds) and _is_tensor_(labels):
+        preds = paddle.reshape(preds, [-1])
+        labels = paddle.reshape(labels, [-1])
+        lower = preds >= 0.5 if include_half else preds > 0.5
+        pred_pos = paddle.logical_and(lower, preds < 1.5)
+        label_pos = labels == 1
+        true_pos = paddle.logical_and(pred_pos, label_pos)
+        counts = paddle.stack(
+            [
+                paddle.sum(paddle.cast(mask, 'int64'))
+                for mask in [true_pos, pred_pos, label_pos]
+            ]
+        )
+        tp, num_pred_pos, num_label_pos = counts.numpy().reshape(-1).tolist()
+    else:
+        if _is_tensor_(preds):
+            preds = preds.numpy()
+        if _is_tensor_(labels):
+            labels = labels.numpy()
+        preds = preds.reshape(-1)
+        labels = labels.reshape(-1)
+        lower = preds >= 0.5 if include_half else preds > 0.5
+        pred_pos = np.logical_and(lower, preds < 1.5)
+        label_pos = labels == 1
+        tp = int(np.count_nonzero(np.logical_and(pred_pos, label_pos)))
+        num_pred_pos = int(np.count_nonzero(pred_pos))
+        num_label_pos = int(np.count_nonzero(label_pos))
+    return tp, num_pred_pos - tp, num_label_pos - tp
+
+
 class Metric(metaclass=abc.ABCMeta):
     r"""
     Base class for metric, encapsulates metric logic and APIs
@@ -162,6 +213,33 @@ class Metric(metaclass=abc.ABCMeta):
             )
         )
 
+    def states(self):
+        """
+        Returns the sufficient statistics of the metric, a list of numpy
+        arrays whose shapes do not depend on the number of samples, or None
+        if the metric does not declare them.
+
+        The global metric of all ranks is the metric with the sums of states
+        on all ranks, which is computed by
+        :code:`paddle.metric.all_reduce_metrics` instead of gathering outputs
+        and labels of all ranks.
+
+        see :code:`Metric.set_states`
+        """
+        return None
+
+    def set_states(self, states):
+        """
+        Sets the sufficient statistics returned by :code:`states`.
+
+        see :code:`Metric.states`
+        """
+        raise NotImplementedError(
+            "function 'set_states' not implemented in {}.".format(
+                self.__class__.__name__
+            )
+        )
+
     def compute(self, *args):
         """
         This API is advanced usage to accelerate metric calculating, calulations
@@ -291,12 +369,17 @@ class Accuracy(Metric):
         Return:
             Tensor: the accuracy of current step.
         """
-        if isinstance(correct, (paddle.Tensor, paddle.fluid.core.eager.Tensor)):
-            correct = correct.numpy()
         num_samples = np.prod(np.array(correct.shape[:-1]))
+        if _is_tensor_(correct):
+            # count on device and only fetch the counts of all topk
+            all_corrects = paddle.stack(
+                [paddle.sum(correct[..., :k]) for k in self.topk]
+            )
+            all_corrects = all_corrects.numpy().reshape(-1)
+        else:
+            all_corrects = [correct[..., :k].sum() for k in self.topk]
         accs = []
-        for i, k in enumerate(self.topk):
-            num_corrects = correct[..., :k].sum()
+        for i, num_corrects in enumerate(all_corrects):
             accs.append(float(num_corrects) / num_samples)
             self.total[i] += num_corrects
             self.count[i] += num_samples
@@ -310,6 +393,23 @@ class Accuracy(Metric):
         self.total = [0.0] * len(self.topk)
         self.count = [0] * len(self.topk)
 
+    def states(self):
+        """
+        Returns the correct counts and total counts of all topk.
+        """
+        return [
+            np.array(self.total, dtype='float64'),
+            np.array(self.count, dtype='int64'),
+        ]
+
+    def set_states(self, states):
+        """
+        Sets the correct counts and total counts of all topk.
+        """
+        total, count = states
+        self.total = np.asarray(total, dtype='float64').tolist()
+        self.count = np.asarray(count, dtype='int64').tolist()
+
     def accumulate(self):
         """
         Computes and returns the accumulated metric.
@@ -412,34 +512,21 @@ class Precision(Metric):
         Update the states based on the current mini-batch prediction results.
 
         Args:
-            preds (numpy.ndarray): The prediction result, usually the output
+            preds (numpy.ndarray|Tensor): The prediction result, usually the output
                 of two-class sigmoid function. It should be a vector (column
                 vector or row vector) with data type: 'float64' or 'float32'.
-            labels (numpy.ndarray): The ground truth (labels),
+            labels (numpy.ndarray|Tensor): The ground truth (labels),
                 the shape should keep the same as preds.
-                The data type is 'int32' or 'int64'.
+                The data type is 'int32' or 'int64'. If both preds and labels
+                are Tensors, the states are counted on their device.
         """
-        if isinstance(preds, (paddle.Tensor, paddle.fluid.core.eager.Tensor)):
-            preds = preds.numpy()
-        elif not _is_numpy_(preds):
-            raise ValueError("The 'preds' must be a numpy ndarray or Tensor.")
-
-        if isinstance(labels, (paddle.Tensor, paddle.fluid.core.eager.Tensor)):
-            labels = labels.numpy()
-        elif not _is_numpy_(labels):
-            raise ValueError("The 'labels' must be a numpy ndarray or Tensor.")
-
-        sample_num = labels.shape[0]
-        preds = np.floor(preds + 0.5).astype("int32")
+        _check_input(preds, 'preds')
+        _check_input(labels, 'labels')
 
-        for i in range(sample_num):
-            pred = preds[i]
-            label = labels[i]
-            if pred == 1:
-                if pred == label:
-                    self.tp += 1
-                else:
-                    self.fp += 1
+        # floor(preds + 0.5) == 1
+        tp, fp, _ = _binary_counts(preds, labels, include_half=True)
+        self.tp += tp
+        self.fp += fp
 
     def reset(self):
         """
@@ -448,6 +535,18 @@ class Precision(Metric):
         self.tp = 0
         self.fp = 0
 
+    def states(self):
+        """
+        Returns the numbers of true positives and false positives.
+        """
+        return [np.array([self.tp, self.fp], dtype='int64')]
+
+    def set_states(self, states):
+        """
+        Sets the numbers of true positives and false positives.
+        """
+        self.tp, self.fp = np.asarray(states[0], dtype='int64').tolist()
+
     def accumulate(self):
         """
         Calculate the final precision.
@@ -545,34 +644,22 @@ class Recall(Metric):
         Update the states based on the current mini-batch prediction results.
 
         Args:
-            preds(numpy.array): prediction results of current mini-batch,
+            preds(numpy.array|Tensor): prediction results of current mini-batch,
                 the output of two-class sigmoid function.
                 Shape: [batch_size, 1]. Dtype: 'float64' or 'float32'.
-            labels(numpy.array): ground truth (labels) of current mini-batch,
+            labels(numpy.array|Tensor): ground truth (labels) of current mini-batch,
                 the shape should keep the same as preds.
-                Shape: [batch_size, 1], Dtype: 'int32' or 'int64'.
+                Shape: [batch_size, 1], Dtype: 'int32' or 'int64'. If both
+                preds and labels are Tensors, the states are counted on their
+                device.
         """
-        if isinstance(preds, (paddle.Tensor, paddle.fluid.core.eager.Tensor)):
-            preds = preds.numpy()
-        elif not _is_numpy_(preds):
-            raise ValueError("The 'preds' must be a numpy ndarray or Tensor.")
-
-        if isinstance(labels, (paddle.Tensor, paddle.fluid.core.eager.Tensor)):
-            labels = labels.numpy()
-        elif not _is_numpy_(labels):
-            raise ValueError("The 'labels' must be a numpy ndarray or Tensor.")
-
-        sample_num = labels.shape[0]
-        preds = np.rint(preds).astype("int32")
+        _check_input(preds, 'preds')
+        _check_input(labels, 'labels')
 
-        for i in range(sample_num):
-            pred = preds[i]
-            label = labels[i]
-            if label == 1:
-                if pred == label:
-                    self.tp += 1
-                else:
-                    self.fn += 1
+        # rint(preds) == 1
+        tp, _, fn = _binary_counts(preds, labels, include_half=False)
+        self.tp += tp
+        self.fn += fn
 
     def accumulate(self):
         """
@@ -591,6 +678,18 @@ class Recall(Metric):
         self.tp = 0
         self.fn = 0
 
+    def states(self):
+        """
+        Returns the numbers of true positives and false negatives.
+        """
+        return [np.array([self.tp, self.fn], dtype='int64')]
+
+    def set_states(self, states):
+        """
+        Sets the numbers of true positives and false negatives.
+        """
+        self.tp, self.fn = np.asarray(states[0], dtype='int64').tolist()
+
     def name(self):
         """
         Returns metric name
@@ -602,7 +701,8 @@ class Auc(Metric):
     """
     The auc metric is for binary classification.
     Refer to https://en.wikipedia.org/wiki/Receiver_operating_characteristic#Area_under_the_curve.
-    Please notice that the auc metric is implemented with python, which may be a little bit slow.
+    Predictions are binned into histograms by bincount, on the device of
+    predictions if they are Tensors, and the curve is computed by cumsum.
 
     The `auc` function creates four local variables, `true_positives`,
     `true_negatives`, `false_positives` and `false_negatives` that are used to
@@ -697,31 +797,44 @@ class Auc(Metric):
         Update the auc curve with the given predictions and labels.
 
         Args:
-            preds (numpy.array): An numpy array in the shape of
+            preds (numpy.array|Tensor): An numpy array in the shape of
                 (batch_size, 2), preds[i][j] denotes the probability of
                 classifying the instance i into the class j.
-            labels (numpy.array): an numpy array in the shape of
+            labels (numpy.array|Tensor): an numpy array in the shape of
                 (batch_size, 1), labels[i] is either o or 1,
-                representing the label of the instance i.
+                representing the label of the instance i. If both preds and
+                labels are Tensors, the histograms are computed on their
+                device.
         """
-        if isinstance(labels, (paddle.Tensor, paddle.fluid.core.eager.Tensor)):
-            labels = labels.numpy()
-        elif not _is_numpy_(labels):
-            raise ValueError("The 'labels' must be a numpy ndarray or Tensor.")
-
-        if isinstance(preds, (paddle.Tensor, paddle.fluid.core.eager.Tensor)):
-            preds = preds.numpy()
-        elif not _is_numpy_(preds):
-            raise ValueError("The 'preds' must be a numpy ndarray or Tensor.")
-
-        for i, lbl in enumerate(labels):
-            value = preds[i, 1]
-            bin_idx = int(value * self._num_thresholds)
-            assert bin_idx <= self._num_thresholds
-            if lbl:
-                self._stat_pos[bin_idx] += 1.0
-            else:
-                self._stat_neg[bin_idx] += 1.0
+        _check_input(labels, 'labels')
+        _check_input(preds, 'preds')
+
+        num_buckets = self._num_thresholds + 1
+        if _is_tensor_(preds) and _is_tensor_(labels):
+            bins = paddle.cast(preds[:, 1] * self._num_thresholds, 'int64')
+            pos = paddle.cast(paddle.reshape(labels, [-1]) != 0, 'float64')
+            stats = paddle.stack(
+                [
+                    paddle.bincount(bins, weights=pos, minlength=num_buckets),
+                    paddle.bincount(
+                        bins, weights=1.0 - pos, minlength=num_buckets
+                    ),
+                ]
+            ).numpy()
+            assert stats.shape[1] == num_buckets
+            stat_pos, stat_neg = stats
+        else:
+            if _is_tensor_(labels):
+                labels = labels.numpy()
+            if _is_tensor_(preds):
+                preds = preds.numpy()
+            bins = (preds[:, 1] * self._num_thresholds).astype('int64')
+            assert bins.size == 0 or bins.max() <= self._num_thresholds
+            pos = labels.reshape(-1) != 0
+            stat_pos = np.bincount(bins[pos], minlength=num_buckets)
+            stat_neg = np.bincount(bins[~pos], minlength=num_buckets)
+        self._stat_pos += stat_pos
+        self._stat_neg += stat_neg
 
     @staticmethod
     def trapezoid_area(x1, x2, y1, y2):
@@ -734,20 +847,18 @@ class Auc(Metric):
         Return:
             float: the area under auc curve
         """
-        tot_pos = 0.0
-        tot_neg = 0.0
-        auc = 0.0
-
-        idx = self._num_thresholds
-        while idx >= 0:
-            tot_pos_prev = tot_pos
-            tot_neg_prev = tot_neg
-            tot_pos += self._stat_pos[idx]
-            tot_neg += self._stat_neg[idx]
-            auc += self.trapezoid_area(
-                tot_neg, tot_neg_prev, tot_pos, tot_pos_prev
+        # accumulate from the highest threshold
+        stat_pos = self._stat_pos[::-1]
+        stat_neg = self._stat_neg[::-1]
+        cum_pos = np.cumsum(stat_pos)
+        cum_neg = np.cumsum(stat_neg)
+        auc = np.sum(
+            self.trapezoid_area(
+                cum_neg, cum_neg - stat_neg, cum_pos, cum_pos - stat_pos
             )
-            idx -= 1
+        )
+        tot_pos = cum_pos[-1]
+        tot_neg = cum_neg[-1]
 
         return (
             auc / tot_pos / tot_neg if tot_pos > 0.0 and tot_neg > 0.0 else 0.0
@@ -761,6 +872,22 @@ class Auc(Metric):
         self._stat_pos = np.zeros(_num_pred_buckets)
         self._stat_neg = np.zeros(_num_pred_buckets)
 
+    def states(self):
+        """
+        Returns the histograms of predictions of positive and negative
+        instances.
+        """
+        return [self._stat_pos, self._stat_neg]
+
+    def set_states(self, states):
+        """
+        Sets the histograms of predictions of positive and negative
+        instances.
+        """
+        stat_pos, stat_neg = states
+        self._stat_pos = np.array(stat_pos, dtype='float64')
+        self._stat_neg = np.array(stat_neg, dtype='float64')
+
     def name(self):
         """
         Returns metric name
@@ -768,6 +895,77 @@ class Auc(Metric):
         return self._name
 
 
+def all_reduce_metrics(metrics, group=None):
+    """
+    Returns the global metrics of all ranks in dynamic graph mode, which are
+    copies of the local metrics with states summed over all ranks. States of
+    all metrics are flattened and all-reduced by one collective call, whose
+    size depends on the states instead of the number of samples.
+
+    Local metrics are not modified, so that they can be updated and reduced
+    again. Metrics whose :code:`states` are None are returned as they are.
+
+    Args:
+        metrics (Metric|list[Metric]): The local metrics. Metrics must be of
+            the same types and in the same order on all ranks.
+        group (Group, optional): The communication group. Default is None,
+            which means the global group.
+
+    Returns:
+        list[Metric]: The global metrics.
+
+    Examples:
+        .. code-block:: python
+
+            # required: distributed
+            import numpy as np
+            import paddle
+            import paddle.distributed as dist
+
+            dist.init_parallel_env()
+            m = paddle.metric.Precision()
+            m.update(np.random.random([8, 1]), np.random.randint(2, size=[8, 1]))
+            global_m, = paddle.metric.all_reduce_metrics(m)
+            print(global_m.accumulate())
+    """
+    metrics = metrics if isinstance(metrics, (list, tuple)) else [metrics]
+    all_states = [metric.states() for metric in metrics]
+    flat_states = [
+        np.asarray(state, dtype='float64').reshape(-1)
+        for states in all_states
+        if states is not None
+        for state in states
+    ]
+    if len(flat_states) == 0:
+        return list(metrics)
+
+    buffer = np.concatenate(flat_states)
+    if paddle.distributed.get_world_size(group) > 1:
+        tensor = paddle.to_tensor(buffer)
+        paddle.distributed.all_reduce(tensor, group=group)
+        buffer = tensor.numpy()
+
+    global_metrics = []
+    offset = 0
+    for metric, states in zip(metrics, all_states):
+        if states is None:
+            global_metrics.append(metric)
+            continue
+        global_states = []
+        for state in states:
+            state = np.asarray(state)
+            global_states.append(
+                buffer[offset : offset + state.size]
+                .reshape(state.shape)
+                .astype(state.dtype)
+            )
+            offset += state.size
+        global_metric = copy.deepcopy(metric)
+        global_metric.set_states(global_states)
+        global_metrics.append(global_metric)
+    return global_metrics
+
+
 def accuracy(input, label, k=1, correct=None, total=None, name=None):
     """
     accuracy layer.
@@ -16,6 +16,7 @@ import os
 import shutil
 import tempfile
 import unittest
+from unittest import mock
 
 import cv2
 import numpy as np
@@ -29,12 +30,19 @@ from paddle.vision.datasets import (
     Flowers,
     ImageFolder,
 )
+from paddle.vision.datasets.folder import IMG_EXTENSIONS, make_dataset
 
 
 class TestFolderDatasets(unittest.TestCase):
     def setUp(self):
         self.data_dir = tempfile.mkdtemp()
         self.empty_dir = tempfile.mkdtemp()
+        # keep index caches of the temporary folders out of DATA_HOME
+        self.cache_dir = tempfile.mkdtemp()
+        self.cache_patch = mock.patch(
+            'paddle.vision.datasets.cache.CACHE_HOME', self.cache_dir
+        )
+        self.cache_patch.start()
         for i in range(2):
             sub_dir = os.path.join(self.data_dir, 'class_' + str(i))
             if not os.path.exists(sub_dir):
@@ -44,7 +52,10 @@ class TestFolderDatasets(unittest.TestCase):
                 cv2.imwrite(os.path.join(sub_dir, str(j) + '.jpg'), fake_img)
 
     def tearDown(self):
+        self.cache_patch.stop()
         shutil.rmtree(self.data_dir)
+        shutil.rmtree(self.empty_dir)
+        shutil.rmtree(self.cache_dir)
 
     def test_dataset(self):
         dataset_folder = DatasetFolder(self.data_dir)
@@ -85,6 +96,40 @@ class TestFolderDatasets(unittest.TestCase):
         for _ in loader:
             pass
 
+    def test_index_cache(self):
+        dataset_folder = DatasetFolder(self.data_dir)
+        samples = list(dataset_folder.samples)
+        self.assertEqual(
+            samples,
+            make_dataset(
+                self.data_dir, dataset_folder.class_to_idx, IMG_EXTENSIONS
+            ),
+        )
+        self.assertEqual(dataset_folder.targets, [0, 0, 1, 1])
+
+        # index loaded from cache
+        dataset_folder = DatasetFolder(self.data_dir)
+        self.assertEqual(dataset_folder._index[1:3], samples[1:3])
+        self.assertIsInstance(dataset_folder.samples, list)
+        self.assertEqual(dataset_folder.samples, samples)
+
+        # assigned samples are used by __getitem__ and __len__
+        dataset_folder.samples = dataset_folder.samples[:2]
+        self.assertEqual(len(dataset_folder), 2)
+        self.assertEqual(dataset_folder[1][1], 0)
+
+        # index updated after adding files
+        fake_img = (np.random.random((32, 32, 3)) * 255).astype('uint8')
+        sub_dir = os.path.join(self.data_dir, 'class_1', 'sub')
+        os.makedirs(sub_dir)
+        cv2.imwrite(os.path.join(sub_dir, 'new.jpg'), fake_img)
+        dataset_folder = DatasetFolder(self.data_dir)
+        self.assertEqual(len(dataset_folder), 5)
+        self.assertEqual(
+            dataset_folder.samples[4], (os.path.join(sub_dir, 'new.jpg'), 1)
+        )
+        self.assertEqual(len(ImageFolder(self.data_dir)), 5)
+
     def test_errors(self):
         with self.assertRaises(RuntimeError):
             ImageFolder(self.empty_dir)
@@ -12,9 +12,20 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import hashlib
+import io
+import json
 import os
+import tarfile
+import tempfile
+import threading
 import unittest
+import zipfile
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+from unittest import mock
 
+import paddle.utils.download as download
 from paddle.utils.download import get_path_from_url, get_weights_path_from_url
 
 
@@ -158,5 +169,196 @@ class TestDownload(unittest.TestCase):
                 )
 
 
+class RangeRequestHandler(BaseHTTPRequestHandler):
+    content = b''
+    ranges = []
+
+    def do_HEAD(self):
+        self._send(head_only=True)
+
+    def do_GET(self):
+        self._send()
+
+    def _send(self, head_only=False):
+        body = self.content
+        range_header = self.headers.get('Range')
+        if range_header is not None and not head_only:
+            self.ranges.append(range_header)
+            start, end = range_header[len('bytes=') :].split('-')
+            end = int(end) if end else len(self.content) - 1
+            body = self.content[int(start) : end + 1]
+            self.send_response(206)
+        else:
+            self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Accept-Ranges', 'bytes')
+        self.end_headers()
+        if not head_only:
+            self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class TestLocalDownload(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.content = os.urandom(100 * 1024 + 7)
+        self.md5sum = hashlib.md5(self.content).hexdigest()
+        RangeRequestHandler.content = self.content
+        RangeRequestHandler.ranges = []
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), RangeRequestHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = 'http://127.0.0.1:{}/weights.pdparams'.format(
+            self.server.server_address[1]
+        )
+        self.root_dir = os.path.join(self.temp_dir.name, 'root')
+        self.patches = [
+            mock.patch.object(
+                download,
+                'DOWNLOAD_HOME',
+                os.path.join(self.temp_dir.name, 'home'),
+            ),
+            mock.patch.object(download, 'DOWNLOAD_PART_SIZE', 16 * 1024),
+        ]
+        for patch in self.patches:
+            patch.start()
+
+    def tearDown(self):
+        for patch in self.patches:
+            patch.stop()
+        self.server.shutdown()
+        self.server.server_close()
+        self.temp_dir.cleanup()
+
+    def read(self, path):
+        with open(path, 'rb') as f:
+            return f.read()
+
+    def test_ranged_download(self):
+        fullname = download._download(self.url, self.root_dir, self.md5sum)
+        self.assertEqual(self.read(fullname), self.content)
+        self.assertEqual(len(RangeRequestHandler.ranges), 7)
+
+        # md5 of cached file is read from the manifest
+        with mock.patch.object(
+            download, '_md5file', side_effect=AssertionError
+        ):
+            self.assertTrue(download._md5check(fullname, self.md5sum))
+            # files with the same content are reused without downloading
+            other = download._download_file(
+                self.url,
+                os.path.join(self.temp_dir.name, 'other', 'copy.pdparams'),
+                self.md5sum,
+            )
+        self.assertEqual(self.read(other), self.content)
+        self.assertEqual(len(RangeRequestHandler.ranges), 7)
+
+    def test_resume_ranged_download(self):
+        os.makedirs(self.root_dir)
+        tmp_fullname = os.path.join(self.root_dir, 'weights.pdparams_tmp')
+        with open(tmp_fullname, 'wb') as f:
+            f.write(self.content[: 80 * 1024])
+            f.truncate(len(self.content))
+        with open(tmp_fullname + '.parts', 'w') as f:
+            json.dump(
+                {
+                    'part_size': 16 * 1024,
+                    'finished': [i * 16 * 1024 for i in range(5)],
+                },
+                f,
+            )
+        fullname = download._download(self.url, self.root_dir, self.md5sum)
+        self.assertEqual(self.read(fullname), self.content)
+        self.assertEqual(len(RangeRequestHandler.ranges), 2)
+        self.assertFalse(os.path.exists(tmp_fullname + '.parts'))
+
+    def test_resume_stream_download(self):
+        os.makedirs(self.root_dir)
+        with open(
+            os.path.join(self.root_dir, 'weights.pdparams_tmp'), 'wb'
+        ) as f:
+            f.write(self.content[:1000])
+        with mock.patch.object(download, 'DOWNLOAD_PART_SIZE', 1024 * 1024):
+            fullname = download._download(self.url, self.root_dir, self.md5sum)
+        self.assertEqual(self.read(fullname), self.content)
+        self.assertEqual(RangeRequestHandler.ranges, ['bytes=1000-'])
+
+    def test_md5_mismatch(self):
+        with self.assertRaises(RuntimeError):
+            download._download(self.url, self.root_dir, '0' * 32)
+
+
+class TestDecompress(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.files = {
+            'a.txt': b'a' * 1024,
+            'b/c.txt': b'c' * 10,
+            'b/d/e.txt': b'e' * 100,
+        }
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def make_zip(self):
+        path = os.path.join(self.temp_dir.name, 'files.zip')
+        with zipfile.ZipFile(path, 'w') as f:
+            for name, data in self.files.items():
+                f.writestr(name, data)
+        return path
+
+    def make_tar(self):
+        path = os.path.join(self.temp_dir.name, 'files.tar.gz')
+        with tarfile.open(path, 'w:gz') as f:
+            for name, data in self.files.items():
+                info = tarfile.TarInfo(name)
+                info.size = len(data)
+                f.addfile(info, io.BytesIO(data))
+        return path
+
+    def check_files(self, path):
+        for name, data in self.files.items():
+            with open(os.path.join(path, name), 'rb') as f:
+                self.assertEqual(f.read(), data)
+
+    def test_decompress(self):
+        for path in [self.make_zip(), self.make_tar()]:
+            uncompressed_path = download._decompress(path)
+            self.assertEqual(uncompressed_path, os.path.splitext(path)[0])
+            self.check_files(uncompressed_path)
+            self.assertTrue(os.path.exists(path + '.decompressed'))
+            self.assertFalse(os.path.exists(path + '.decompressing'))
+
+            # the completion marker skips decompressing again
+            with mock.patch.object(
+                download, '_uncompress_file_zip', side_effect=AssertionError
+            ), mock.patch.object(
+                download, '_uncompress_file_tar', side_effect=AssertionError
+            ):
+                self.assertEqual(download._decompress(path), uncompressed_path)
+
+    def test_resume(self):
+        path = self.make_zip()
+        uncompressed_path = os.path.join(self.temp_dir.name, 'files')
+        os.makedirs(uncompressed_path)
+        with open(os.path.join(uncompressed_path, 'a.txt'), 'wb') as f:
+            f.write(b'finished')
+        stat = os.stat(path)
+        with open(path + '.decompressing', 'w') as f:
+            f.write('{} {}\na.txt\n'.format(stat.st_size, stat.st_mtime_ns))
+
+        download._decompress(path)
+        # finished members are not extracted again
+        with open(os.path.join(uncompressed_path, 'a.txt'), 'rb') as f:
+            self.assertEqual(f.read(), b'finished')
+        with open(os.path.join(uncompressed_path, 'b/d/e.txt'), 'rb') as f:
+            self.assertEqual(f.read(), self.files['b/d/e.txt'])
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -12,7 +12,9 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import copy
 import unittest
+from unittest import mock
 
 import numpy as np
 
@@ -354,6 +356,151 @@ class TestAuc(unittest.TestCase):
         m.reset()
         self.assertEqual(m.accumulate(), 0.0)
 
+    def test_auc_large_batch(self):
+        np.random.seed(2022)
+        x = np.random.random(size=(10000, 1)).astype('float32')
+        x = np.concatenate([1 - x, x], axis=1)
+        y = np.random.randint(2, size=(10000, 1)).astype('int64')
+
+        # the reference sorts all predictions in the same buckets
+        num_thresholds = 4095
+        bins = (x[:, 1] * num_thresholds).astype('int64')
+        pos = np.zeros(num_thresholds + 1)
+        neg = np.zeros(num_thresholds + 1)
+        for b, label in zip(bins, y.reshape(-1)):
+            if label:
+                pos[b] += 1
+            else:
+                neg[b] += 1
+        auc, tot_pos, tot_neg = 0.0, 0.0, 0.0
+        for b in reversed(range(num_thresholds + 1)):
+            auc += neg[b] * (2 * tot_pos + pos[b]) / 2.0
+            tot_pos += pos[b]
+            tot_neg += neg[b]
+        expected = auc / tot_pos / tot_neg
+
+        for to_tensor in [False, True]:
+            m = paddle.metric.Auc()
+            for i in range(0, 10000, 2500):
+                preds, labels = x[i : i + 2500], y[i : i + 2500]
+                if to_tensor:
+                    preds = paddle.to_tensor(preds)
+                    labels = paddle.to_tensor(labels)
+                m.update(preds, labels)
+            np.testing.assert_array_equal(m._stat_pos, pos)
+            np.testing.assert_array_equal(m._stat_neg, neg)
+            self.assertAlmostEqual(m.accumulate(), expected)
+
+
+class TestBinaryMetricsTensor(unittest.TestCase):
+    def test_tensor_and_numpy(self):
+        np.random.seed(2022)
+        x = np.random.random(size=(1000, 1)).astype('float32')
+        x[:10] = 0.5
+        y = np.random.randint(2, size=(1000, 1)).astype('int64')
+        for metric_cls in [paddle.metric.Precision, paddle.metric.Recall]:
+            np_metric, tensor_metric = metric_cls(), metric_cls()
+            np_metric.update(x, y)
+            tensor_metric.update(paddle.to_tensor(x), paddle.to_tensor(y))
+            self.assertAlmostEqual(
+                np_metric.accumulate(), tensor_metric.accumulate()
+            )
+
+        pred = (x >= 0.5).reshape(-1)
+        label = y.reshape(-1) == 1
+        m = paddle.metric.Precision()
+        m.update(paddle.to_tensor(x), paddle.to_tensor(y))
+        self.assertEqual(m.tp, np.sum(pred & label))
+        self.assertEqual(m.fp, np.sum(pred & ~label))
+
+        pred = (x > 0.5).reshape(-1)
+        m = paddle.metric.Recall()
+        m.update(paddle.to_tensor(x), paddle.to_tensor(y))
+        self.assertEqual(m.tp, np.sum(pred & label))
+        self.assertEqual(m.fn, np.sum(~pred & label))
+
+
+class TestMetricStates(unittest.TestCase):
+    def setUp(self):
+        paddle.disable_static()
+        np.random.seed(2022)
+        x = np.random.random(size=(100, 1)).astype('float32')
+        self.preds = np.concatenate([1 - x, x], axis=1)
+        self.labels = np.random.randint(2, size=(100, 1)).astype('int64')
+
+    def create_metrics(self):
+        return [
+            paddle.metric.Accuracy(topk=(1, 2)),
+            paddle.metric.Precision(),
+            paddle.metric.Recall(),
+            paddle.metric.Auc(),
+        ]
+
+    def update(self, metrics, preds, labels):
+        for m in metrics:
+            if isinstance(m, paddle.metric.Accuracy):
+                correct = m.compute(
+                    paddle.to_tensor(preds), paddle.to_tensor(labels)
+                )
+                m.update(correct)
+            elif isinstance(m, paddle.metric.Auc):
+                m.update(preds, labels)
+            else:
+                m.update(preds[:, 1:], labels)
+
+    def test_all_reduce(self):
+        # two ranks, each with half of samples
+        rank_metrics = [self.create_metrics(), self.create_metrics()]
+        for rank, metrics in enumerate(rank_metrics):
+            self.update(
+                metrics,
+                self.preds[rank * 50 : (rank + 1) * 50],
+                self.labels[rank * 50 : (rank + 1) * 50],
+            )
+        expected = self.create_metrics()
+        self.update(expected, self.preds, self.labels)
+
+        def all_reduce(tensor, group=None):
+            other_states = [
+                np.asarray(state, dtype='float64').reshape(-1)
+                for m in rank_metrics[1]
+                for state in m.states()
+            ]
+            tensor.set_value(tensor.numpy() + np.concatenate(other_states))
+
+        local_states = [m.states() for m in rank_metrics[0]]
+        with mock.patch.object(
+            paddle.distributed, 'get_world_size', return_value=2
+        ), mock.patch.object(
+            paddle.distributed, 'all_reduce', side_effect=all_reduce
+        ) as all_reduce_mock:
+            global_metrics = paddle.metric.all_reduce_metrics(rank_metrics[0])
+        self.assertEqual(all_reduce_mock.call_count, 1)
+
+        for m, e in zip(global_metrics, expected):
+            np.testing.assert_allclose(m.accumulate(), e.accumulate())
+        # local metrics are not modified
+        for m, states in zip(rank_metrics[0], local_states):
+            for state, local_state in zip(m.states(), states):
+                np.testing.assert_array_equal(state, local_state)
+
+    def test_set_states(self):
+        metrics = self.create_metrics()
+        self.update(metrics, self.preds, self.labels)
+        for m in metrics:
+            new_m = copy.deepcopy(m)
+            new_m.reset()
+            new_m.set_states(m.states())
+            self.assertEqual(new_m.accumulate(), m.accumulate())
+
+        # metrics without states are returned as they are
+        class MyMetric(paddle.metric.Precision):
+            def states(self):
+                return None
+
+        m = MyMetric()
+        self.assertIs(paddle.metric.all_reduce_metrics(m)[0], m)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -557,6 +557,49 @@ class TestModelFunction(unittest.TestCase):
             np.testing.assert_allclose(out, ref, rtol=1e-6)
             fluid.disable_dygraph() if dynamic else None
 
+    def test_predict_with_sink(self):
+        data = np.random.random(size=(10, 20)).astype(np.float32)
+
+        class PredictDataset(Dataset):
+            def __getitem__(self, idx):
+                return (data[idx],)
+
+            def __len__(self):
+                return len(data)
+
+        dataset = PredictDataset()
+        for dynamic in [True, False]:
+            device = paddle.set_device('cpu')
+            fluid.enable_dygraph(device) if dynamic else None
+            self.set_seed()
+            net = MyModel()
+            inputs = [InputSpec([None, 20], 'float32', 'x')]
+            model = Model(net, inputs)
+            model.prepare()
+            (expected,) = model.predict(
+                dataset, batch_size=4, stack_outputs=True, verbose=0
+            )
+
+            batches = []
+            result = model.predict(
+                dataset,
+                batch_size=4,
+                verbose=0,
+                sink=lambda outputs: batches.append(outputs[0]),
+            )
+            self.assertIsNone(result)
+            self.assertEqual([len(b) for b in batches], [4, 4, 2])
+            np.testing.assert_allclose(
+                np.concatenate(batches), expected, rtol=1e-6
+            )
+
+            def error_sink(outputs):
+                raise RuntimeError("sink error")
+
+            with self.assertRaises(RuntimeError):
+                model.predict(dataset, batch_size=4, verbose=0, sink=error_sink)
+            fluid.disable_dygraph() if dynamic else None
+
     def test_save_load(self):
         path = os.path.join(tempfile.mkdtemp(), '.cache_test_save_load')
         if not os.path.exists(path):
@@ -579,6 +622,116 @@ class TestModelFunction(unittest.TestCase):
             fluid.disable_dygraph() if dynamic else None
         shutil.rmtree(path)
 
+    def test_async_save(self):
+        path = os.path.join(tempfile.mkdtemp(), '.cache_test_async_save')
+        device = paddle.set_device('cpu')
+        fluid.enable_dygraph(device)
+        net = MyModel()
+        optim = paddle.optimizer.Adam(
+            learning_rate=0.001, parameters=net.parameters()
+        )
+        model = Model(net)
+        model.prepare(optimizer=optim, loss=CrossEntropyLoss(reduction="sum"))
+        future = model.save(path, async_save=True)
+        self.assertEqual(future.result(), path)
+        self.assertTrue(os.path.exists(path + '.pdparams'))
+
+        params = paddle.load(path + '.pdparams')
+        for key, value in net.state_dict().items():
+            np.testing.assert_array_equal(params[key].numpy(), value.numpy())
+        model.load(path)
+        fluid.disable_dygraph()
+
+        with self.assertRaises(ValueError):
+            model.save(path, training=False, async_save=True)
+        shutil.rmtree(os.path.dirname(path))
+
+    def test_sync_free_fit(self):
+        data = np.random.random(size=(40, 20)).astype(np.float32)
+        label = np.random.randint(0, 10, size=(40, 1)).astype(np.int64)
+        dataset = paddle.io.TensorDataset([to_tensor(data), to_tensor(label)])
+
+        class LogsRecorder(paddle.callbacks.Callback):
+            def __init__(self):
+                super().__init__()
+                self.logs = []
+                self.epoch_logs = []
+
+            def on_train_batch_end(self, step, logs=None):
+                self.logs.append(dict(logs))
+
+            def on_epoch_end(self, epoch, logs=None):
+                self.epoch_logs.append(dict(logs))
+
+        device = paddle.set_device('cpu')
+        fluid.enable_dygraph(device)
+        results = []
+        for sync_free in [False, True]:
+            self.set_seed()
+            net = MyModel()
+            optim = paddle.optimizer.SGD(
+                learning_rate=0.001, parameters=net.parameters()
+            )
+            model = Model(net)
+            model.prepare(
+                optim,
+                loss=CrossEntropyLoss(reduction="sum"),
+                metrics=Accuracy(),
+            )
+            recorder = LogsRecorder()
+            model.fit(
+                dataset,
+                batch_size=4,
+                epochs=2,
+                log_freq=3,
+                verbose=0,
+                shuffle=False,
+                callbacks=[recorder],
+                sync_free=sync_free,
+            )
+            self.assertFalse(model._adapter._sync_free)
+            results.append((recorder.logs, recorder.epoch_logs))
+
+        # logs are updated every `log_freq` steps and at the end of epoch
+        (normal_logs, normal_epoch_logs), (logs, epoch_logs) = results
+        self.assertNotIn('acc', logs[0])
+        self.assertEqual(logs[3]['acc'], logs[2]['acc'])
+        pairs = [(normal_logs[i], logs[i]) for i in [2, 5, 8, 12]]
+        pairs += list(zip(normal_epoch_logs, epoch_logs))
+        for expected, actual in pairs:
+            np.testing.assert_allclose(
+                expected['loss'], actual['loss'], rtol=1e-6
+            )
+            self.assertAlmostEqual(expected['acc'], actual['acc'])
+        fluid.disable_dygraph()
+
+    def test_cut_off_local_padding(self):
+        fluid.enable_dygraph(paddle.set_device('cpu'))
+        model = Model(MyModel())
+        model.prepare(metrics=Accuracy())
+        model._test_dataloader = paddle.io.DataLoader(
+            paddle.io.TensorDataset([paddle.rand([5, 20])]), batch_size=2
+        )
+        adapter = model._adapter
+        adapter._nranks = 2
+        adapter.mode = 'eval'
+        self.assertTrue(adapter._reduce_metric_states())
+
+        # 5 samples are padded to 6, rank 0 gets samples 0, 1, 4 and rank 1
+        # gets samples 2, 3 and padding
+        for rank, last_batch_size in [(0, 1), (1, 0)]:
+            adapter._local_rank = rank
+            counts = []
+            for samples in [2, 1]:
+                outputs, labels = adapter._cut_off_local_padding(
+                    [paddle.rand([samples, 10])], [paddle.rand([samples, 1])]
+                )
+                self.assertEqual(outputs[0].shape[0], labels[0].shape[0])
+                counts.append(outputs[0].shape[0])
+            self.assertEqual(counts, [2, last_batch_size])
+            self.assertEqual(adapter._merge_count['eval_batch'], 1)
+        fluid.disable_dygraph()
+
     def test_dynamic_load(self):
         mnist_data = MnistDataset(mode='train')
 
@@ -955,6 +1108,53 @@ class TestModelFunction(unittest.TestCase):
             np.testing.assert_almost_equal(losses[0], losses[1], decimal=4)
             np.testing.assert_almost_equal(losses[0], losses[2], decimal=4)
 
+    def test_fast_path(self):
+        dim = 20
+        data = np.random.random(size=(4, dim)).astype(np.float32)
+        label = np.random.randint(0, 10, size=(4, 1)).astype(np.int64)
+        fluid.enable_dygraph(paddle.set_device('cpu'))
+
+        class NumpyModel(MyModel):
+            def forward(self, x):
+                y = self._fc(x)
+                # cannot be converted by paddle.jit.to_static
+                if y.numpy().mean() > 1e6:
+                    y = y * 2
+                return y
+
+        for net_cls in [MyModel, NumpyModel]:
+            results = []
+            for fast_path in [False, True]:
+                self.set_seed()
+                net = net_cls()
+                optim = paddle.optimizer.Adam(
+                    learning_rate=0.001, parameters=net.parameters()
+                )
+                model = Model(net)
+                model.prepare(
+                    optim,
+                    loss=CrossEntropyLoss(reduction="sum"),
+                    fast_path=fast_path,
+                )
+                losses = []
+                for update in [False, True, True]:
+                    (loss,) = model.train_batch([data], [label], update=update)
+                    losses.append(loss)
+                results.append((losses, [p.numpy() for p in net.parameters()]))
+
+            static_train_step = model._adapter._static_train_step
+            if net_cls is MyModel:
+                self.assertIsInstance(static_train_step, paddle.nn.Layer)
+            else:
+                self.assertIs(static_train_step, False)
+            for p in net.parameters():
+                self.assertIsNone(p.grad)
+
+            for expected, actual in zip(*results):
+                for e, a in zip(expected, actual):
+                    np.testing.assert_allclose(e, a, rtol=1e-5, atol=1e-6)
+        fluid.disable_dygraph()
+
 
 class TestModelWithLRScheduler(unittest.TestCase):
     def test_fit_by_step(self):
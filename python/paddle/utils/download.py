@@ -13,17 +13,22 @@
 # limitations under the License.
 
 import hashlib
+import json
 import os
 import os.path as osp
 import shutil
 import subprocess
 import sys
 import tarfile
+import threading
 import time
 import zipfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 import requests
 
+from ._file_lock import _FileLock
+
 try:
     from tqdm import tqdm
 except:
@@ -58,8 +63,18 @@ __all__ = ['get_weights_path_from_url']
 
 WEIGHTS_HOME = osp.expanduser("~/.cache/paddle/hapi/weights")
 
+# directory of the download manifest and lock files
+DOWNLOAD_HOME = osp.expanduser("~/.cache/paddle/download")
+
 DOWNLOAD_RETRY_LIMIT = 3
 
+# files larger than 2 parts are downloaded by parallel ranged requests
+DOWNLOAD_PART_SIZE = 8 * 1024 * 1024
+DOWNLOAD_NUM_WORKERS = 4
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+DECOMPRESS_NUM_WORKERS = 4
+
 
 def is_url(path):
     """
@@ -163,41 +178,317 @@ def get_path_from_url(
     return fullpath
 
 
-def _get_download(url, fullname):
-    # using requests.get method
-    fname = osp.basename(fullname)
+def _download_lock(fullname):
+    # lock files are kept in DOWNLOAD_HOME instead of the download directory
+    key = hashlib.md5(osp.realpath(fullname).encode('utf-8')).hexdigest()
+    return _FileLock(osp.join(DOWNLOAD_HOME, 'locks', key + '.lock'))
+
+
+# NOTE: The manifest records md5 of downloaded files with their size and
+# mtime, so that md5 checking of cached files does not re-hash them, and
+# files with the same content can be reused by content instead of
+# downloading again.
+def _manifest_path():
+    return osp.join(DOWNLOAD_HOME, 'manifest.json')
+
+
+def _load_manifest():
     try:
-        req = requests.get(url, stream=True)
-    except Exception as e:  # requests.exceptions.ConnectionError
-        logger.info(
-            "Downloading {} from {} failed with exception {}".format(
-                fname, url, str(e)
-            )
-        )
+        with open(_manifest_path(), 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _stat_matches(fullname, entry):
+    try:
+        stat = os.stat(fullname)
+    except OSError:
         return False
+    return (
+        stat.st_size == entry['size'] and stat.st_mtime_ns == entry['mtime_ns']
+    )
+
+
+def _update_manifest(fullname, md5sum):
+    try:
+        with _FileLock(_manifest_path() + '.lock'):
+            manifest = {
+                path: entry
+                for path, entry in _load_manifest().items()
+                if _stat_matches(path, entry)
+            }
+            stat = os.stat(fullname)
+            manifest[osp.realpath(fullname)] = {
+                'size': stat.st_size,
+                'mtime_ns': stat.st_mtime_ns,
+                'md5': md5sum,
+            }
+            tmp_path = '{}.tmp.{}'.format(_manifest_path(), os.getpid())
+            with open(tmp_path, 'w') as f:
+                json.dump(manifest, f)
+            os.replace(tmp_path, _manifest_path())
+    except OSError as e:
+        logger.info("Update download manifest failed: {}".format(e))
+
+
+def _md5file(fullname):
+    md5 = hashlib.md5()
+    with open(fullname, 'rb') as f:
+        for chunk in iter(lambda: f.read(DOWNLOAD_CHUNK_SIZE), b""):
+            md5.update(chunk)
+    return md5.hexdigest()
+
+
+def _cached_md5(fullname):
+    """
+    Returns md5 of file, which is read from the manifest if the file is
+    not changed since recorded.
+    """
+    entry = _load_manifest().get(osp.realpath(fullname))
+    if entry is not None and _stat_matches(fullname, entry):
+        return entry['md5']
+    md5sum = _md5file(fullname)
+    _update_manifest(fullname, md5sum)
+    return md5sum
+
+
+def _find_by_content(md5sum):
+    for path, entry in _load_manifest().items():
+        if entry['md5'] == md5sum and _stat_matches(path, entry):
+            return path
+    return None
+
 
+def _link_or_copy(src, fullname):
+    tmp_fullname = fullname + "_tmp"
+    if osp.exists(tmp_fullname):
+        os.remove(tmp_fullname)
+    try:
+        os.link(src, tmp_fullname)
+    except OSError:
+        shutil.copyfile(src, tmp_fullname)
+    os.replace(tmp_fullname, fullname)
+
+
+def _probe(url):
+    """
+    Returns size of url and whether ranged requests are supported.
+    """
+    try:
+        req = requests.head(url, allow_redirects=True)
+    except requests.exceptions.RequestException:
+        return None, False
     if req.status_code != 200:
+        return None, False
+    total_size = req.headers.get('content-length')
+    total_size = int(total_size) if total_size else None
+    accept_ranges = req.headers.get('accept-ranges', '').lower() == 'bytes'
+    return total_size, accept_ranges
+
+
+class _OrderedHasher:
+    """
+    Hashes the downloaded prefix of file, whose parts are finished in any
+    order.
+    """
+
+    def __init__(self, fullname):
+        self.fullname = fullname
+        self.offset = 0
+        self.md5 = hashlib.md5()
+
+    def update(self, finished_parts):
+        # finished_parts: {start: end}, end is exclusive
+        end = self.offset
+        while end in finished_parts:
+            end = finished_parts[end]
+        if end == self.offset:
+            return
+        with open(self.fullname, 'rb') as f:
+            f.seek(self.offset)
+            while self.offset < end:
+                chunk = f.read(min(DOWNLOAD_CHUNK_SIZE, end - self.offset))
+                if not chunk:
+                    raise IOError("Unexpected end of {}".format(self.fullname))
+                self.md5.update(chunk)
+                self.offset += len(chunk)
+
+    def hexdigest(self):
+        return self.md5.hexdigest()
+
+
+def _download_part(url, tmp_fullname, start, end):
+    req = requests.get(
+        url,
+        stream=True,
+        headers={'Range': 'bytes={}-{}'.format(start, end - 1)},
+    )
+    if req.status_code != 206:
+        raise IOError(
+            "Ranged request of {} failed with code {}".format(
+                url, req.status_code
+            )
+        )
+    offset = start
+    with open(tmp_fullname, 'r+b') as f:
+        f.seek(start)
+        for chunk in req.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+            f.write(chunk[: end - offset])
+            offset += len(chunk)
+            if offset >= end:
+                break
+    if offset < end:
+        raise IOError("Ranged request of {} is incomplete".format(url))
+
+
+def _ranged_download(url, tmp_fullname, total_size):
+    parts_file = tmp_fullname + ".parts"
+    parts = {
+        start: min(start + DOWNLOAD_PART_SIZE, total_size)
+        for start in range(0, total_size, DOWNLOAD_PART_SIZE)
+    }
+
+    # resume from the finished parts of last download
+    finished_parts = {}
+    if (
+        osp.exists(parts_file)
+        and osp.exists(tmp_fullname)
+        and osp.getsize(tmp_fullname) == total_size
+    ):
+        try:
+            with open(parts_file, 'r') as f:
+                state = json.load(f)
+            if state['part_size'] == DOWNLOAD_PART_SIZE:
+                finished_parts = {
+                    start: parts[start] for start in state['finished']
+                }
+        except (OSError, ValueError, KeyError):
+            finished_parts = {}
+    if len(finished_parts) == 0:
+        with open(tmp_fullname, 'wb') as f:
+            f.truncate(total_size)
+
+    def _save_state():
+        tmp_parts_file = parts_file + "_tmp"
+        with open(tmp_parts_file, 'w') as f:
+            json.dump(
+                {
+                    'part_size': DOWNLOAD_PART_SIZE,
+                    'finished': sorted(finished_parts),
+                },
+                f,
+            )
+        os.replace(tmp_parts_file, parts_file)
+
+    hasher = _OrderedHasher(tmp_fullname)
+    hasher.update(finished_parts)
+    todo = [start for start in sorted(parts) if start not in finished_parts]
+    pool = ThreadPoolExecutor(max_workers=DOWNLOAD_NUM_WORKERS)
+    futures = {
+        pool.submit(_download_part, url, tmp_fullname, start, parts[start]): (
+            start
+        )
+        for start in todo
+    }
+    try:
+        with tqdm(total=(total_size + 1023) // 1024) as pbar:
+            pbar.update(sum(e - s for s, e in finished_parts.items()) // 1024)
+            for future in as_completed(futures):
+                future.result()
+                start = futures[future]
+                finished_parts[start] = parts[start]
+                _save_state()
+                hasher.update(finished_parts)
+                pbar.update((parts[start] - start) // 1024)
+    finally:
+        for future in futures:
+            future.cancel()
+        pool.shutdown(wait=True)
+
+    os.remove(parts_file)
+    return hasher.hexdigest()
+
+
+def _stream_download(url, tmp_fullname, total_size, accept_ranges):
+    # resume from the downloaded prefix of last download
+    offset = 0
+    if (
+        accept_ranges
+        and osp.exists(tmp_fullname)
+        and not osp.exists(tmp_fullname + ".parts")
+    ):
+        offset = osp.getsize(tmp_fullname)
+        if total_size is not None and offset > total_size:
+            offset = 0
+
+    md5 = hashlib.md5()
+    if offset > 0:
+        with open(tmp_fullname, 'rb') as f:
+            for chunk in iter(lambda: f.read(DOWNLOAD_CHUNK_SIZE), b""):
+                md5.update(chunk)
+        if offset == total_size:
+            return md5.hexdigest()
+
+    headers = {'Range': 'bytes={}-'.format(offset)} if offset > 0 else {}
+    req = requests.get(url, stream=True, headers=headers)
+    if offset > 0 and req.status_code != 206:
+        # the range is ignored, download from the beginning
+        offset = 0
+        md5 = hashlib.md5()
+    if req.status_code not in (200, 206):
         raise RuntimeError(
             "Downloading from {} failed with code "
             "{}!".format(url, req.status_code)
         )
 
+    if total_size is None:
+        total_size = req.headers.get('content-length')
+        total_size = int(total_size) + offset if total_size else None
+    with open(tmp_fullname, 'ab' if offset > 0 else 'wb') as f:
+        with tqdm(
+            total=(total_size + 1023) // 1024 if total_size else None
+        ) as pbar:
+            pbar.update(offset // 1024)
+            for chunk in req.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                if chunk:
+                    f.write(chunk)
+                    md5.update(chunk)
+                    pbar.update(len(chunk) // 1024)
+    return md5.hexdigest()
+
+
+def _get_download(url, fullname):
+    # using requests.get method, files supporting ranged requests are
+    # downloaded by parallel parts, and interrupted downloads are resumed
+    fname = osp.basename(fullname)
     # For protecting download interupted, download to
     # tmp_fullname firstly, move tmp_fullname to fullname
     # after download finished
     tmp_fullname = fullname + "_tmp"
-    total_size = req.headers.get('content-length')
-    with open(tmp_fullname, 'wb') as f:
-        if total_size:
-            with tqdm(total=(int(total_size) + 1023) // 1024) as pbar:
-                for chunk in req.iter_content(chunk_size=1024):
-                    f.write(chunk)
-                    pbar.update(1)
+    total_size, accept_ranges = _probe(url)
+    try:
+        if (
+            accept_ranges
+            and total_size is not None
+            and total_size > 2 * DOWNLOAD_PART_SIZE
+        ):
+            md5sum = _ranged_download(url, tmp_fullname, total_size)
         else:
-            for chunk in req.iter_content(chunk_size=1024):
-                if chunk:
-                    f.write(chunk)
-    shutil.move(tmp_fullname, fullname)
+            md5sum = _stream_download(
+                url, tmp_fullname, total_size, accept_ranges
+            )
+    except IOError as e:  # requests.exceptions.ConnectionError
+        logger.info(
+            "Downloading {} from {} failed with exception {}".format(
+                fname, url, str(e)
+            )
+        )
+        return False
+
+    os.replace(tmp_fullname, fullname)
+    # md5 is calculated while downloading, record it to skip re-hashing
+    _update_manifest(fullname, md5sum)
 
     return fullname
 
@@ -251,20 +542,43 @@ def _download(url, path, md5sum=None, method='get'):
 
     fname = osp.split(url)[-1]
     fullname = osp.join(path, fname)
+    return _download_file(url, fullname, md5sum, method)
+
+
+def _download_file(url, fullname, md5sum=None, method='get'):
+    """
+    Download from url, save to fullname. Processes downloading the same
+    file are serialized by a file lock, and files with the same md5 sum
+    in the download manifest are reused instead of downloading.
+    """
+    fname = osp.basename(fullname)
+    dirname = osp.dirname(fullname)
+    if dirname and not osp.exists(dirname):
+        os.makedirs(dirname, exist_ok=True)
+
     retry_cnt = 0
+    with _download_lock(fullname):
+        if not osp.exists(fullname) and md5sum is not None:
+            src = _find_by_content(md5sum)
+            if src is not None:
+                logger.info("Found {} with the same content".format(src))
+                _link_or_copy(src, fullname)
+                _update_manifest(fullname, md5sum)
+
+        while not (osp.exists(fullname) and _md5check(fullname, md5sum)):
+            if retry_cnt < DOWNLOAD_RETRY_LIMIT:
+                retry_cnt += 1
+            else:
+                raise RuntimeError(
+                    "Download from {} failed. "
+                    "Retry limit reached".format(url)
+                )
 
-    logger.info("Downloading {} from {}".format(fname, url))
-    while not (osp.exists(fullname) and _md5check(fullname, md5sum)):
-        if retry_cnt < DOWNLOAD_RETRY_LIMIT:
-            retry_cnt += 1
-        else:
-            raise RuntimeError(
-                "Download from {} failed. " "Retry limit reached".format(url)
-            )
+            logger.info("Downloading {} from {}".format(fname, url))
 
-        if not _download_methods[method](url, fullname):
-            time.sleep(1)
-            continue
+            if not _download_methods[method](url, fullname):
+                time.sleep(1)
+                continue
 
     return fullname
 
@@ -274,11 +588,7 @@ def _md5check(fullname, md5sum=None):
         return True
 
     logger.info("File {} md5 checking...".format(fullname))
-    md5 = hashlib.md5()
-    with open(fullname, 'rb') as f:
-        for chunk in iter(lambda: f.read(4096), b""):
-            md5.update(chunk)
-    calc_md5sum = md5.hexdigest()
+    calc_md5sum = _cached_md5(fullname)
 
     if calc_md5sum != md5sum:
         logger.info(
@@ -293,12 +603,18 @@ def _decompress(fname):
     """
     Decompress for zip and tar file
     """
+    # a completion marker is written after decompressing, the archive is
+    # not decompressed again if it is not changed
+    uncompressed_path = _read_decompress_marker(fname)
+    if uncompressed_path is not None:
+        logger.info("Found decompressed {}".format(uncompressed_path))
+        return uncompressed_path
+
     logger.info("Decompressing {}...".format(fname))
 
-    # For protecting decompressing interupted,
-    # decompress to fpath_tmp directory firstly, if decompress
-    # successed, move decompress files to fpath and delete
-    # fpath_tmp and remove download compress file.
+    # For protecting decompressing interupted, finished members are
+    # recorded in a progress file, and are skipped when decompressing
+    # again, the progress file is removed after decompress successed.
 
     if tarfile.is_tarfile(fname):
         uncompressed_path = _uncompress_file_tar(fname)
@@ -307,63 +623,199 @@ def _decompress(fname):
     else:
         raise TypeError("Unsupport compress file type {}".format(fname))
 
+    _write_decompress_marker(fname, uncompressed_path)
     return uncompressed_path
 
 
-def _uncompress_file_zip(filepath):
-    with zipfile.ZipFile(filepath, 'r') as files:
-        file_list = files.namelist()
+def _read_decompress_marker(fname):
+    try:
+        with open(fname + ".decompressed", 'r') as f:
+            marker = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not _stat_matches(fname, marker):
+        return None
+    uncompressed_path = osp.join(osp.dirname(fname), marker['path'])
+    if not osp.exists(uncompressed_path):
+        return None
+    return uncompressed_path
 
-        file_dir = os.path.dirname(filepath)
 
-        if _is_a_single_file(file_list):
-            rootpath = file_list[0]
-            uncompressed_path = os.path.join(file_dir, rootpath)
-            files.extractall(file_dir)
+def _write_decompress_marker(fname, uncompressed_path):
+    stat = os.stat(fname)
+    marker = {
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'path': osp.relpath(uncompressed_path, osp.dirname(fname)),
+    }
+    tmp_marker = fname + ".decompressed_tmp"
+    with open(tmp_marker, 'w') as f:
+        json.dump(marker, f)
+    os.replace(tmp_marker, fname + ".decompressed")
 
-        elif _is_a_single_dir(file_list):
-            # `strip(os.sep)` to remove `os.sep` in the tail of path
-            rootpath = os.path.splitext(file_list[0].strip(os.sep))[0].split(
-                os.sep
-            )[-1]
-            uncompressed_path = os.path.join(file_dir, rootpath)
 
-            files.extractall(file_dir)
-        else:
-            rootpath = os.path.splitext(filepath)[0].split(os.sep)[-1]
-            uncompressed_path = os.path.join(file_dir, rootpath)
-            if not os.path.exists(uncompressed_path):
-                os.makedirs(uncompressed_path)
-            files.extractall(os.path.join(file_dir, rootpath))
+class _DecompressProgress:
+    """
+    Records names of decompressed members of archive, which are read back
+    to resume an interrupted decompressing.
+    """
 
-        return uncompressed_path
+    def __init__(self, fname):
+        self.path = fname + ".decompressing"
+        self.finished = set()
+        if osp.exists(self.path):
+            stat = os.stat(fname)
+            with open(self.path, 'r') as f:
+                lines = f.read().splitlines()
+            # the first line is the signature of the archive
+            if lines and lines[0] == '{} {}'.format(
+                stat.st_size, stat.st_mtime_ns
+            ):
+                self.finished = set(lines[1:])
+        if len(self.finished) == 0:
+            stat = os.stat(fname)
+            with open(self.path, 'w') as f:
+                f.write('{} {}\n'.format(stat.st_size, stat.st_mtime_ns))
+        self._file = open(self.path, 'a')
+        self._lock = threading.Lock()
+
+    def add(self, name):
+        with self._lock:
+            self._file.write(name + '\n')
+            self._file.flush()
+
+    def done(self):
+        self._file.close()
+        os.remove(self.path)
+
+
+def _extract_zip_members(filepath, members, target_dir, progress):
+    with zipfile.ZipFile(filepath, 'r') as files:
+        for member in members:
+            files.extract(member, target_dir)
+            progress.add(member)
 
 
-def _uncompress_file_tar(filepath, mode="r:*"):
-    with tarfile.open(filepath, mode) as files:
-        file_list = files.getnames()
+def _uncompress_file_zip(filepath):
+    with zipfile.ZipFile(filepath, 'r') as files:
+        file_list = files.namelist()
+        file_sizes = {
+            info.filename: info.file_size for info in files.infolist()
+        }
+
+    file_dir = os.path.dirname(filepath)
+
+    if _is_a_single_file(file_list):
+        rootpath = file_list[0]
+        uncompressed_path = os.path.join(file_dir, rootpath)
+        target_dir = file_dir
+
+    elif _is_a_single_dir(file_list):
+        # `strip(os.sep)` to remove `os.sep` in the tail of path
+        rootpath = os.path.splitext(file_list[0].strip(os.sep))[0].split(
+            os.sep
+        )[-1]
+        uncompressed_path = os.path.join(file_dir, rootpath)
+        target_dir = file_dir
+    else:
+        rootpath = os.path.splitext(filepath)[0].split(os.sep)[-1]
+        uncompressed_path = os.path.join(file_dir, rootpath)
+        if not os.path.exists(uncompressed_path):
+            os.makedirs(uncompressed_path)
+        target_dir = os.path.join(file_dir, rootpath)
+
+    # members are extracted by workers with their own file handles, larger
+    # members are distributed first to balance workers
+    progress = _DecompressProgress(filepath)
+    members = sorted(
+        (name for name in file_list if name not in progress.finished),
+        key=lambda name: file_sizes[name],
+        reverse=True,
+    )
+    # create directories first, since workers creating the same parent
+    # directory concurrently may fail
+    for name in members:
+        dirname = os.path.normpath(
+            name if name.endswith('/') else os.path.dirname(name)
+        )
+        if dirname == '.' or dirname.startswith('..') or os.path.isabs(dirname):
+            continue
+        os.makedirs(os.path.join(target_dir, dirname), exist_ok=True)
+    num_workers = max(1, min(DECOMPRESS_NUM_WORKERS, len(members)))
+    groups = [members[i::num_workers] for i in range(num_workers)]
+    with ThreadPoolExecutor(max_workers=num_workers) as pool:
+        futures = [
+            pool.submit(
+                _extract_zip_members, filepath, group, target_dir, progress
+            )
+            for group in groups
+        ]
+        for future in futures:
+            future.result()
+    progress.done()
+
+    return uncompressed_path
+
 
-        file_dir = os.path.dirname(filepath)
+def _move_merged(src, dst):
+    # move src to dst, directories are merged like extracting to dst
+    if osp.isdir(src) and osp.isdir(dst):
+        for name in os.listdir(src):
+            _move_merged(osp.join(src, name), osp.join(dst, name))
+        os.rmdir(src)
+    else:
+        if osp.isdir(dst) and not osp.islink(dst):
+            shutil.rmtree(dst)
+        elif osp.lexists(dst):
+            os.remove(dst)
+        os.replace(src, dst)
+
+
+def _uncompress_file_tar(filepath, mode="r|*"):
+    # tar members are extracted in one pass of stream to a staging
+    # directory, then moved to the root path decided by member names
+    file_dir = os.path.dirname(filepath)
+    staging_dir = os.path.join(
+        file_dir, "." + os.path.basename(filepath) + ".staging"
+    )
+    progress = _DecompressProgress(filepath)
+    if len(progress.finished) == 0 and os.path.exists(staging_dir):
+        shutil.rmtree(staging_dir)
 
+    file_list = []
+    with tarfile.open(filepath, mode) as files:
+        for member in files:
+            file_list.append(member.name)
+            if member.name in progress.finished:
+                continue
+            files.extract(member, staging_dir)
+            progress.add(member.name)
+
+    if _is_a_single_file(file_list) or _is_a_single_dir(file_list):
         if _is_a_single_file(file_list):
             rootpath = file_list[0]
-            uncompressed_path = os.path.join(file_dir, rootpath)
-            files.extractall(file_dir)
-        elif _is_a_single_dir(file_list):
+        else:
             rootpath = os.path.splitext(file_list[0].strip(os.sep))[0].split(
                 os.sep
             )[-1]
-            uncompressed_path = os.path.join(file_dir, rootpath)
-            files.extractall(file_dir)
-        else:
-            rootpath = os.path.splitext(filepath)[0].split(os.sep)[-1]
-            uncompressed_path = os.path.join(file_dir, rootpath)
-            if not os.path.exists(uncompressed_path):
-                os.makedirs(uncompressed_path)
-
-            files.extractall(os.path.join(file_dir, rootpath))
+        uncompressed_path = os.path.join(file_dir, rootpath)
+        target_dir = file_dir
+    else:
+        rootpath = os.path.splitext(filepath)[0].split(os.sep)[-1]
+        uncompressed_path = os.path.join(file_dir, rootpath)
+        if not os.path.exists(uncompressed_path):
+            os.makedirs(uncompressed_path)
+        target_dir = uncompressed_path
+
+    if os.path.exists(staging_dir):
+        for name in os.listdir(staging_dir):
+            _move_merged(
+                os.path.join(staging_dir, name), os.path.join(target_dir, name)
+            )
+        os.rmdir(staging_dir)
+    progress.done()
 
-        return uncompressed_path
+    return uncompressed_path
 
 
 def _is_a_single_file(file_list):
@@ -0,0 +1,185 @@
+#   Copyright (c) 2022 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import hashlib
+import json
+import os
+import shutil
+import warnings
+
+import numpy as np
+
+from paddle.dataset.common import DATA_HOME
+
+__all__ = []
+
+# NOTE: [ memory-mapped dataset cache ] Datasets parsed from archives or
+# directories are saved as numpy arrays in CACHE_HOME once, and loaded
+# by memory mapping in following constructions. Memory-mapped arrays are
+# backed by page cache, which is shared by all DataLoader worker
+# processes without copy-on-write, instead of millions of Python objects
+# whose reference counts will be updated in each forked worker. Caches
+# are keyed by signatures of source files, i.e. path, size and mtime,
+# so modified sources will be parsed again.
+CACHE_HOME = os.path.join(DATA_HOME, 'mmap_cache')
+
+_DONE_FILE = 'DONE'
+
+
+def _file_signature(path):
+    path = os.path.abspath(os.path.expanduser(path))
+    stat = os.stat(path)
+    return [path, stat.st_size, stat.st_mtime_ns]
+
+
+def _cache_dir(name, signature):
+    key = hashlib.md5(
+        json.dumps(signature, sort_keys=True).encode('utf-8')
+    ).hexdigest()
+    return os.path.join(CACHE_HOME, name, key)
+
+
+def _load_arrays(cache_dir):
+    arrays = {}
+    for fname in os.listdir(cache_dir):
+        if fname.endswith('.npy'):
+            arrays[fname[:-4]] = np.load(
+                os.path.join(cache_dir, fname), mmap_mode='r'
+            )
+    return arrays
+
+
+def _save_arrays(cache_dir, arrays):
+    tmp_dir = '{}.tmp.{}'.format(cache_dir, os.getpid())
+    if os.path.exists(tmp_dir):
+        shutil.rmtree(tmp_dir)
+    os.makedirs(tmp_dir)
+    for name, array in arrays.items():
+        np.save(os.path.join(tmp_dir, name + '.npy'), array)
+    open(os.path.join(tmp_dir, _DONE_FILE), 'w').close()
+
+    if os.path.exists(cache_dir):
+        # outdated cache, move away before replacing it
+        trash_dir = '{}.trash.{}'.format(cache_dir, os.getpid())
+        try:
+            os.rename(cache_dir, trash_dir)
+            shutil.rmtree(trash_dir, ignore_errors=True)
+        except OSError:
+            pass
+    try:
+        os.rename(tmp_dir, cache_dir)
+    except OSError:
+        # cache saved by another process at the same time
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def _load_or_build_arrays(name, signature, build_fn, validate_fn=None):
+    """
+    Load memory-mapped arrays from cache, or build and save them.
+
+    Args:
+        name(str): dataset name, used as sub directory of cache.
+        signature(list): json serializable signature of source data.
+        build_fn(callable): function to build arrays from source data,
+            returns a dict of array name and numpy array.
+        validate_fn(callable, optional): function to check whether the
+            loaded arrays are up to date, for sources which cannot be
+            identified by signature only, e.g. directories.
+
+    Returns:
+        dict: array name and read-only memory-mapped numpy array.
+    """
+    cache_dir = _cache_dir(name, signature)
+    if os.path.exists(os.path.join(cache_dir, _DONE_FILE)):
+        try:
+            arrays = _load_arrays(cache_dir)
+            if validate_fn is None or validate_fn(arrays):
+                return arrays
+        except (OSError, ValueError):
+            pass
+
+    arrays = build_fn()
+    try:
+        _save_arrays(cache_dir, arrays)
+        return _load_arrays(cache_dir)
+    except OSError as e:
+        warnings.warn(
+            "Failed to save dataset cache in {}: {}, dataset will be "
+            "loaded into memory".format(cache_dir, e)
+        )
+        return arrays
+
+
+def _pack_bytes(items):
+    """
+    Pack a list of bytes into a uint8 buffer and offsets.
+    """
+    offsets = np.zeros([len(items) + 1], dtype='int64')
+    offsets[1:] = np.cumsum([len(item) for item in items])
+    buffer = np.frombuffer(b''.join(items), dtype='uint8')
+    return buffer, offsets
+
+
+class _BytesArray:
+    """
+    Read-only sequence of bytes packed by :code:`_pack_bytes` .
+    """
+
+    def __init__(self, buffer, offsets):
+        self._buffer = buffer
+        self._offsets = offsets
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, idx):
+        if idx < 0:
+            idx += len(self)
+        if idx < 0 or idx >= len(self):
+            raise IndexError("index {} out of range".format(idx))
+        return self._buffer[
+            self._offsets[idx] : self._offsets[idx + 1]
+        ].tobytes()
+
+
+class _StringArray(_BytesArray):
+    def __getitem__(self, idx):
+        return super().__getitem__(idx).decode('utf-8', 'surrogateescape')
+
+
+class _ListAttribute:
+    """
+    Public list attribute of datasets whose samples are kept in
+    memory-mapped arrays. The list is built by :code:`build_fn(dataset)`
+    only on first access, so the attribute keeps the type it had before
+    the cache was introduced, while datasets could read memory-mapped
+    arrays directly in :code:`__getitem__` until the list is built or
+    assigned, which is stored as attribute :attr:`cache_name` of dataset.
+    """
+
+    def __init__(self, cache_name, build_fn):
+        self.cache_name = cache_name
+        self._build_fn = build_fn
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        value = obj.__dict__.get(self.cache_name, None)
+        if value is None:
+            value = self._build_fn(obj)
+            obj.__dict__[self.cache_name] = value
+        return value
+
+    def __set__(self, obj, value):
+        obj.__dict__[self.cache_name] = value
@@ -22,6 +22,8 @@ import paddle
 from paddle.dataset.common import _check_exists_and_download
 from paddle.io import Dataset
 
+from .cache import _file_signature, _ListAttribute, _load_or_build_arrays
+
 __all__ = []
 
 URL_PREFIX = 'https://dataset.bj.bcebos.com/cifar/'
@@ -140,7 +142,7 @@ class Cifar10(Dataset):
 
         self.transform = transform
 
-        # read dataset into memory
+        # load dataset as memory-mapped arrays
         self._load_data()
 
         self.dtype = paddle.get_default_dtype()
@@ -151,7 +153,23 @@ class Cifar10(Dataset):
         self.flag = MODE_FLAG_MAP[self.mode + '10']
 
     def _load_data(self):
-        self.data = []
+        arrays = _load_or_build_arrays(
+            'cifar',
+            [_file_signature(self.data_file), self.flag],
+            self._parse_data,
+        )
+        self._images = arrays['images']
+        self._labels = arrays['labels']
+
+    def _build_data_list(self):
+        return list(zip(np.array(self._images), self._labels.tolist()))
+
+    # list of (image, label) tuples, built only if accessed
+    data = _ListAttribute('_data_list', _build_data_list)
+
+    def _parse_data(self):
+        images = []
+        labels = []
         with tarfile.open(self.data_file, mode='r') as f:
             names = (
                 each_item.name for each_item in f if self.flag in each_item.name
@@ -163,13 +181,23 @@ class Cifar10(Dataset):
                 batch = pickle.load(f.extractfile(name), encoding='bytes')
 
                 data = batch[b'data']
-                labels = batch.get(b'labels', batch.get(b'fine_labels', None))
-                assert labels is not None
-                for sample, label in zip(data, labels):
-                    self.data.append((sample, label))
+                batch_labels = batch.get(
+                    b'labels', batch.get(b'fine_labels', None)
+                )
+                assert batch_labels is not None
+                images.append(np.asarray(data, dtype='uint8'))
+                labels.append(np.asarray(batch_labels, dtype='int64'))
+        return {
+            'images': np.concatenate(images),
+            'labels': np.concatenate(labels),
+        }
 
     def __getitem__(self, idx):
-        image, label = self.data[idx]
+        data = getattr(self, '_data_list', None)
+        if data is not None:
+            image, label = data[idx]
+        else:
+            image, label = self._images[idx], self._labels[idx]
         image = np.reshape(image, [3, 32, 32])
         image = image.transpose([1, 2, 0])
 
@@ -184,7 +212,10 @@ class Cifar10(Dataset):
         return image.astype(self.dtype), np.array(label).astype('int64')
 
     def __len__(self):
-        return len(self.data)
+        data = getattr(self, '_data_list', None)
+        if data is not None:
+            return len(data)
+        return len(self._labels)
 
 
 class Cifar100(Cifar10):
@@ -12,7 +12,9 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import io
 import os
+import posixpath
 import tarfile
 
 import numpy as np
@@ -23,6 +25,13 @@ from paddle.dataset.common import _check_exists_and_download
 from paddle.io import Dataset
 from paddle.utils import try_import
 
+from .cache import (
+    _BytesArray,
+    _file_signature,
+    _load_or_build_arrays,
+    _pack_bytes,
+)
+
 __all__ = []
 
 DATA_URL = 'http://paddlemodels.bj.bcebos.com/flowers/102flowers.tgz'
@@ -161,25 +170,74 @@ class Flowers(Dataset):
 
         self.transform = transform
 
-        data_tar = tarfile.open(data_file)
-        self.data_path = data_file.replace(".tgz", "/")
-        if not os.path.exists(self.data_path):
-            os.mkdir(self.data_path)
-        data_tar.extractall(self.data_path)
-
+        self.data_file = data_file
+        self.label_file = label_file
+        self.setid_file = setid_file
+        self.flag = flag
+
+        # images are kept as encoded bytes in memory-mapped arrays and
+        # decoded lazily, instead of extracting the archive every time
+        arrays = _load_or_build_arrays(
+            'flowers',
+            [
+                _file_signature(data_file),
+                _file_signature(label_file),
+                _file_signature(setid_file),
+                flag,
+            ],
+            self._parse_data,
+        )
+        self._images = _BytesArray(
+            arrays['image_buffer'], arrays['image_offsets']
+        )
+        self.labels = arrays['labels']
+        self.indexes = arrays['indexes']
+        self._data_path = None
+
+    @property
+    def data_path(self):
+        # the archive is only extracted if the image files are required
+        if self._data_path is None:
+            data_path = self.data_file.replace(".tgz", "/")
+            if not os.path.exists(data_path):
+                os.mkdir(data_path)
+            with tarfile.open(self.data_file) as data_tar:
+                data_tar.extractall(data_path)
+            self._data_path = data_path
+        return self._data_path
+
+    def _parse_data(self):
         scio = try_import('scipy.io')
-        self.labels = scio.loadmat(label_file)['labels'][0]
-        self.indexes = scio.loadmat(setid_file)[flag][0]
+        labels = scio.loadmat(self.label_file)['labels'][0]
+        indexes = scio.loadmat(self.setid_file)[self.flag][0]
+
+        names = {
+            "jpg/image_%05d.jpg" % index: i for i, index in enumerate(indexes)
+        }
+        images = [None] * len(indexes)
+        with tarfile.open(self.data_file) as data_tar:
+            for member in data_tar:
+                i = names.get(posixpath.normpath(member.name), None)
+                if i is not None:
+                    images[i] = data_tar.extractfile(member).read()
+        assert all(
+            image is not None for image in images
+        ), "some images of flowers are not found in {}".format(self.data_file)
+
+        image_buffer, image_offsets = _pack_bytes(images)
+        return {
+            'image_buffer': image_buffer,
+            'image_offsets': image_offsets,
+            'labels': np.asarray(labels),
+            'indexes': np.asarray(indexes),
+        }
 
     def __getitem__(self, idx):
         index = self.indexes[idx]
         label = np.array([self.labels[index - 1]])
-        img_name = "jpg/image_%05d.jpg" % index
-        image = os.path.join(self.data_path, img_name)
-        if self.backend == 'pil':
-            image = Image.open(image)
-        elif self.backend == 'cv2':
-            image = np.array(Image.open(image))
+        image = Image.open(io.BytesIO(self._images[idx]))
+        if self.backend == 'cv2':
+            image = np.array(image)
 
         if self.transform is not None:
             image = self.transform(image)
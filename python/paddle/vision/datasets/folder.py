@@ -14,12 +14,20 @@
 
 import os
 
+import numpy as np
 from PIL import Image
 
 import paddle
 from paddle.io import Dataset
 from paddle.utils import try_import
 
+from .cache import (
+    _ListAttribute,
+    _load_or_build_arrays,
+    _pack_bytes,
+    _StringArray,
+)
+
 __all__ = []
 
 
@@ -63,6 +71,120 @@ def make_dataset(dir, class_to_idx, extensions, is_valid_file=None):
     return images
 
 
+def _make_dataset_index(dir, class_to_idx, extensions):
+    """
+    Cached version of :code:`make_dataset` , file index of the directory is
+    saved as memory-mapped arrays, and reused if no sub directories have
+    been modified since last scanning.
+
+    Args:
+        dir (str): root directory path.
+        class_to_idx (dict|None): class names and indices, files in class
+            sub directories are indexed with class index as target. If
+            None, all files in :attr:`dir` are indexed without target.
+        extensions (list[str]|tuple[str]): extensions to consider.
+
+    Returns:
+        _FolderSamples: indexed samples.
+    """
+    dir = os.path.expanduser(dir)
+
+    def _build():
+        if class_to_idx is None:
+            sub_dirs = [('', -1)]
+        else:
+            sub_dirs = [
+                (target, class_to_idx[target])
+                for target in sorted(class_to_idx.keys())
+            ]
+
+        paths, targets, dirs = [], [], ['']
+        for target, target_idx in sub_dirs:
+            d = os.path.join(dir, target)
+            if not os.path.isdir(d):
+                continue
+            for root, _, fnames in sorted(os.walk(d, followlinks=True)):
+                dirs.append(os.path.relpath(root, dir))
+                for fname in sorted(fnames):
+                    path = os.path.join(root, fname)
+                    if has_valid_extension(path, extensions):
+                        paths.append(_encode_path(os.path.relpath(path, dir)))
+                        targets.append(target_idx)
+
+        path_buffer, path_offsets = _pack_bytes(paths)
+        dir_buffer, dir_offsets = _pack_bytes([_encode_path(d) for d in dirs])
+        return {
+            'path_buffer': path_buffer,
+            'path_offsets': path_offsets,
+            'targets': np.asarray(targets, dtype='int64'),
+            'dir_buffer': dir_buffer,
+            'dir_offsets': dir_offsets,
+            'dir_mtimes': np.asarray(
+                [_mtime(os.path.join(dir, d)) for d in dirs], dtype='int64'
+            ),
+        }
+
+    def _validate(arrays):
+        # adding or removing files changes mtime of its parent directory
+        dirs = _StringArray(arrays['dir_buffer'], arrays['dir_offsets'])
+        for i, mtime in enumerate(arrays['dir_mtimes']):
+            if _mtime(os.path.join(dir, dirs[i])) != mtime:
+                return False
+        return True
+
+    arrays = _load_or_build_arrays(
+        'folder',
+        [
+            os.path.abspath(dir),
+            sorted(x.lower() for x in extensions),
+            class_to_idx,
+        ],
+        _build,
+        _validate,
+    )
+    paths = _StringArray(arrays['path_buffer'], arrays['path_offsets'])
+    targets = arrays['targets'] if class_to_idx is not None else None
+    return _FolderSamples(dir, paths, targets)
+
+
+def _encode_path(path):
+    return path.encode('utf-8', 'surrogateescape')
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return -1
+
+
+class _FolderSamples:
+    """
+    Read-only sequence of samples of folder datasets, each sample is path
+    of file, or a tuple of path and target if :attr:`targets` is not None.
+    """
+
+    def __init__(self, root, paths, targets=None):
+        self.root = root
+        self.paths = paths
+        self.targets = targets
+
+    def __len__(self):
+        return len(self.paths)
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(len(self)))]
+        path = os.path.join(self.root, self.paths[idx])
+        if self.targets is None:
+            return path
+        return path, int(self.targets[idx])
+
+    def __iter__(self):
+        for idx in range(len(self)):
+            yield self[idx]
+
+
 class DatasetFolder(Dataset):
     """A generic data loader where the samples are arranged in this way:
 
@@ -213,9 +335,8 @@ class DatasetFolder(Dataset):
         if extensions is None:
             extensions = IMG_EXTENSIONS
         classes, class_to_idx = self._find_classes(self.root)
-        samples = make_dataset(
-            self.root, class_to_idx, extensions, is_valid_file
-        )
+        # NOTE: is_valid_file is ignored by make_dataset if extensions set
+        samples = _make_dataset_index(self.root, class_to_idx, extensions)
         if len(samples) == 0:
             raise (
                 RuntimeError(
@@ -229,11 +350,21 @@ class DatasetFolder(Dataset):
 
         self.classes = classes
         self.class_to_idx = class_to_idx
-        self.samples = samples
-        self.targets = [s[1] for s in samples]
+        self._index = samples
 
         self.dtype = paddle.get_default_dtype()
 
+    def _build_samples_list(self):
+        return list(self._index)
+
+    def _build_targets_list(self):
+        return self._index.targets.tolist()
+
+    # list of (sample_path, class_index) tuples and list of class_index,
+    # built only if accessed
+    samples = _ListAttribute('_samples_list', _build_samples_list)
+    targets = _ListAttribute('_targets_list', _build_targets_list)
+
     def _find_classes(self, dir):
         """
         Finds the class folders in a dataset.
@@ -259,7 +390,10 @@ class DatasetFolder(Dataset):
         Returns:
             tuple: (sample, target) where target is class_index of the target class.
         """
-        path, target = self.samples[index]
+        samples = getattr(self, '_samples_list', None)
+        if samples is None:
+            samples = self._index
+        path, target = samples[index]
         sample = self.loader(path)
         if self.transform is not None:
             sample = self.transform(sample)
@@ -267,7 +401,10 @@ class DatasetFolder(Dataset):
         return sample, target
 
     def __len__(self):
-        return len(self.samples)
+        samples = getattr(self, '_samples_list', None)
+        if samples is None:
+            samples = self._index
+        return len(samples)
 
 
 IMG_EXTENSIONS = (
@@ -435,19 +572,7 @@ class ImageFolder(Dataset):
         if extensions is None:
             extensions = IMG_EXTENSIONS
 
-        samples = []
-        path = os.path.expanduser(root)
-
-        if extensions is not None:
-
-            def is_valid_file(x):
-                return has_valid_extension(x, extensions)
-
-        for root, _, fnames in sorted(os.walk(path, followlinks=True)):
-            for fname in sorted(fnames):
-                f = os.path.join(root, fname)
-                if is_valid_file(f):
-                    samples.append(f)
+        samples = _make_dataset_index(root, None, extensions)
 
         if len(samples) == 0:
             raise (
@@ -459,9 +584,15 @@ class ImageFolder(Dataset):
 
         self.loader = default_loader if loader is None else loader
         self.extensions = extensions
-        self.samples = samples
+        self._index = samples
         self.transform = transform
 
+    def _build_samples_list(self):
+        return list(self._index)
+
+    # list of sample paths, built only if accessed
+    samples = _ListAttribute('_samples_list', _build_samples_list)
+
     def __getitem__(self, index):
         """
         Args:
@@ -470,11 +601,17 @@ class ImageFolder(Dataset):
         Returns:
             sample of specific index.
         """
-        path = self.samples[index]
+        samples = getattr(self, '_samples_list', None)
+        if samples is None:
+            samples = self._index
+        path = samples[index]
         sample = self.loader(path)
         if self.transform is not None:
             sample = self.transform(sample)
         return [sample]
 
     def __len__(self):
-        return len(self.samples)
+        samples = getattr(self, '_samples_list', None)
+        if samples is None:
+            samples = self._index
+        return len(samples)
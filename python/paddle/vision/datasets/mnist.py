@@ -22,6 +22,8 @@ import paddle
 from paddle.dataset.common import _check_exists_and_download
 from paddle.io import Dataset
 
+from .cache import _file_signature, _ListAttribute, _load_or_build_arrays
+
 __all__ = []
 
 
@@ -162,64 +164,71 @@ class MNIST(Dataset):
 
         self.transform = transform
 
-        # read dataset into memory
+        # load dataset as memory-mapped arrays
         self._parse_dataset()
 
         self.dtype = paddle.get_default_dtype()
 
-    def _parse_dataset(self, buffer_size=100):
-        self.images = []
-        self.labels = []
+    def _parse_dataset(self):
+        arrays = _load_or_build_arrays(
+            self.NAME,
+            [
+                _file_signature(self.image_path),
+                _file_signature(self.label_path),
+            ],
+            self._parse_files,
+        )
+        self._images = arrays['images']
+        self._labels = arrays['labels']
+
+    def _build_images_list(self):
+        return list(np.asarray(self._images, dtype='float32'))
+
+    def _build_labels_list(self):
+        return list(np.array(self._labels))
+
+    # list of flattened float32 images and list of int64 labels with
+    # shape [1], built only if accessed
+    images = _ListAttribute('_images_list', _build_images_list)
+    labels = _ListAttribute('_labels_list', _build_labels_list)
+
+    def _parse_files(self):
         with gzip.GzipFile(self.image_path, 'rb') as image_file:
             img_buf = image_file.read()
-            with gzip.GzipFile(self.label_path, 'rb') as label_file:
-                lab_buf = label_file.read()
-
-                step_label = 0
-                offset_img = 0
-                # read from Big-endian
-                # get file info from magic byte
-                # image file : 16B
-                magic_byte_img = '>IIII'
-                magic_img, image_num, rows, cols = struct.unpack_from(
-                    magic_byte_img, img_buf, offset_img
-                )
-                offset_img += struct.calcsize(magic_byte_img)
-
-                offset_lab = 0
-                # label file : 8B
-                magic_byte_lab = '>II'
-                magic_lab, label_num = struct.unpack_from(
-                    magic_byte_lab, lab_buf, offset_lab
-                )
-                offset_lab += struct.calcsize(magic_byte_lab)
-
-                while True:
-                    if step_label >= label_num:
-                        break
-                    fmt_label = '>' + str(buffer_size) + 'B'
-                    labels = struct.unpack_from(fmt_label, lab_buf, offset_lab)
-                    offset_lab += struct.calcsize(fmt_label)
-                    step_label += buffer_size
-
-                    fmt_images = '>' + str(buffer_size * rows * cols) + 'B'
-                    images_temp = struct.unpack_from(
-                        fmt_images, img_buf, offset_img
-                    )
-                    images = np.reshape(
-                        images_temp, (buffer_size, rows * cols)
-                    ).astype('float32')
-                    offset_img += struct.calcsize(fmt_images)
-
-                    for i in range(buffer_size):
-                        self.images.append(images[i, :])
-                        self.labels.append(
-                            np.array([labels[i]]).astype('int64')
-                        )
+        with gzip.GzipFile(self.label_path, 'rb') as label_file:
+            lab_buf = label_file.read()
+
+        # read from Big-endian
+        # get file info from magic byte
+        # image file : 16B
+        magic_byte_img = '>IIII'
+        magic_img, image_num, rows, cols = struct.unpack_from(
+            magic_byte_img, img_buf, 0
+        )
+        # label file : 8B
+        magic_byte_lab = '>II'
+        magic_lab, label_num = struct.unpack_from(magic_byte_lab, lab_buf, 0)
+
+        images = np.frombuffer(
+            img_buf,
+            dtype='uint8',
+            count=label_num * rows * cols,
+            offset=struct.calcsize(magic_byte_img),
+        ).reshape([label_num, rows * cols])
+        labels = np.frombuffer(
+            lab_buf,
+            dtype='uint8',
+            count=label_num,
+            offset=struct.calcsize(magic_byte_lab),
+        ).reshape([label_num, 1])
+        return {'images': images, 'labels': labels.astype('int64')}
 
     def __getitem__(self, idx):
-        image, label = self.images[idx], self.labels[idx]
-        image = np.reshape(image, [28, 28])
+        images = getattr(self, '_images_list', None)
+        image = self._images[idx] if images is None else images[idx]
+        labels = getattr(self, '_labels_list', None)
+        label = self._labels[idx] if labels is None else labels[idx]
+        image = np.reshape(image, [28, 28]).astype('float32')
 
         if self.backend == 'pil':
             image = Image.fromarray(image.astype('uint8'), mode='L')
@@ -233,7 +242,10 @@ class MNIST(Dataset):
         return image.astype(self.dtype), label.astype('int64')
 
     def __len__(self):
-        return len(self.labels)
+        labels = getattr(self, '_labels_list', None)
+        if labels is not None:
+            return len(labels)
+        return len(self._labels)
 
 
 class FashionMNIST(MNIST):